@@ -0,0 +1,49 @@
+# Importa a classe 'Agent' do módulo 'crewai', que é a base para criação de agentes.
+from crewai import Agent
+
+# Importa a configuração da saída detalhada do crewai (CREW_VERBOSE).
+from crew_logging import verbose
+
+# Importa o registro compartilhado de clientes LLM, que cria cada cliente uma única vez por processo.
+from Agents.LLMRegistry import llm_registry
+
+#========================================================================
+
+class EditorAgent:
+    """
+    Agente responsável por revisar o artigo escrito.
+    Esta classe cria o editor usado pelo perfil "full-edit" do pipeline.
+    """
+
+    #------------------------------------------------------------
+    def create_agent(self):
+        """
+        Cria um agente editor que revisa e refina o artigo antes da publicação.
+
+        Returns:
+            Agent: Uma instância do agente editor configurado.
+        """
+        return Agent(
+            role="Editor de Conteúdo",  # Define o papel do agente como editor.
+            goal="Revisar e refinar o artigo para garantir clareza, consistência e correção gramatical",  # Define o objetivo do agente.
+            backstory="""Você é um editor que revisa cuidadosamente os textos
+            para deixá-los prontos para publicação, corrigindo erros e
+            melhorando a clareza sem alterar as informações.""",  # Define a história do agente.
+            verbose=verbose(),  # Mensagens detalhadas do crewai só com CREW_VERBOSE=1; o progresso vai para os logs.
+            allow_delegation=False,  # O editor não delega a revisão a outros agentes.
+            llm=self._get_llm()  # Obtém o modelo de linguagem a ser usado pelo agente.
+        )
+
+    #------------------------------------------------------------
+
+    def _get_llm(self):
+        """
+        Obtém o modelo de linguagem do agente editor no registro compartilhado.
+
+        O provedor e o modelo podem ser definidos só para a edição com
+        EDITOR_LLM_PROVIDER / EDITOR_LLM_MODEL, ou EDITOR_LLM_ROUTER para vários provedores.
+
+        Returns:
+            LLM: Instância do modelo de linguagem configurado para o agente.
+        """
+        return llm_registry.get("editor")
@@ -0,0 +1,180 @@
+# Importa a biblioteca 'os', usada para acessar variáveis de ambiente.
+import os
+
+# Importa 'threading' para proteger o registro quando vários workers criam agentes ao mesmo tempo.
+import threading
+
+# Importa 'OrderedDict' para descartar os clientes usados há mais tempo quando o registro fica cheio.
+from collections import OrderedDict
+
+# Importa os provedores suportados e a escolha do modelo de cada papel, que não dependem do crewai
+# e também são usados pela API nas chaves de cache.
+import crew_llm_config
+from crew_llm_config import PROVIDERS, ROLES
+
+#========================================================================
+
+class LLMRegistry:
+    """
+    Registro de clientes LLM compartilhados pelo processo.
+
+    Cada combinação de provedor/modelo/opções é criada uma única vez e reutilizada
+    por todos os agentes, evitando montar clientes, pools HTTP e sessões TLS a cada
+    requisição. O provedor e o modelo podem ser escolhidos por papel do agente.
+    Acima de 'max_clients' combinações (ex.: muitos limites de tokens diferentes),
+    os clientes usados há mais tempo são descartados.
+    """
+
+    #-------------------------------------------------------------
+    def __init__(self, max_clients=None):
+        """
+        Args:
+            max_clients (int): Máximo de clientes guardados. Padrão: LLM_REGISTRY_SIZE (32).
+        """
+        self.max_clients = max_clients or int(os.getenv("LLM_REGISTRY_SIZE", "32"))
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    #-------------------------------------------------------------
+    def resolve(self, role=None):
+        """
+        Determina o provedor e o modelo de um papel (ver 'crew_llm_config.resolve').
+
+        Returns:
+            tuple: (provedor, modelo)
+        """
+        return crew_llm_config.resolve(role)
+
+    def routes(self, role=None):
+        """
+        Provedores entre os quais as chamadas do papel são distribuídas (ver 'crew_llm_config.routes').
+
+        Returns:
+            list: [(provedor, modelo), ...] em ordem de preferência.
+        """
+        return crew_llm_config.routes(role)
+
+    #-------------------------------------------------------------
+    def get(self, role=None, **options):
+        """
+        Retorna o cliente LLM do papel, criando-o apenas na primeira chamada.
+
+        Args:
+            role (str): Papel do agente ("researcher", "writer", ...).
+            **options: Opções extras do cliente (ex.: stream=True). Opções diferentes
+                geram clientes diferentes, pois o cliente é compartilhado.
+
+        Returns:
+            LLM: Instância do modelo de linguagem configurado, ou um 'LLMRouter'
+                quando o papel tem mais de um provedor (ver 'routes()').
+        """
+        routes = self.routes(role)
+        if len(routes) == 1:
+            return self._client(*routes[0], **options)
+
+        key = ("router", tuple(routes), tuple(sorted(options.items())))
+        with self._lock:
+            router = self._lookup(key)
+        if router is None:
+            router = self._build_router(routes, **options)
+            with self._lock:
+                router = self._lookup(key) or self._store(key, router)
+        return router
+
+    def _client(self, provider, model, **options):
+        key = (provider, model, tuple(sorted(options.items())))
+
+        with self._lock:
+            client = self._lookup(key)
+            if client is None:
+                client = self._store(key, self._build(provider, model, **options))
+            return client
+
+    def _lookup(self, key):
+        # Chamado com o lock; marca o cliente como usado agora
+        client = self._clients.get(key)
+        if client is not None:
+            self._clients.move_to_end(key)
+        return client
+
+    def _store(self, key, client):
+        # Chamado com o lock; os agentes que já receberam um cliente descartado continuam a usá-lo
+        self._clients[key] = client
+        while len(self._clients) > self.max_clients:
+            self._clients.popitem(last=False)
+        return client
+
+    def _build(self, provider, model, **options):
+        # O crewai converte qualquer cliente LangChain em seu próprio 'LLM' (litellm) a cada
+        # agente criado; construir o 'LLM' diretamente permite reaproveitá-lo entre requisições.
+        from crewai import LLM
+
+        config = PROVIDERS[provider]
+        if "api_base_env" in config:
+            # Endereço do servidor; servidores locais costumam aceitar qualquer chave.
+            options.setdefault("base_url", os.getenv(config["api_base_env"]))
+            options.setdefault("api_key", os.getenv(config["api_key_env"]) or "local")
+        else:
+            options.setdefault("api_key", os.getenv(config["api_key_env"]))  # Obtém a chave de API do provedor da variável de ambiente.
+        return LLM(
+            model=config["prefix"] + model,  # Nome do modelo com o prefixo do provedor.
+            **options
+        )
+
+    def _build_router(self, routes, **options):
+        # Os clientes de cada provedor são os mesmos usados quando o provedor é configurado sozinho.
+        from Agents.LLMRouter import LLMRouter
+
+        return LLMRouter(
+            [(provider, model, self._client(provider, model, **options)) for provider, model in routes],
+            hedge=os.getenv("LLM_HEDGE", "0") == "1",  # Requisições de reserva para chamadas lentas.
+            hedge_min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),  # Amostras antes de confiar no p95.
+            cooldown=float(os.getenv("LLM_ROUTER_COOLDOWN", "30")),  # Pausa de um provedor após 429 ou falha.
+        )
+
+    #-------------------------------------------------------------
+    def warm_up(self, roles=ROLES, ping=False, variants=None):
+        """
+        Cria antecipadamente os clientes dos papéis informados (ex.: na inicialização da API).
+
+        Args:
+            roles (Iterable[str]): Papéis a aquecer.
+            ping (bool): Se True, faz uma chamada mínima a cada modelo para já abrir a conexão TLS.
+            variants (dict): Opções extras de clientes também criados por papel,
+                ex.: {"writer": [{"max_tokens": 1024}]}.
+
+        Returns:
+            list: (papel, provedor, modelo) de cada cliente aquecido.
+        """
+        warmed = []
+        for role in roles:
+            self.get(role)
+            for options in (variants or {}).get(role, ()):
+                self.get(role, **options)
+            # Com vários provedores, cada um deles é aquecido
+            for provider, model in self.routes(role):
+                if ping:
+                    self._client(provider, model).call([{"role": "user", "content": "ping"}])
+                warmed.append((role, provider, model))
+        return warmed
+
+    def signature(self, roles=ROLES):
+        """
+        Provedores e modelos de cada papel, usados por exemplo em chaves de cache
+
+        Returns:
+            tuple: ((papel, provedor, modelo[, provedor, modelo...]), ...)
+        """
+        return crew_llm_config.signature(roles)
+
+    def clear(self):
+        """
+        Descarta os clientes criados (útil após trocar as variáveis de ambiente)
+        """
+        with self._lock:
+            self._clients.clear()
+
+#========================================================================
+
+# Registro compartilhado por todo o processo.
+llm_registry = LLMRegistry()
@@ -0,0 +1,255 @@
+# Importa a biblioteca 'os', usada para ler a configuração do roteador em variáveis de ambiente.
+import os
+
+# Importa 'threading' e 'time' para acompanhar a latência e as pausas de cada provedor.
+import threading
+import time
+
+# Importa 'deque' para guardar apenas as latências mais recentes de cada provedor.
+from collections import deque
+
+# Importa o executor usado para disparar as requisições de reserva (hedge).
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Importa a classe base dos LLMs do crewai, que permite usar o roteador como o LLM de um agente.
+from crewai.llms.base_llm import BaseLLM
+
+# Importa os limites compartilhados de cada provedor e a estimativa de tokens das chamadas.
+from Agents.RateLimit import estimate_tokens, get_provider_limiter
+
+# Importa as métricas do projeto, usadas para exportar a vazão e os erros de cada provedor.
+from crew_metrics import Counter, Histogram
+
+#========================================================================
+
+ROUTER_REQUESTS = Counter(
+    "llm_router_requests_total",
+    "Chamadas aos provedores de LLM feitas pelo roteador, por resultado",
+    labelnames=("provider", "outcome"),
+)
+ROUTER_TOKENS = Counter(
+    "llm_router_prompt_tokens_total",
+    "Tokens estimados dos prompts enviados a cada provedor",
+    labelnames=("provider",),
+)
+ROUTER_LATENCY = Histogram(
+    "llm_router_latency_seconds",
+    "Latência das chamadas bem-sucedidas a cada provedor",
+    labelnames=("provider",),
+)
+ROUTER_HEDGES = Counter(
+    "llm_router_hedges_total",
+    "Requisições de reserva (hedge) disparadas e vencidas",
+    labelnames=("outcome",),
+)
+
+# Executor compartilhado das chamadas feitas em paralelo quando o hedge está ativo.
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(int(os.getenv("LLM_HEDGE_WORKERS", "16")), thread_name_prefix="llm-hedge")
+        return _executor
+
+#========================================================================
+
+def failure_kind(error):
+    """
+    Classifica o erro de uma chamada ao LLM.
+
+    Em streaming, o crewai substitui o erro do provedor por um 'Exception' genérico
+    ("Failed to get streaming response: ..."); o erro original é procurado na cadeia
+    de exceções ('__cause__' e '__context__').
+
+    Returns:
+        str: "rate_limited", "timeout" ou "unavailable" quando vale tentar outro
+            provedor; None para os demais erros (ex.: requisição inválida).
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        kind = _error_kind(error)
+        if kind is not None:
+            return kind
+        error = error.__cause__ or error.__context__
+    return None
+
+def _error_kind(error):
+    status = getattr(error, "status_code", None)
+    name = type(error).__name__
+
+    if status == 429 or name == "RateLimitError":
+        return "rate_limited"
+    if status == 408 or isinstance(error, TimeoutError) or name in ("Timeout", "APITimeoutError"):
+        return "timeout"
+    if isinstance(error, ConnectionError) or name in ("APIConnectionError", "ServiceUnavailableError"):
+        return "unavailable"
+    if isinstance(status, int) and status >= 500:
+        return "unavailable"
+    return None
+
+#========================================================================
+
+class ProviderRoute:
+    """
+    Um provedor/modelo do roteador, com seu cliente, seus limites e suas latências recentes.
+    """
+
+    #-------------------------------------------------------------
+    def __init__(self, provider, model, client, window=100):
+        self.provider = provider
+        self.model = model
+        self.client = client
+        self.limiter = get_provider_limiter(provider)
+        self.latencies = deque(maxlen=window)
+        self.cooldown_until = 0.0
+
+    def available(self):
+        """
+        Indica se o provedor não está em pausa após um erro
+        """
+        return time.monotonic() >= self.cooldown_until
+
+    def percentile(self, q):
+        """
+        Latência recente no percentil 'q' (0 a 100), ou None sem amostras
+        """
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+#========================================================================
+
+class LLMRouter(BaseLLM):
+    """
+    LLM que distribui as chamadas entre vários provedores.
+
+    Cada chamada vai para o provedor disponível com mais folga (vagas e balde de
+    tokens) e, em caso de empate, com a menor latência recente. Se o provedor
+    responder com limite de uso (429), tempo esgotado ou indisponibilidade, ele
+    fica em pausa e a chamada segue para o próximo. Com o hedge ativo, uma
+    segunda requisição é enviada a outro provedor quando a primeira passa da
+    latência p95 daquele provedor, e a primeira resposta vence.
+    """
+
+    #-------------------------------------------------------------
+    def __init__(self, routes, hedge=False, hedge_min_samples=20, cooldown=30.0):
+        """
+        Args:
+            routes (list): Lista de (provedor, modelo, cliente), em ordem de preferência.
+            hedge (bool): Se True, envia requisições de reserva às chamadas lentas.
+                Ignorado para clientes em streaming, que emitiriam os tokens em dobro.
+            hedge_min_samples (int): Amostras de latência necessárias antes de usar o p95.
+            cooldown (float): Segundos de pausa de um provedor após um erro.
+        """
+        self.routes = [ProviderRoute(provider, model, client) for provider, model, client in routes]
+        super().__init__(model=self.routes[0].client.model, temperature=getattr(self.routes[0].client, "temperature", None))
+        self.stream = any(getattr(route.client, "stream", False) for route in self.routes)
+        self.hedge = hedge and not self.stream
+        self.hedge_min_samples = hedge_min_samples
+        self.cooldown = cooldown
+
+    #-------------------------------------------------------------
+    def ranked(self):
+        """
+        Provedores em ordem de escolha: disponíveis primeiro, depois maior folga e menor latência
+        """
+        def key(item):
+            position, route = item
+            latency = route.percentile(50)
+            return (
+                not route.available(),
+                -round(route.limiter.headroom(), 2),
+                latency if latency is not None else 0.0,
+                position,
+            )
+        return [route for _, route in sorted(enumerate(self.routes), key=key)]
+
+    def _attempt(self, route, messages, tokens, **kwargs):
+        # Executa a chamada em um provedor, respeitando seus limites e registrando as métricas
+        route.client.stop = self.stop
+        start = time.monotonic()
+        try:
+            with route.limiter.slot(tokens):
+                result = route.client.call(messages, **kwargs)
+        except Exception as e:
+            kind = failure_kind(e)
+            ROUTER_REQUESTS.inc(provider=route.provider, outcome=kind or "error")
+            if kind is not None:
+                route.cooldown_until = time.monotonic() + self.cooldown
+            raise
+
+        elapsed = time.monotonic() - start
+        route.latencies.append(elapsed)
+        ROUTER_LATENCY.observe(elapsed, provider=route.provider)
+        ROUTER_REQUESTS.inc(provider=route.provider, outcome="success")
+        ROUTER_TOKENS.inc(tokens, provider=route.provider)
+        return result
+
+    def _hedged(self, route, backup, messages, tokens, tried, **kwargs):
+        # Envia a requisição principal e, se ela passar do p95 do provedor, uma de reserva;
+        # o provedor de reserva entra em 'tried' para não ser tentado de novo se as duas falharem
+        executor = _get_executor()
+        primary = executor.submit(self._attempt, route, messages, tokens, **kwargs)
+        done, _ = wait([primary], timeout=route.percentile(95))
+        if done:
+            return primary.result()
+
+        ROUTER_HEDGES.inc(outcome="launched")
+        tried.add(id(backup))
+        secondary = executor.submit(self._attempt, backup, messages, tokens, **kwargs)
+        pending = {primary, secondary}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        ROUTER_HEDGES.inc(outcome="won")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    #-------------------------------------------------------------
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        """
+        Envia a chamada ao melhor provedor, tentando os seguintes em caso de limite de uso ou falha.
+        """
+        kwargs = {"tools": tools, "callbacks": callbacks, "available_functions": available_functions}
+        tokens = estimate_tokens(messages if isinstance(messages, str) else "".join(
+            str(message.get("content", "")) for message in messages
+        ))
+
+        routes = self.ranked()
+        tried = set()
+        error = None
+        for i, route in enumerate(routes):
+            if id(route) in tried:
+                continue
+            tried.add(id(route))
+            backup = routes[i + 1] if i + 1 < len(routes) else None
+            try:
+                if (self.hedge and backup is not None and backup.available()
+                        and len(route.latencies) >= self.hedge_min_samples):
+                    return self._hedged(route, backup, messages, tokens, tried, **kwargs)
+                return self._attempt(route, messages, tokens, **kwargs)
+            except Exception as e:
+                if failure_kind(e) is None:
+                    raise
+                error = e
+        raise error
+
+    #-------------------------------------------------------------
+    def supports_function_calling(self):
+        return all(route.client.supports_function_calling() for route in self.routes)
+
+    def supports_stop_words(self):
+        return all(route.client.supports_stop_words() for route in self.routes)
+
+    def get_context_window_size(self):
+        # O menor contexto entre os provedores, já que qualquer um pode receber a chamada
+        return min(route.client.get_context_window_size() for route in self.routes)
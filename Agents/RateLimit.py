@@ -0,0 +1,180 @@
+# Importa a biblioteca 'os', usada para ler os limites configurados em variáveis de ambiente.
+import os
+
+# Importa 'threading' e 'time' para coordenar as chamadas simultâneas aos provedores.
+import threading
+import time
+
+# Importa 'contextmanager' para oferecer os limites como bloco 'with'.
+from contextlib import contextmanager
+
+#========================================================================
+
+def estimate_tokens(text):
+    """
+    Estimativa simples do número de tokens de um texto (cerca de 4 caracteres por token).
+    """
+    return max(1, len(text) // 4)
+
+def estimate_completion_tokens(words):
+    """
+    Estimativa do número de tokens gerados para um texto com a quantidade de palavras informada.
+    """
+    return int(words * 4 / 3)
+
+#========================================================================
+
+class TokenBucket:
+    """
+    Balde de tokens: acumula 'rate_per_minute' tokens por minuto até 'capacity'
+    e cada chamada consome a quantidade estimada de tokens que vai usar.
+    """
+
+    #-------------------------------------------------------------
+    def __init__(self, rate_per_minute, capacity=None):
+        """
+        Args:
+            rate_per_minute (float): Tokens repostos por minuto.
+            capacity (float): Máximo acumulado. Por padrão, um minuto de tokens.
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    #-------------------------------------------------------------
+    def available(self):
+        """
+        Tokens disponíveis no momento.
+        """
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self, amount):
+        """
+        Consome 'amount' tokens se houver saldo, sem esperar.
+
+        Returns:
+            bool: True se os tokens foram consumidos.
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return True
+            return False
+
+    def acquire(self, amount, timeout=None):
+        """
+        Consome 'amount' tokens, esperando o balde encher se necessário.
+
+        Returns:
+            bool: True se os tokens foram consumidos, False se o tempo limite acabou.
+        """
+        # Pedidos maiores que a capacidade esperariam para sempre; eles consomem o balde cheio
+        amount = min(amount, self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return True
+                wait = (amount - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+#========================================================================
+
+class ProviderLimiter:
+    """
+    Limites de um provedor de LLM: chamadas simultâneas e tokens por minuto.
+    """
+
+    #-------------------------------------------------------------
+    def __init__(self, concurrency=None, tokens_per_minute=None):
+        """
+        Args:
+            concurrency (int): Máximo de chamadas simultâneas. None = sem limite.
+            tokens_per_minute (float): Orçamento de tokens por minuto. None = sem limite.
+        """
+        self.concurrency = concurrency
+        self._semaphore = threading.BoundedSemaphore(concurrency) if concurrency else None
+        self.bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._active = 0
+        self._active_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, provider):
+        """
+        Lê {PROVEDOR}_MAX_CONCURRENCY e {PROVEDOR}_TOKENS_PER_MINUTE (ex.: GROQ_MAX_CONCURRENCY).
+        """
+        concurrency = os.getenv(f"{provider.upper()}_MAX_CONCURRENCY")
+        tokens_per_minute = os.getenv(f"{provider.upper()}_TOKENS_PER_MINUTE")
+        return cls(
+            concurrency=int(concurrency) if concurrency else None,
+            tokens_per_minute=float(tokens_per_minute) if tokens_per_minute else None,
+        )
+
+    #-------------------------------------------------------------
+    @contextmanager
+    def slot(self, tokens=0):
+        """
+        Bloco 'with' que espera uma vaga de execução e o orçamento de tokens do provedor.
+
+        Args:
+            tokens (int): Tokens estimados da chamada (prompt + resposta).
+        """
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        with self._active_lock:
+            self._active += 1
+        try:
+            if self.bucket is not None and tokens:
+                self.bucket.acquire(tokens)
+            yield
+        finally:
+            with self._active_lock:
+                self._active -= 1
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    def headroom(self):
+        """
+        Folga atual do provedor, entre 0 e 1: a menor fração livre entre as vagas
+        de execução e o balde de tokens (1 quando não há limites).
+        """
+        free = 1.0
+        if self.concurrency:
+            free = min(free, 1 - self._active / self.concurrency)
+        if self.bucket is not None:
+            free = min(free, self.bucket.available() / self.bucket.capacity)
+        return max(free, 0.0)
+
+#========================================================================
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_provider_limiter(provider):
+    """
+    Retorna os limites do provedor, compartilhados por todo o processo.
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = ProviderLimiter.from_env(provider)
+        return _limiters[provider]
@@ -1,17 +1,11 @@
 # Importa a classe 'Agent' do módulo 'crewai', que é a base para criação de agentes.
 from crewai import Agent
 
-# Importa a classe 'BaseTool' de 'Tools.base_tool', possivelmente para o uso de ferramentas personalizadas.
-from Tools.base_tool import BaseTool # type: ignore
+# Importa a configuração da saída detalhada do crewai (CREW_VERBOSE).
+from crew_logging import verbose
 
-# Importa o módulo 'WikipediaTool' de 'Tools', provavelmente uma ferramenta que auxilia na pesquisa de informações da Wikipedia.
-from Tools import WikipediaTool
-
-# Importa a biblioteca 'os', usada para acessar variáveis de ambiente.
-import os
-
-# Importa novamente 'BaseTool' de 'crewai_tools.base_tool', pode ser um erro ou redundância no código.
-# Removed redundant or unresolved import for 'crewai_tools.base_tool'.
+# Importa o registro compartilhado de clientes LLM, que cria cada cliente uma única vez por processo.
+from Agents.LLMRegistry import llm_registry
 
 #========================================================================
 
@@ -22,12 +16,14 @@ class ResearcherAgent:
     """
 
     #-------------------------------------------------------------
-    def create_agent(self, tools=None):
+    def create_agent(self, tools=None, max_iter=None):
         """
         Cria um agente pesquisador com ferramentas específicas.
         
         Args:
             tools (list): Lista de ferramentas que o agente poderá usar. Pode ser vazio.
+            max_iter (int): Máximo de iterações (chamadas de ferramenta) antes da resposta final.
+                None mantém o padrão do crewai.
             
         Returns:
             Agent: Uma instância do agente configurado para realizar tarefas de pesquisa.
@@ -39,44 +35,25 @@ class ResearcherAgent:
             as informações mais relevantes e confiáveis sobre qualquer assunto.
             Você tem uma vasta experiência em coletar dados de diversas fontes
             e organizar informações de maneira coerente.""",  # Definindo a história do agente para dar mais contexto.
-            verbose=True,  # Habilita mensagens detalhadas (útil para depuração ou logs).
+            verbose=verbose(),  # Mensagens detalhadas do crewai só com CREW_VERBOSE=1; o progresso vai para os logs.
             allow_delegation=False,  # Define se o agente pode delegar suas tarefas para outros agentes.
             tools=tools or [],  # Define as ferramentas que o agente pode usar, se não fornecer nada, usa uma lista vazia.
-            llm=self._get_llm()  # Obtém o modelo de linguagem a ser usado pelo agente.
+            llm=self._get_llm(),  # Obtém o modelo de linguagem a ser usado pelo agente.
+            **({"max_iter": max_iter} if max_iter else {})  # Limita as iterações quando o orçamento de tempo é curto.
         )
     
     #------------------------------------------------------------
 
     def _get_llm(self):
         """
-        Configura o modelo de linguagem para o agente.
+        Obtém o modelo de linguagem do agente pesquisador no registro compartilhado.
         
+        O provedor e o modelo podem ser definidos só para a pesquisa com
+        RESEARCHER_LLM_PROVIDER / RESEARCHER_LLM_MODEL (ex.: um modelo menor e mais rápido).
+        Com RESEARCHER_LLM_ROUTER (ou LLM_ROUTER), as chamadas são distribuídas entre
+        vários provedores, com troca automática quando um deles atinge o limite de uso.
+
         Returns:
             LLM: Instância do modelo de linguagem configurado para o agente.
         """
-        # Recupera o provedor de modelo de linguagem a partir de uma variável de ambiente, com valor padrão "groq".
-        llm_provider = os.getenv("LLM_PROVIDER", "groq").lower()
-
-        # Se o provedor for "groq", utiliza o modelo de linguagem Groq.
-        if llm_provider == "groq":
-            # Importa a classe 'ChatGroq' da biblioteca 'langchain_groq' para o modelo de linguagem Groq.
-            from langchain_groq import ChatGroq
-            
-            # Retorna uma instância do modelo 'ChatGroq' com a chave de API configurada.
-            return ChatGroq(
-                api_key=os.getenv("GROQ_API_KEY"),  # Obtém a chave de API do Groq da variável de ambiente.
-                model_name="llama3-70b-8192"  # Define o nome do modelo.
-            )
-        
-        # Se o provedor for "gemini", utiliza o modelo de linguagem Gemini.
-        elif llm_provider == "gemini":
-            # Importa a classe 'ChatGoogleGenerativeAI' para o modelo Gemini.
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            return ChatGoogleGenerativeAI(
-                api_key=os.getenv("GEMINI_API_KEY"),  # Obtém a chave de API do Gemini da variável de ambiente.
-                model="gemini-pro"  # Define o nome do modelo Gemini.
-            )
-        
-        # Se o provedor não for reconhecido, levanta um erro.
-        else:
-            raise ValueError(f"Provedor LLM não suportado: {llm_provider}")
+        return llm_registry.get("researcher")
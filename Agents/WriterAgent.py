@@ -1,8 +1,11 @@
 # Importa a classe 'Agent' do módulo 'crewai'. A classe 'Agent' é a base para a criação de agentes no sistema.
 from crewai import Agent
 
-# Importa o módulo 'os', utilizado para acessar variáveis de ambiente no sistema.
-import os
+# Importa a configuração da saída detalhada do crewai (CREW_VERBOSE).
+from crew_logging import verbose
+
+# Importa o registro compartilhado de clientes LLM, que cria cada cliente uma única vez por processo.
+from Agents.LLMRegistry import llm_registry
 
 #========================================================================
 
@@ -13,10 +16,14 @@ class WriterAgent:
     """
     
     #------------------------------------------------------------
-    def create_agent(self):
+    def create_agent(self, stream=False, max_tokens=None):
         """
         Cria um agente escritor que pode escrever artigos com base em pesquisas fornecidas.
         
+        Args:
+            stream (bool): Se True, o LLM gera a resposta em streaming, emitindo cada token como evento do crewai.
+            max_tokens (int): Limite de tokens de cada resposta do LLM, ou None para o padrão do provedor.
+
         Returns:
             Agent: Uma instância do agente escritor configurado.
         """
@@ -28,45 +35,32 @@ class WriterAgent:
             conteúdos informativos e bem estruturados. Você sabe como
             transformar informações brutas em artigos coesos e interessantes
             que prendem a atenção do leitor do início ao fim.""",  # Define a história do agente, contextualizando suas habilidades e competências.
-            verbose=True,  # Ativa mensagens detalhadas (útil para depuração ou logs).
+            verbose=verbose(),  # Mensagens detalhadas do crewai só com CREW_VERBOSE=1; o progresso vai para os logs.
             allow_delegation=False,  # Desativa a delegação de tarefas, ou seja, o agente não delega suas responsabilidades.
-            llm=self._get_llm()  # Define o modelo de linguagem (LLM) a ser utilizado pelo agente.
+            llm=self._get_llm(stream, max_tokens)  # Define o modelo de linguagem (LLM) a ser utilizado pelo agente.
         )
     
     #------------------------------------------------------------
     
-    def _get_llm(self):
+    def _get_llm(self, stream=False, max_tokens=None):
         """
-        Configura o modelo de linguagem para o agente escritor.
+        Obtém o modelo de linguagem do agente escritor no registro compartilhado.
         
+        O provedor e o modelo podem ser definidos só para a escrita com
+        WRITER_LLM_PROVIDER / WRITER_LLM_MODEL.
+        Com WRITER_LLM_ROUTER (ou LLM_ROUTER), as chamadas são distribuídas entre
+        vários provedores, com troca automática quando um deles atinge o limite de uso.
+
+        Args:
+            stream (bool): Se True, usa o cliente que gera a resposta em streaming.
+            max_tokens (int): Se informado, usa o cliente com esse limite de tokens por resposta.
+
         Returns:
             LLM: Instância do modelo de linguagem configurado para o agente.
         """
-        # Obtém o provedor de modelo de linguagem a partir de uma variável de ambiente chamada 'LLM_PROVIDER'. Caso não exista, o valor padrão será 'groq'.
-        llm_provider = os.getenv("LLM_PROVIDER", "groq").lower()
-        
-        # Se o provedor for 'groq', utiliza o modelo de linguagem Groq.
-        if llm_provider == "groq":
-            # Importa o módulo necessário para usar o modelo Groq.
-            from langchain_groq import ChatGroq
-            
-            # Retorna uma instância do modelo 'ChatGroq', configurado com a chave de API e o nome do modelo.
-            return ChatGroq(
-                api_key=os.getenv("GROQ_API_KEY"),  # Obtém a chave de API do Groq a partir de uma variável de ambiente.
-                model_name="llama3-70b-8192"  # Define o nome do modelo.
-            )
-        
-        # Se o provedor for 'gemini', utiliza o modelo de linguagem Gemini.
-        elif llm_provider == "gemini":
-            # Importa o módulo necessário para usar o modelo Gemini.
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            
-            # Retorna uma instância do modelo 'ChatGoogleGenerativeAI', configurado com a chave de API e o nome do modelo.
-            return ChatGoogleGenerativeAI(
-                api_key=os.getenv("GEMINI_API_KEY"),  # Obtém a chave de API do Gemini a partir de uma variável de ambiente.
-                model="gemini-pro"  # Define o nome do modelo Gemini.
-            )
-        
-        # Se o provedor de LLM não for reconhecido, lança um erro.
-        else:
-            raise ValueError(f"Provedor LLM não suportado: {llm_provider}")
+        options = {}
+        if stream:
+            options["stream"] = True
+        if max_tokens:
+            options["max_tokens"] = max_tokens
+        return llm_registry.get("writer", **options)
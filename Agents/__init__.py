@@ -1,9 +1,11 @@
-# Importações relativas, que trazem as classes dos módulos 'researcher' e 'writer' localizados no mesmo diretório
-from .researcher import ResearcherAgent  # Importa a classe 'ResearcherAgent' do módulo 'researcher' no mesmo pacote
-from .writer import WriterAgent        # Importa a classe 'WriterAgent' do módulo 'writer' no mesmo pacote
+# Importações relativas, que trazem as classes dos módulos 'ResearcherAgent' e 'WriterAgent' localizados no mesmo diretório
+from .ResearcherAgent import ResearcherAgent  # Importa a classe 'ResearcherAgent' do módulo 'ResearcherAgent' no mesmo pacote
+from .WriterAgent import WriterAgent          # Importa a classe 'WriterAgent' do módulo 'WriterAgent' no mesmo pacote
+from .EditorAgent import EditorAgent          # Importa a classe 'EditorAgent', usada no perfil "full-edit"
+from .LLMRegistry import llm_registry         # Importa o registro compartilhado de clientes LLM
 
 # Definindo o que será exportado quando alguém utilizar 'from <module> import *'
-__all__ = ['ResearcherAgent', 'WriterAgent']  # Apenas as classes 'ResearcherAgent' e 'WriterAgent' serão importadas
+__all__ = ['ResearcherAgent', 'WriterAgent', 'EditorAgent', 'llm_registry']  # Apenas os agentes e o registro de LLMs serão importados
 
 # Explicação:
 # Quando alguém fizer 'from Agents import *', apenas as classes listadas em '__all__' serão importadas,
@@ -1,4 +1,4 @@
 from .routes import app
-from .models import ArticleRequest, ArticleResponse
+from .models import ArticleRequest, ArticleResponse, BatchItemResponse, CheckpointResponse, JobResponse
 
-__all__ = ['app', 'ArticleRequest', 'ArticleResponse']
\ No newline at end of file
+__all__ = ['app', 'ArticleRequest', 'ArticleResponse', 'JobResponse', 'BatchItemResponse', 'CheckpointResponse']
\ No newline at end of file
@@ -0,0 +1,123 @@
+import asyncio
+import os
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from Api.jobs import QueueFullError
+from Api.models import ArticleRequest
+from crew_topics import normalize_title
+
+#-------------------------------------------------------------------
+class BatchRunner:
+    """
+    Executa a geração de vários artigos compartilhando a etapa de pesquisa.
+
+    Tópicos repetidos (após normalização) são pesquisados uma única vez e todas
+    as pesquisas rodam em paralelo. Cada escrita começa assim que a pesquisa do
+    seu tópico termina e respeita os limites de concorrência e de tokens por
+    minuto do provedor do escritor.
+
+    As etapas são enviadas ao pool da API ('submit', ex.: 'JobManager.submit_task')
+    e ocupam as mesmas vagas das demais gerações, com a prioridade de cada item.
+    Sem vaga, o lote espera uma das suas próprias etapas terminar; um item que não
+    encontra vaga sem nenhuma etapa do lote em andamento falha com 'QueueFullError'.
+    """
+
+    def __init__(self, research: Callable, write: Callable, submit: Callable, research_workers: int = 8,
+                 write_workers: int = 8):
+        """
+        Args:
+            research (Callable): research(topic) -> texto pesquisado.
+            write (Callable): write(topic, research, min_words, on_event, max_words) -> artigo.
+            submit (Callable): submit(fn, *args, priority=...) -> Future; lança 'QueueFullError' sem vaga.
+            research_workers (int): Máximo de pesquisas simultâneas de um lote.
+            write_workers (int): Máximo de escritas simultâneas de um lote (antes dos limites do provedor).
+        """
+        self.research = research
+        self.write = write
+        self.submit = submit
+        self.research_workers = research_workers
+        self.write_workers = write_workers
+
+    @classmethod
+    def from_env(cls, research: Callable, write: Callable, submit: Callable) -> "BatchRunner":
+        """
+        Cria o executor a partir de BATCH_RESEARCH_CONCURRENCY e BATCH_WRITE_CONCURRENCY
+        """
+        return cls(
+            research,
+            write,
+            submit,
+            research_workers=int(os.getenv("BATCH_RESEARCH_CONCURRENCY", "8")),
+            write_workers=int(os.getenv("BATCH_WRITE_CONCURRENCY", "8")),
+        )
+
+    #-------------------------------------------------------------
+    def _write_limited(self, topic: str, research: str, min_words: int, max_words: Optional[int] = None):
+        # Aguarda uma vaga e o orçamento de tokens do provedor do escritor antes de escrever
+        from Agents.LLMRegistry import llm_registry
+        from Agents.RateLimit import estimate_completion_tokens, estimate_tokens, get_provider_limiter
+
+        routes = llm_registry.routes("writer")
+        if len(routes) > 1:
+            # Com vários provedores, o roteador de LLMs aplica os limites do provedor escolhido em cada chamada
+            return self.write(topic, research, min_words, None, max_words)
+
+        provider, _ = routes[0]
+        tokens = estimate_tokens(research) + estimate_completion_tokens(max_words or min_words)
+        with get_provider_limiter(provider).slot(tokens):
+            return self.write(topic, research, min_words, None, max_words)
+
+    #-------------------------------------------------------------
+    async def run(self, requests: List[Tuple[int, ArticleRequest]]
+                  ) -> AsyncIterator[Tuple[int, ArticleRequest, Optional[dict], Optional[Exception]]]:
+        """
+        Gera os artigos e os entrega conforme cada um termina.
+
+        Args:
+            requests: Pares (índice, requisição).
+
+        Yields:
+            (índice, requisição, artigo ou None, erro ou None). A falha de um item
+            não interrompe os demais.
+        """
+        research_slots = asyncio.Semaphore(self.research_workers)
+        write_slots = asyncio.Semaphore(self.write_workers)
+        running = set()
+
+        async def admitted(priority, fn, *args):
+            # Envia a etapa ao pool; sem vaga, espera uma etapa do próprio lote liberar a sua
+            while True:
+                try:
+                    future = asyncio.wrap_future(self.submit(fn, *args, priority=priority))
+                except QueueFullError:
+                    if not running:
+                        raise
+                    await asyncio.wait(set(running), return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                running.add(future)
+                future.add_done_callback(running.discard)
+                return await future
+
+        async def research_topic(request):
+            async with research_slots:
+                return await admitted(request.priority, self.research, request.topic)
+
+        research = {}
+        for _, request in requests:
+            key = normalize_title(request.topic)
+            if key not in research:
+                research[key] = asyncio.ensure_future(research_topic(request))
+
+        async def process(index, request):
+            try:
+                text = await research[normalize_title(request.topic)]
+                async with write_slots:
+                    article = await admitted(
+                        request.priority, self._write_limited, request.topic, text, request.min_words, request.max_words
+                    )
+                return index, request, article, None
+            except Exception as e:
+                return index, request, None, e
+
+        for finished in asyncio.as_completed([process(index, request) for index, request in requests]):
+            yield await finished
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+
+import crew_llm_config
+from crew_metrics import Counter
+from crew_topics import normalize_title
+
+ARTICLE_CACHE_REQUESTS = Counter(
+    "article_cache_requests_total",
+    "Requisições de artigo por resultado do cache (hit, semantic, miss ou coalesced)",
+    labelnames=("result",),
+)
+
+#-------------------------------------------------------------------
+def article_cache_key(topic: str, min_words: int, profile: str = "standard",
+                      max_words: Optional[int] = None) -> Tuple[str, int, Optional[int], str, tuple]:
+    """
+    Chave do cache de artigos: tópico normalizado, tamanhos mínimo e máximo, perfil do pipeline
+    e provedor/modelo do LLM de cada agente
+    """
+    return (normalize_title(topic), min_words, max_words, profile, crew_llm_config.signature())
+
+def semantic_article_lookup(topic: str, min_words: int, profile: str = "standard",
+                            max_words: Optional[int] = None) -> Optional[dict]:
+    """
+    Procura no cache semântico um artigo de tópico parecido, gerado pelos mesmos
+    modelos e perfil, com pelo menos 'min_words' palavras pedidas e, se 'max_words'
+    for informado, com no máximo 'max_words' palavras
+
+    Returns:
+        Optional[dict]: Artigo (campos de ArticleResponse), ou None.
+    """
+    # Importados aqui porque carregam o numpy e o chromadb só quando o cache é usado
+    import json
+    from crew_semantic_cache import get_semantic_cache
+
+    cache = get_semantic_cache()
+    if cache is None:
+        return None
+    where = {"$and": [
+        {"signature": str(crew_llm_config.signature())}, {"profile": profile}, {"min_words": {"$gte": min_words}},
+    ]}
+    if max_words is not None:
+        where["$and"].append({"word_count": {"$lte": max_words}})
+    found = cache.get("article", topic, where=where)
+    return json.loads(found[0]) if found else None
+
+def semantic_article_store(topic: str, min_words: int, article: dict, profile: str = "standard"):
+    """
+    Guarda o artigo gerado no cache semântico
+    """
+    import json
+    from crew_semantic_cache import get_semantic_cache
+
+    cache = get_semantic_cache()
+    if cache is not None:
+        cache.add("article", topic, json.dumps(article, ensure_ascii=False),
+                  signature=str(crew_llm_config.signature()), profile=profile, min_words=min_words,
+                  word_count=article.get("word_count", 0))
+
+#-------------------------------------------------------------------
+class ArticleCache:
+    """
+    Cache LRU em memória dos artigos gerados, com validade (TTL) por entrada
+    """
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 256):
+        """
+        Args:
+            ttl (float): Validade, em segundos, de cada artigo. 0 desativa o cache.
+            max_entries (int): Máximo de artigos guardados.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "ArticleCache":
+        """
+        Cria o cache a partir de ARTICLE_CACHE_TTL e ARTICLE_CACHE_SIZE
+        """
+        return cls(
+            ttl=float(os.getenv("ARTICLE_CACHE_TTL", "3600")),
+            max_entries=int(os.getenv("ARTICLE_CACHE_SIZE", "256")),
+        )
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Retorna o artigo em cache, ou None se ausente ou expirado
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Armazena o artigo, removendo os menos usados acima do limite
+        """
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (value, time.time() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Esvazia o cache
+        """
+        self._entries.clear()
+
+#-------------------------------------------------------------------
+class SingleFlight:
+    """
+    Agrupa chamadas simultâneas com a mesma chave em uma única execução.
+
+    A primeira chamada inicia a execução; as demais aguardam o mesmo resultado.
+    A execução continua mesmo que quem a iniciou desista de esperar.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Returns:
+            Tuple[Any, bool]: (resultado, True se aproveitou uma execução já em andamento)
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task), False
+
+    def __len__(self):
+        return len(self._inflight)
@@ -0,0 +1,513 @@
+import asyncio
+import heapq
+import itertools
+import math
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Tuple
+
+import crew_metrics
+from crew_metrics import Counter
+
+JOB_ADMISSIONS = Counter(
+    "crew_job_admissions_total",
+    "Execuções da crew admitidas ou recusadas (fila cheia) por prioridade",
+    labelnames=("priority", "result"),
+)
+
+#-------------------------------------------------------------------
+def run_crew(*args):
+    """
+    Executa 'crew_logic.create_crew', importando o módulo (e o crewai) só na primeira chamada.
+    Definida no nível do módulo para poder ser enviada a workers de outro processo.
+    """
+    import crew_logic
+
+    return crew_logic.create_crew(*args)
+
+def _init_worker():
+    """
+    Inicializa cada processo worker. O cache semântico (chromadb) pertence ao processo da API,
+    então os workers não o abrem: cada worker substituído deixaria um diretório temporário para
+    trás, e o índice do chromadb não pode ser compartilhado por vários processos.
+    """
+    import crew_semantic_cache
+
+    crew_semantic_cache.disable_in_process()
+    # As métricas herdadas do forkserver (pré-carregamento) não são de nenhuma execução
+    crew_metrics.drain()
+
+def _run_with_metrics(fn, *args):
+    """
+    Executa 'fn' num processo worker e retorna (sucesso, resultado ou erro, métricas da execução),
+    para que as métricas registradas no worker sejam somadas às do processo da API ('/metrics').
+    """
+    try:
+        result = (True, fn(*args))
+    except Exception as e:
+        result = (False, e)
+    return (*result, crew_metrics.drain())
+
+def run_research(*args):
+    """
+    Executa 'crew_logic.run_research' (só a etapa de pesquisa), importando o módulo na primeira chamada
+    """
+    import crew_logic
+
+    return crew_logic.run_research(*args)
+
+def run_writing(*args):
+    """
+    Executa 'crew_logic.run_writing' (só a etapa de escrita), importando o módulo na primeira chamada
+    """
+    import crew_logic
+
+    return crew_logic.run_writing(*args)
+
+#-------------------------------------------------------------------
+class QueueFullError(Exception):
+    """
+    Erro lançado quando o pool de execução está saturado e não aceita novos jobs
+    """
+
+#-------------------------------------------------------------------
+@dataclass
+class Job:
+    """
+    Representa uma execução da crew submetida ao pool de workers
+    """
+    id: str
+    args: Tuple[Any, ...]
+    future: Future
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        """
+        Estado atual do job: pending, running, completed, failed ou cancelled
+        """
+        if self.future.cancelled():
+            return "cancelled"
+        if self.future.done():
+            return "failed" if self.future.exception() is not None else "completed"
+        if self.future.running():
+            return "running"
+        return "pending"
+
+#-------------------------------------------------------------------
+# Classes de prioridade, da mais para a menos urgente
+PRIORITIES = ("high", "normal", "low")
+
+# Fração das vagas (workers + fila) que cada prioridade pode ocupar. As vagas acima
+# do limite de uma classe ficam reservadas às classes mais prioritárias.
+DEFAULT_ADMISSION = {"high": 1.0, "normal": 0.8, "low": 0.5}
+
+def available_cores() -> int:
+    """
+    Núcleos de CPU disponíveis para o processo (respeita a afinidade definida pelo contêiner)
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def parse_admission(value: str) -> dict:
+    """
+    Converte "high=1,normal=0.8,low=0.5" no dicionário de frações por prioridade
+    """
+    admission = dict(DEFAULT_ADMISSION)
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        priority, _, fraction = item.partition("=")
+        if priority.strip() not in PRIORITIES:
+            raise ValueError(f"Prioridade desconhecida em CREW_ADMISSION: {priority}")
+        admission[priority.strip()] = float(fraction)
+    return admission
+
+#-------------------------------------------------------------------
+class _PriorityDispatcher:
+    """
+    Fila por prioridade na frente de um executor: só envia ao executor quantas
+    execuções ele consegue rodar ao mesmo tempo, sempre a de maior prioridade
+    (e, entre iguais, a mais antiga) primeiro.
+
+    As execuções locais (que precisam rodar no processo atual) vão para 'get_local_executor',
+    mas ocupam as mesmas 'max_workers' vagas de execução que as demais.
+    """
+
+    def __init__(self, get_executor: Callable, max_workers: int, on_broken: Callable = None,
+                 collect_metrics: bool = False, get_local_executor: Callable = None):
+        self._get_executor = get_executor
+        self._get_local_executor = get_local_executor or get_executor
+        self._on_broken = on_broken
+        # Com workers em processos, as métricas de cada execução voltam com o resultado
+        self._collect_metrics = collect_metrics
+        self.max_workers = max_workers
+        self._pending = []
+        self._running = 0
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def submit(self, priority: str, fn: Callable, *args, local: bool = False) -> Future:
+        future = Future()
+        with self._lock:
+            heapq.heappush(self._pending, (PRIORITIES.index(priority), next(self._sequence), future, fn, args, local))
+        self._dispatch()
+        return future
+
+    def pending(self) -> dict:
+        with self._lock:
+            counts = {priority: 0 for priority in PRIORITIES}
+            for rank, _, future, _, _, _ in self._pending:
+                counts[PRIORITIES[rank]] += not future.cancelled()
+            return counts
+
+    def _dispatch(self):
+        ready = []
+        with self._lock:
+            while self._pending and self._running < self.max_workers:
+                _, _, future, fn, args, local = heapq.heappop(self._pending)
+                # Jobs cancelados enquanto aguardavam na fila são descartados
+                if future.set_running_or_notify_cancel():
+                    self._running += 1
+                    ready.append((future, fn, args, local))
+
+        for future, fn, args, local in ready:
+            # As execuções locais rodam no processo atual e não precisam devolver as métricas
+            collect_metrics = self._collect_metrics and not local
+            try:
+                executor = self._get_local_executor() if local else self._get_executor()
+                if collect_metrics:
+                    inner = executor.submit(_run_with_metrics, fn, *args)
+                else:
+                    inner = executor.submit(fn, *args)
+            except Exception as e:
+                self._finished(future, None, error=e)
+            else:
+                inner.add_done_callback(
+                    lambda inner, future=future, executor=executor, collect_metrics=collect_metrics:
+                        self._finished(future, executor, inner=inner, collect_metrics=collect_metrics)
+                )
+
+    def _finished(self, future: Future, executor, inner: Future = None, error: BaseException = None,
+                  collect_metrics: bool = False):
+        with self._lock:
+            self._running -= 1
+        result = None
+        if inner is not None:
+            error = CancelledError() if inner.cancelled() else inner.exception()
+            if error is None:
+                result = inner.result()
+                if collect_metrics:
+                    succeeded, result, metrics = result
+                    crew_metrics.merge(metrics)
+                    if not succeeded:
+                        error = result
+        if isinstance(error, BrokenProcessPool) and self._on_broken is not None:
+            # Um worker morreu (ex.: falta de memória); o pool é recriado na próxima execução
+            self._on_broken(executor)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+        self._dispatch()
+        with self._idle:
+            self._idle.notify_all()
+
+    def cancel_pending(self):
+        """
+        Cancela as execuções que ainda aguardam na fila
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for _, _, future, _, _, _ in pending:
+            future.cancel()
+
+    def join(self):
+        """
+        Aguarda a fila esvaziar e as execuções em andamento terminarem
+        """
+        with self._idle:
+            self._idle.wait_for(lambda: not self._pending and not self._running)
+
+#-------------------------------------------------------------------
+class JobManager:
+    """
+    Pool limitado de executores da crew com fila de tamanho máximo e prioridades.
+
+    Cada execução ocupa uma vaga enquanto estiver na fila ou rodando. Cada prioridade
+    só é admitida enquanto a ocupação estiver abaixo da sua fração das vagas
+    (workers + fila); acima dela, novas submissões são recusadas com 'QueueFullError'
+    em vez de se acumularem. Na fila, execuções mais prioritárias passam à frente.
+
+    Com o executor "process", as execuções rodam em processos criados a partir de um
+    processo 'forkserver' que já importou a crew e criou os clientes LLM (CREW_PRELOAD):
+    cada worker nasce pronto e compartilha essa memória por cópia-na-escrita. Os workers
+    são substituídos a cada 'max_tasks_per_child' execuções, limitando o crescimento de memória.
+    Os workers em processos não usam o cache semântico de pesquisas, que pertence ao processo da API,
+    e as métricas registradas em cada execução voltam com o resultado e são somadas às da API.
+    """
+
+    def __init__(self, runner: Callable, max_workers: Optional[int] = None,
+                 max_queue: Optional[int] = None, executor: str = "thread",
+                 max_finished: int = 1000, max_tasks_per_child: Optional[int] = 50,
+                 admission: Optional[dict] = None, preload: Tuple[str, ...] = ("Api.preload",)):
+        """
+        Args:
+            runner (Callable): Função executada para cada job (ex.: 'create_crew').
+                Com executor "process" precisa ser uma função de módulo (picklable).
+            max_workers (int): Número de execuções simultâneas. Padrão: um worker por núcleo
+                com executor "process", ou até 4 threads.
+            max_queue (int): Número de jobs que podem aguardar por um worker livre.
+            executor (str): "thread" ou "process".
+            max_finished (int): Quantos jobs finalizados manter para consulta.
+            max_tasks_per_child (int): Execuções de cada processo worker antes de ser
+                substituído (None ou 0 mantém os workers). Só com executor "process".
+            admission (dict): Fração das vagas que cada prioridade pode ocupar.
+            preload (Tuple[str, ...]): Módulos importados uma única vez pelo 'forkserver'.
+        """
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Tipo de executor não suportado: {executor}")
+
+        self.runner = runner
+        default_workers = available_cores() if executor == "process" else min(4, available_cores())
+        self.max_workers = max_workers or default_workers
+        self.max_queue = self.max_workers * 4 if max_queue is None else max_queue
+        self.executor_kind = executor
+        self.max_finished = max_finished
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self.admission = {**DEFAULT_ADMISSION, **(admission or {})}
+        self.preload = tuple(preload)
+
+        self._executor = None
+        self._local_executor = None
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        # Uma única fila e um único limite de execuções simultâneas para os jobs enviados aos
+        # workers e para os locais (streaming, etapas do lote), mesmo quando rodam em pools diferentes
+        self._dispatcher = _PriorityDispatcher(
+            self._get_executor, self.max_workers, self._reset_executor, collect_metrics=executor == "process",
+            get_local_executor=self._get_local_executor if executor == "process" else None,
+        )
+
+    #-------------------------------------------------------------
+    @classmethod
+    def from_env(cls, runner: Callable) -> "JobManager":
+        """
+        Cria o gerenciador a partir das variáveis de ambiente CREW_EXECUTOR,
+        CREW_MAX_WORKERS, CREW_MAX_QUEUE, CREW_MAX_TASKS_PER_CHILD, CREW_ADMISSION
+        (ex.: "high=1,normal=0.8,low=0.5") e CREW_PRELOAD (módulos separados por vírgula).
+        """
+        max_workers = os.getenv("CREW_MAX_WORKERS")
+        max_queue = os.getenv("CREW_MAX_QUEUE")
+        preload = os.getenv("CREW_PRELOAD", "Api.preload")
+        return cls(
+            runner,
+            max_workers=int(max_workers) if max_workers else None,
+            max_queue=int(max_queue) if max_queue else None,
+            executor=os.getenv("CREW_EXECUTOR", "thread").lower(),
+            max_tasks_per_child=int(os.getenv("CREW_MAX_TASKS_PER_CHILD", "50")),
+            admission=parse_admission(os.getenv("CREW_ADMISSION", "")),
+            preload=tuple(filter(None, (module.strip() for module in preload.split(",")))),
+        )
+
+    #-------------------------------------------------------------
+    @property
+    def capacity(self) -> int:
+        """
+        Total de vagas: execuções simultâneas mais a fila de espera
+        """
+        return self.max_workers + self.max_queue
+
+    def limit(self, priority: str) -> int:
+        """
+        Vagas que podem estar ocupadas para que um job da prioridade ainda seja admitido
+        """
+        return max(1, math.ceil(self.capacity * self.admission[priority]))
+
+    #-------------------------------------------------------------
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.executor_kind == "process":
+                    # O forkserver importa os módulos pesados uma única vez; cada worker é uma cópia dele
+                    context = multiprocessing.get_context("forkserver")
+                    context.set_forkserver_preload(list(self.preload))
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=context,
+                        max_tasks_per_child=self.max_tasks_per_child, initializer=_init_worker,
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="crew-worker"
+                    )
+            return self._executor
+
+    def _reset_executor(self, broken):
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _get_local_executor(self):
+        with self._lock:
+            if self._local_executor is None:
+                self._local_executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="crew-local"
+                )
+            return self._local_executor
+
+    def start(self):
+        """
+        Cria o pool antecipadamente. Com executor "process", inicia o forkserver
+        (que importa os módulos de CREW_PRELOAD) e todos os workers.
+        """
+        executor = self._get_executor()
+        if self.executor_kind == "process":
+            for future in [executor.submit(os.getpid) for _ in range(self.max_workers)]:
+                future.result()
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._inflight -= 1
+
+    def _submit(self, fn: Callable, *args, local: bool = False, priority: str = "normal") -> Future:
+        """
+        Reserva uma vaga e coloca a função na fila da sua prioridade.
+
+        Raises:
+            QueueFullError: Se a ocupação já tiver atingido o limite da prioridade.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Prioridade desconhecida: {priority}")
+
+        with self._lock:
+            limit = self.limit(priority)
+            if self._inflight >= limit:
+                JOB_ADMISSIONS.inc(priority=priority, result="rejected")
+                raise QueueFullError(
+                    f"Fila de geração cheia para prioridade {priority} ({self._inflight}/{limit}), "
+                    "tente novamente mais tarde"
+                )
+            self._inflight += 1
+        JOB_ADMISSIONS.inc(priority=priority, result="admitted")
+
+        future = self._dispatcher.submit(priority, fn, *args, local=local)
+        future.add_done_callback(self._release)
+        return future
+
+    #-------------------------------------------------------------
+    def submit(self, *args, priority: str = "normal") -> Job:
+        """
+        Envia uma execução do runner ao pool e retorna imediatamente.
+
+        Returns:
+            Job: Job criado, consultável depois por 'get(job.id)'.
+        """
+        future = self._submit(self.runner, *args, priority=priority)
+        job = Job(id=uuid.uuid4().hex, args=args, future=future)
+
+        def _mark_finished(_future):
+            job.finished_at = time.time()
+
+        future.add_done_callback(_mark_finished)
+
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        return job
+
+    def _prune(self):
+        # Descarta os jobs finalizados mais antigos além do limite de retenção
+        finished = [job_id for job_id, job in self._jobs.items() if job.future.done()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Retorna o job com o id informado, ou None se não existir
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    #-------------------------------------------------------------
+    async def run(self, *args, priority: str = "normal") -> Any:
+        """
+        Executa o runner no pool e aguarda o resultado sem bloquear o event loop.
+
+        Raises:
+            QueueFullError: Se a ocupação já tiver atingido o limite da prioridade.
+        """
+        future = self._submit(self.runner, *args, priority=priority)
+        return await asyncio.wrap_future(future)
+
+    def submit_local(self, *args, priority: str = "normal") -> Future:
+        """
+        Envia uma execução do runner a uma thread do processo atual, sob o mesmo
+        limite de vagas. Necessário quando algum argumento não pode ser enviado
+        a outro processo, como o callback de eventos do streaming.
+
+        Raises:
+            QueueFullError: Se a ocupação já tiver atingido o limite da prioridade.
+        """
+        return self._submit(self.runner, *args, local=True, priority=priority)
+
+    def submit_task(self, fn: Callable, *args, priority: str = "normal") -> Future:
+        """
+        Envia uma função qualquer a uma thread do processo atual, ocupando uma vaga
+        como as execuções do runner (ex.: as etapas da geração em lote).
+
+        Raises:
+            QueueFullError: Se a ocupação já tiver atingido o limite da prioridade.
+        """
+        return self._submit(fn, *args, local=True, priority=priority)
+
+    def admits(self, priority: str = "normal") -> bool:
+        """
+        Se uma nova execução com a prioridade informada seria admitida agora
+        """
+        with self._lock:
+            return self._inflight < self.limit(priority)
+
+    #-------------------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Retorna a ocupação atual do pool
+        """
+        with self._lock:
+            inflight = self._inflight
+        pending = self._dispatcher.pending()
+        return {
+            "executor": self.executor_kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "inflight": inflight,
+            "queued": sum(pending.values()),
+            "queued_by_priority": pending,
+            "admission_limits": {priority: self.limit(priority) for priority in PRIORITIES},
+        }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Encerra o executor, se já tiver sido criado. Com wait=True aguarda também os
+        jobs que estão na fila; com wait=False eles são cancelados.
+        """
+        if wait:
+            self._dispatcher.join()
+        else:
+            self._dispatcher.cancel_pending()
+        with self._lock:
+            executors = {self._executor, self._local_executor} - {None}
+            self._executor = self._local_executor = None
+        for executor in executors:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Literal, Optional
 
 #-------------------------------------------------------------------
 class ArticleRequest(BaseModel):
@@ -8,6 +8,30 @@ class ArticleRequest(BaseModel):
     """
     topic: str = Field(..., description="Tópico sobre o qual o artigo será gerado")
     min_words: int = Field(300, description="Número mínimo de palavras do artigo")
+    max_words: Optional[int] = Field(
+        None, gt=0, description="Número máximo de palavras do artigo; a geração é interrompida ao atingi-lo, "
+                                "no fim da última frase completa"
+    )
+    priority: Literal["high", "normal", "low"] = Field(
+        "normal", description="Prioridade na fila de geração; com a fila cheia, prioridades menores são recusadas antes"
+    )
+    profile: Optional[Literal["lean", "standard", "full-edit"]] = Field(
+        None, description="Perfil do pipeline: lean (pesquisa curta e escrita), standard (pesquisa e escrita) "
+                          "ou full-edit (pesquisa, escrita e revisão). Padrão: standard"
+    )
+    latency_budget: Optional[float] = Field(
+        None, gt=0, description="Tempo máximo desejado, em segundos; o servidor executa o perfil mais completo "
+                                "(até o pedido) cuja duração estimada caiba nesse tempo"
+    )
+
+    @model_validator(mode="after")
+    def check_word_range(self):
+        """
+        Garante que o tamanho máximo não seja menor que o mínimo
+        """
+        if self.max_words is not None and self.max_words < self.min_words:
+            raise ValueError("max_words deve ser maior ou igual a min_words")
+        return self
 
 #-------------------------------------------------------------------
 class ArticleResponse(BaseModel):
@@ -18,4 +42,45 @@ class ArticleResponse(BaseModel):
     title: str = Field(..., description="Título do artigo")
     content: str = Field(..., description="Conteúdo do artigo")
     word_count: int = Field(..., description="Contagem de palavras do artigo")
-    references: List[str] = Field(default=[], description="Referências utilizadas no artigo")
\ No newline at end of file
+    references: List[str] = Field(default=[], description="Referências utilizadas no artigo")
+    research_tokens_saved: Optional[int] = Field(default=None, description="Tokens da pesquisa removidos pela compactação antes da escrita")
+    profile: Optional[str] = Field(default=None, description="Perfil do pipeline efetivamente executado")
+    stage_timings: Optional[Dict[str, float]] = Field(default=None, description="Duração de cada etapa executada, em segundos")
+    reused_stages: Optional[List[str]] = Field(default=None, description="Etapas reaproveitadas de um checkpoint ou do cache semântico")
+
+#-------------------------------------------------------------------
+class JobResponse(BaseModel):
+    """
+    Modelo para a resposta de um job assíncrono de geração de artigo
+    """
+    job_id: str = Field(..., description="Identificador do job")
+    status: str = Field(..., description="Estado do job: pending, running, completed, failed ou cancelled")
+    topic: str = Field(..., description="Tópico do artigo")
+    result: Optional[ArticleResponse] = Field(default=None, description="Artigo gerado, quando o job estiver concluído")
+    error: Optional[str] = Field(default=None, description="Mensagem de erro, quando o job falhar")
+
+#-------------------------------------------------------------------
+class BatchItemResponse(BaseModel):
+    """
+    Modelo de cada linha (NDJSON) da resposta da geração de artigos em lote
+    """
+    index: int = Field(..., description="Posição da requisição na lista enviada")
+    topic: str = Field(..., description="Tópico do artigo")
+    status: str = Field(..., description="Estado do item: completed ou failed")
+    cached: bool = Field(default=False, description="Se o artigo veio do cache")
+    result: Optional[ArticleResponse] = Field(default=None, description="Artigo gerado, quando o item for concluído")
+    error: Optional[str] = Field(default=None, description="Mensagem de erro, quando o item falhar")
+
+#-------------------------------------------------------------------
+class CheckpointResponse(BaseModel):
+    """
+    Modelo de um checkpoint (saída gravada de uma tarefa do pipeline)
+    """
+    id: str = Field(..., description="Identificador do checkpoint")
+    topic: str = Field(..., description="Tópico da execução")
+    task: str = Field(..., description="Tarefa concluída: research, writing ou editing")
+    definition: str = Field(..., description="Resumo da definição da tarefa (descrição, saída esperada e modelos)")
+    created_at: float = Field(..., description="Momento da gravação (timestamp Unix)")
+    metadata: Dict[str, Any] = Field(default={}, description="Informações extras da execução (ex.: min_words)")
+    size: Optional[int] = Field(default=None, description="Tamanho da saída em caracteres, na listagem")
+    output: Optional[str] = Field(default=None, description="Saída da tarefa, na consulta de um checkpoint")
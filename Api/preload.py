@@ -0,0 +1,15 @@
+# Módulo importado uma única vez pelo processo 'forkserver' do pool de workers da crew
+# (CREW_EXECUTOR=process, CREW_PRELOAD). Cada worker é criado como cópia desse processo e
+# já nasce com o crewai, o langchain e os clientes LLM carregados, compartilhando essa
+# memória por cópia-na-escrita em vez de importar tudo de novo.
+
+import crew_length
+import crew_logic  # noqa: F401
+from Agents.LLMRegistry import llm_registry
+from crew_logging import get_logger
+
+try:
+    llm_registry.warm_up(variants=crew_length.writer_variants())
+except Exception as e:
+    # Sem as chaves de API os clientes são criados (e o erro informado) na primeira execução
+    get_logger("worker").warning("clientes LLM não pré-carregados: %s", e)
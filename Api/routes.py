@@ -1,40 +1,433 @@
-from fastapi import FastAPI, HTTPException
-from Api.models import ArticleRequest, ArticleResponse
-from main import create_crew
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import List, Optional
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from Api.models import ArticleRequest, ArticleResponse, BatchItemResponse, CheckpointResponse, JobResponse
+from Api.jobs import JobManager, QueueFullError, run_crew, run_research, run_writing
+from Api.batch import BatchRunner
+from Api.cache import (
+    ARTICLE_CACHE_REQUESTS, ArticleCache, SingleFlight, article_cache_key,
+    semantic_article_lookup, semantic_article_store,
+)
+from crew_checkpoints import get_checkpoint_store
+from crew_profiles import PROFILES, choose_profile, stage_estimates
+from crew_metrics import Histogram, render_prometheus
+
+# As dependências pesadas (crewai, langchain, chromadb) e a crew só são carregadas
+# na primeira geração de artigo ou pelo aquecimento ('warm_up'), nunca na importação.
 
 #-------------------------------------------------------------------
-app = FastAPI(
-    title="Article Generator API",
-    description="API para geração de artigos usando CrewAI",
-    version="1.0.0"
+router = APIRouter()
+
+# Pool de execução da crew, configurado por CREW_EXECUTOR, CREW_MAX_WORKERS, CREW_MAX_QUEUE,
+# CREW_MAX_TASKS_PER_CHILD, CREW_ADMISSION e CREW_PRELOAD
+jobs = JobManager.from_env(run_crew)
+
+# Cache dos artigos gerados (ARTICLE_CACHE_TTL, ARTICLE_CACHE_SIZE) e agrupamento de requisições idênticas simultâneas
+article_cache = ArticleCache.from_env()
+inflight = SingleFlight()
+
+# Geração em lote (BATCH_RESEARCH_CONCURRENCY, BATCH_WRITE_CONCURRENCY e limites por provedor), com as
+# etapas ocupando as vagas do pool de execução da crew
+batch = BatchRunner.from_env(run_research, run_writing, jobs.submit_task)
+
+# Sinaliza que as dependências e os clientes LLM já foram carregados
+warmed_up = threading.Event()
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duração das requisições HTTP da API (até o início da resposta, no caso de streaming)",
+    labelnames=("method", "route", "status"),
 )
 
 #-------------------------------------------------------------------
-@app.post("/generate-article/", response_model=ArticleResponse)
-async def generate_article(request: ArticleRequest):
+def _queue_full(error: QueueFullError) -> HTTPException:
     """
-    Endpoint para gerar um artigo sobre um tópico específico
+    Converte a saturação do pool em uma resposta 429
     """
-    try:
-        result = create_crew(request.topic)
-        
-        # Formata a resposta usando o modelo Pydantic
-        response = ArticleResponse(
-            topic=request.topic,
-            title=result.get("title", f"Artigo sobre {request.topic}"),
-            content=result.get("content", ""),
-            word_count=len(result.get("content", "").split()),
-            references=result.get("references", [])
+    return HTTPException(status_code=429, detail=str(error), headers={"Retry-After": "5"})
+
+def _build_response(topic: str, result) -> ArticleResponse:
+    """
+    Formata o resultado da crew usando o modelo Pydantic
+    """
+    return ArticleResponse(
+        topic=topic,
+        title=result.get("title", f"Artigo sobre {topic}"),
+        content=result.get("content", ""),
+        word_count=len(result.get("content", "").split()),
+        references=result.get("references", []),
+        research_tokens_saved=result.get("research_tokens_saved"),
+        profile=result.get("profile"),
+        stage_timings=result.get("stage_timings"),
+        reused_stages=result.get("reused_stages")
+    )
+
+def _profile(request: ArticleRequest) -> str:
+    """
+    Perfil do pipeline a executar, a partir do perfil e do orçamento de latência pedidos
+    """
+    return choose_profile(request.profile, request.latency_budget)
+
+def _record_timings(result):
+    """
+    Atualiza as durações estimadas de cada perfil com as etapas medidas na execução. As etapas
+    reaproveitadas de um checkpoint ou do cache semântico não foram executadas e são ignoradas.
+    """
+    if result.get("profile") in PROFILES:
+        reused = set(result.get("reused_stages") or ())
+        timings = {stage: seconds for stage, seconds in (result.get("stage_timings") or {}).items() if stage not in reused}
+        stage_estimates.record(result["profile"], timings)
+
+async def _cached_article(request: ArticleRequest, profile: str):
+    """
+    Procura o artigo no cache exato e, em seguida, no cache semântico (tópicos parecidos)
+
+    Returns:
+        tuple: (ArticleResponse ou None, "hit", "semantic" ou "miss")
+    """
+    cached = article_cache.get(article_cache_key(request.topic, request.min_words, profile, request.max_words))
+    if cached is not None:
+        return cached, "hit"
+    similar = await asyncio.to_thread(
+        semantic_article_lookup, request.topic, request.min_words, profile, request.max_words
+    )
+    if similar is not None:
+        # O artigo foi gerado para o tópico parecido; a resposta informa o tópico pedido
+        return ArticleResponse(**{**similar, "topic": request.topic}), "semantic"
+    return None, "miss"
+
+async def _store_article(request: ArticleRequest, profile: str, article: ArticleResponse):
+    """
+    Guarda o artigo gerado nos caches exato e semântico
+    """
+    article_cache.set(article_cache_key(request.topic, request.min_words, profile, request.max_words), article)
+    await asyncio.to_thread(semantic_article_store, request.topic, request.min_words, article.model_dump(), profile)
+
+#-------------------------------------------------------------------
+@router.post("/generate-article/", response_model=ArticleResponse)
+async def generate_article(request: ArticleRequest, response: Response):
+    """
+    Endpoint para gerar um artigo sobre um tópico específico.
+
+    O cabeçalho X-Cache indica se o artigo veio do cache (hit), do artigo de um
+    tópico parecido (semantic), de uma geração idêntica já em andamento (coalesced)
+    ou de uma nova execução da crew (miss). O perfil executado e a duração de cada
+    etapa vêm em 'profile' e 'stage_timings'.
+    """
+    profile = _profile(request)
+    cached, status = await _cached_article(request, profile)
+    if cached is not None:
+        ARTICLE_CACHE_REQUESTS.inc(result=status)
+        response.headers["X-Cache"] = status
+        return cached
+
+    async def generate():
+        result = await jobs.run(
+            request.topic, request.min_words, None, profile, request.max_words, priority=request.priority
         )
-        
-        return response
+        _record_timings(result)
+        article = _build_response(request.topic, result)
+        await _store_article(request, profile, article)
+        return article
+
+    key = article_cache_key(request.topic, request.min_words, profile, request.max_words)
+
+    try:
+        article, coalesced = await inflight.do(key, generate)
+    except QueueFullError as e:
+        raise _queue_full(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    status = "coalesced" if coalesced else "miss"
+    ARTICLE_CACHE_REQUESTS.inc(result=status)
+    response.headers["X-Cache"] = status
+    return article
+
+#-------------------------------------------------------------------
+def _sse(event: str, data) -> str:
+    """
+    Formata um evento no padrão Server-Sent Events
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/generate-article/stream")
+async def generate_article_stream(request: ArticleRequest):
+    """
+    Endpoint que gera o artigo enviando o progresso via Server-Sent Events:
+    início/fim de cada tarefa (o fim da pesquisa traz o resumo pesquisado),
+    o perfil escolhido, o resultado da compactação da pesquisa, os tokens do escritor conforme são produzidos
+    e, por fim, o artigo completo.
+    """
+    profile = _profile(request)
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_event(event, data):
+        # Chamado na thread da crew; repassa o evento ao event loop
+        loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+    try:
+        future = asyncio.wrap_future(
+            jobs.submit_local(
+                request.topic, request.min_words, on_event, profile, request.max_words, priority=request.priority
+            )
+        )
+    except QueueFullError as e:
+        raise _queue_full(e)
+
+    # Sinaliza o fim da execução depois de todos os eventos já enfileirados
+    future.add_done_callback(lambda _: queue.put_nowait(None))
+
+    async def events():
+        while (item := await queue.get()) is not None:
+            yield _sse(*item)
+
+        try:
+            result = future.result()
+            _record_timings(result)
+            article = _build_response(request.topic, result)
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+            return
+        yield _sse("article", article.model_dump())
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 #-------------------------------------------------------------------
-@app.get("/health/")
+@router.post("/generate-articles/")
+async def generate_articles(requests: List[ArticleRequest]):
+    """
+    Endpoint para gerar vários artigos de uma vez.
+
+    A resposta é NDJSON: uma linha (BatchItemResponse) por artigo, na ordem em
+    que cada um termina. Tópicos repetidos são pesquisados uma única vez, e a
+    falha de um item é informada na sua linha sem interromper o lote. Para que a
+    pesquisa seja compartilhada, todos os itens usam o perfil "standard".
+    As etapas do lote ocupam as vagas do pool de execução; com o pool saturado
+    para todas as prioridades do lote, a resposta é 429.
+    """
+    pending, cached_items = [], []
+    for index, request in enumerate(requests):
+        cached, status = await _cached_article(request, "standard")
+        ARTICLE_CACHE_REQUESTS.inc(result=status)
+        if cached is None:
+            pending.append((index, request))
+        else:
+            cached_items.append(
+                BatchItemResponse(index=index, topic=request.topic, status="completed", cached=True, result=cached)
+            )
+
+    if pending and not any(jobs.admits(request.priority) for _, request in pending):
+        raise _queue_full(QueueFullError("Fila de geração cheia, tente novamente mais tarde"))
+
+    async def lines():
+        for item in cached_items:
+            yield item.model_dump_json() + "\n"
+
+        async for index, request, result, error in batch.run(pending):
+            item = BatchItemResponse(index=index, topic=request.topic, status="completed")
+            try:
+                if error is not None:
+                    raise error
+                item.result = _build_response(request.topic, {**result, "profile": "standard"})
+                await _store_article(request, "standard", item.result)
+            except Exception as e:
+                item.status, item.error = "failed", str(e)
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+#-------------------------------------------------------------------
+@router.post("/jobs/", response_model=JobResponse, status_code=202)
+async def create_job(request: ArticleRequest):
+    """
+    Endpoint que enfileira a geração de um artigo e retorna o id do job imediatamente
+    """
+    try:
+        job = jobs.submit(
+            request.topic, request.min_words, None, _profile(request), request.max_words, priority=request.priority
+        )
+    except QueueFullError as e:
+        raise _queue_full(e)
+
+    return JobResponse(job_id=job.id, status=job.status, topic=request.topic)
+
+#-------------------------------------------------------------------
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Endpoint para consultar o estado e o resultado de um job
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job não encontrado: {job_id}")
+
+    topic = job.args[0]
+    response = JobResponse(job_id=job.id, status=job.status, topic=topic)
+
+    if response.status == "completed":
+        try:
+            response.result = _build_response(topic, job.future.result())
+        except Exception as e:
+            response.status, response.error = "failed", str(e)
+    elif response.status == "failed":
+        response.error = str(job.future.exception())
+
+    return response
+
+#-------------------------------------------------------------------
+def _checkpoint_store():
+    """
+    Retorna o armazenamento de checkpoints, ou responde 404 se estiver desativado (CHECKPOINTS=0)
+    """
+    store = get_checkpoint_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Checkpoints desativados")
+    return store
+
+@router.get("/checkpoints/", response_model=List[CheckpointResponse])
+async def list_checkpoints(topic: Optional[str] = None, task: Optional[str] = None):
+    """
+    Endpoint que lista os checkpoints válidos (sem a saída das tarefas), filtrados por tópico e/ou tarefa
+    """
+    store = _checkpoint_store()
+    return await asyncio.to_thread(store.list, topic, task)
+
+@router.get("/checkpoints/{checkpoint_id}", response_model=CheckpointResponse)
+async def get_checkpoint(checkpoint_id: str):
+    """
+    Endpoint que retorna um checkpoint com a saída gravada da tarefa
+    """
+    entry = await asyncio.to_thread(_checkpoint_store().load, checkpoint_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Checkpoint não encontrado: {checkpoint_id}")
+    return entry
+
+@router.delete("/checkpoints/{checkpoint_id}")
+async def delete_checkpoint(checkpoint_id: str):
+    """
+    Endpoint que invalida um checkpoint, fazendo a tarefa ser executada de novo na próxima geração
+    """
+    if not await asyncio.to_thread(_checkpoint_store().delete, checkpoint_id):
+        raise HTTPException(status_code=404, detail=f"Checkpoint não encontrado: {checkpoint_id}")
+    return {"deleted": 1}
+
+@router.delete("/checkpoints/")
+async def invalidate_checkpoints(topic: Optional[str] = None, task: Optional[str] = None):
+    """
+    Endpoint que invalida os checkpoints do tópico e/ou da tarefa (todos, sem filtros)
+    """
+    store = _checkpoint_store()
+    return {"deleted": await asyncio.to_thread(store.invalidate, topic, task)}
+
+#-------------------------------------------------------------------
+@router.get("/health/")
 async def health_check():
     """
     Endpoint para verificar a saúde da API
     """
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+#-------------------------------------------------------------------
+@router.get("/ready/")
+async def readiness_check():
+    """
+    Endpoint que indica se as dependências e os clientes LLM já foram carregados
+    """
+    if not warmed_up.is_set():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready"}
+
+#-------------------------------------------------------------------
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Endpoint com as métricas do processo no formato de texto do Prometheus, incluindo as
+    das execuções concluídas nos workers em processos (CREW_EXECUTOR=process)
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+#-------------------------------------------------------------------
+def warm_up(ping: bool = False):
+    """
+    Carrega as dependências pesadas da crew e cria os clientes LLM compartilhados e o cache semântico.
+    Com CREW_EXECUTOR=process, também inicia o forkserver e os processos workers.
+
+    Args:
+        ping (bool): Se True, também faz uma chamada mínima a cada modelo para abrir as conexões.
+    """
+    import crew_length
+    import crew_logic  # noqa: F401
+    from Agents.LLMRegistry import llm_registry
+    from crew_semantic_cache import get_semantic_cache
+
+    llm_registry.warm_up(ping=ping, variants=crew_length.writer_variants())
+    get_semantic_cache()
+    if jobs.executor_kind == "process":
+        jobs.start()
+    warmed_up.set()
+
+def create_app() -> FastAPI:
+    """
+    Cria a aplicação FastAPI.
+
+    O aquecimento é controlado por APP_WARMUP: "background" (padrão) aquece em
+    segundo plano sem atrasar o início do servidor, "startup" só começa a aceitar
+    requisições depois de aquecer e "off" deixa o carregamento para a primeira
+    geração. Com LLM_WARMUP_PING=1 o aquecimento também abre as conexões com os LLMs.
+    """
+    application = FastAPI(
+        title="Article Generator API",
+        description="API para geração de artigos usando CrewAI",
+        version="1.0.0"
+    )
+    application.include_router(router)
+
+    @application.middleware("http")
+    async def record_request_duration(request: Request, call_next):
+        # Mede cada requisição pelo caminho da rota (ex.: /jobs/{job_id}), não pela URL
+        start = time.perf_counter()
+        response = await call_next(request)
+        route = getattr(request.scope.get("route"), "path", "desconhecida")
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start, method=request.method, route=route, status=response.status_code
+        )
+        return response
+
+    @application.on_event("startup")
+    async def start_warm_up():
+        mode = os.getenv("APP_WARMUP", "background").lower()
+        ping = os.getenv("LLM_WARMUP_PING", "0") == "1"
+        if mode == "startup":
+            await asyncio.to_thread(warm_up, ping)
+        elif mode == "background":
+            application.state.warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up, ping))
+
+    @application.on_event("shutdown")
+    def shutdown_jobs():
+        # Encerra os pools de execução da crew junto com a aplicação
+        jobs.shutdown(wait=False)
+
+    return application
+
+def start_server(host: str = "0.0.0.0", port: int = 8000):
+    """
+    Inicia o servidor uvicorn com a aplicação
+    """
+    import uvicorn
+
+    uvicorn.run("Api.routes:create_app", factory=True, host=host, port=port)
+
+#-------------------------------------------------------------------
+app = create_app()
\ No newline at end of file
@@ -0,0 +1,368 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from Benchmarks.StubServers import start_fake_llm, start_fake_wikipedia
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Métricas comparadas com a linha de base: True quando um valor maior é melhor
+COMPARED = {
+    "throughput_rps": True,
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "latency_p99_ms": False,
+    "memory_peak_mb": False,
+}
+
+# Linhas do contador do cache de artigos em /metrics, ex.: article_cache_requests_total{result="hit"} 3
+CACHE_METRIC_RE = re.compile(r'^article_cache_requests_total\{result="(\w+)"\} ([\d.e+]+)$', re.MULTILINE)
+
+#-------------------------------------------------------------------
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """
+    Percentil 'q' (0 a 100) por interpolação linear, ou None sem valores
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def summarize(latencies: List[float], errors: int, duration: float) -> dict:
+    """
+    Resume as latências (em segundos) de uma rodada de carga
+    """
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    completed = len(latencies)
+    return {
+        "requests": completed + errors,
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(completed / duration, 2) if duration > 0 else 0.0,
+        "latency_mean_ms": ms(sum(latencies) / completed) if completed else None,
+        "latency_p50_ms": ms(percentile(latencies, 50)),
+        "latency_p95_ms": ms(percentile(latencies, 95)),
+        "latency_p99_ms": ms(percentile(latencies, 99)),
+    }
+
+#-------------------------------------------------------------------
+async def generate_load(base_url: str, requests: int, concurrency: int, topics: int = 0,
+                        min_words: int = 300, prefix: str = "Tópico de carga", timeout: float = 300) -> dict:
+    """
+    Envia 'requests' requisições de geração de artigo com 'concurrency' clientes simultâneos.
+
+    Args:
+        base_url (str): Endereço da API.
+        topics (int): Quantidade de tópicos distintos. 0 usa um tópico por requisição,
+            sem aproveitamento do cache de artigos.
+        min_words (int): Tamanho pedido em cada requisição.
+        prefix (str): Prefixo dos nomes dos tópicos.
+
+    Returns:
+        dict: Resumo da rodada (ver 'summarize').
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(f"{prefix} {i % topics if topics else i}")
+
+    latencies, errors = [], [0]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def worker():
+            while not queue.empty():
+                topic = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/generate-article/", json={"topic": topic, "min_words": min_words})
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors[0] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        duration = time.perf_counter() - start
+
+    return summarize(latencies, errors[0], duration)
+
+#-------------------------------------------------------------------
+def _rss_mb(pid: int) -> Optional[float]:
+    # Memória residente do processo, lida de /proc (Linux)
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+def _children(pid: int) -> List[int]:
+    # Workers do uvicorn (processos filhos diretos), lidos de /proc (Linux)
+    children = []
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else ():
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as file:
+                fields = file.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) != pid:
+            continue
+        # O rastreador de recursos do multiprocessing também é filho do uvicorn, mas não atende requisições
+        try:
+            with open(f"/proc/{entry}/cmdline", "rb") as file:
+                if b"resource_tracker" in file.read():
+                    continue
+        except OSError:
+            continue
+        children.append(int(entry))
+    return children
+
+class MemorySampler:
+    """
+    Mede periodicamente a memória residente do servidor e de cada worker
+    """
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.peaks: Dict[int, float] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def sample(self):
+        """
+        Registra a memória atual do servidor e dos workers
+        """
+        # Com vários workers, o processo principal só os gerencia; sem workers, ele atende as requisições
+        pids = _children(self.pid) or [self.pid]
+        for pid in pids:
+            rss = _rss_mb(pid)
+            if rss is not None:
+                self.peaks[pid] = max(rss, self.peaks.get(pid, 0.0))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+    def summary(self) -> dict:
+        """
+        Pico de memória por worker, em MB
+        """
+        peaks = sorted(self.peaks.values())
+        return {
+            "workers_measured": len(peaks),
+            "memory_peak_mb": round(max(peaks), 1) if peaks else None,
+            "memory_per_worker_mb": [round(peak, 1) for peak in peaks],
+        }
+
+#-------------------------------------------------------------------
+def start_api(port: int, workers: int, env: dict, ready_timeout: float = 120) -> subprocess.Popen:
+    """
+    Inicia a API real (Api.routes:create_app) com uvicorn e espera ela ficar pronta (/ready/)
+    """
+    command = [
+        sys.executable, "-m", "uvicorn", "Api.routes:create_app", "--factory",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--no-access-log",
+    ]
+    process = subprocess.Popen(command, cwd=ROOT, env={**os.environ, **env},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + ready_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"A API terminou durante a inicialização (código {process.returncode})")
+        try:
+            # Cada worker aquece separadamente; uma resposta 200 indica que ao menos um está pronto
+            if httpx.get(f"http://127.0.0.1:{port}/ready/", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError("A API não ficou pronta dentro do tempo limite")
+
+def benchmark_env(llm_url: str, wikipedia_url: str, cache: bool = False) -> dict:
+    """
+    Variáveis de ambiente que apontam a API para os servidores falsos.
+
+    Args:
+        cache (bool): Se True, mantém os caches de artigos e o semântico ligados,
+            para medir o aproveitamento de tópicos repetidos ('topics').
+    """
+    env = {
+        "LLM_PROVIDER": "local",
+        "LOCAL_LLM_API_BASE": llm_url,
+        "WIKIPEDIA_API_URL": wikipedia_url,
+        "WIKIPEDIA_BACKEND": "rest",
+        "APP_WARMUP": "background",
+        "LOG_LEVEL": "WARNING",
+        # Nenhuma medição reaproveita checkpoints de execuções anteriores
+        "CHECKPOINTS": "0",
+        # Evita chamadas de telemetria do crewai durante a medição
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+    }
+    if not cache:
+        # Sem --cache, cada medição executa o pipeline completo, sem artigos e pesquisas reaproveitados
+        env.update({"SEMANTIC_CACHE": "0", "ARTICLE_CACHE_TTL": "0"})
+    return env
+
+def cache_requests(metrics: str) -> Dict[str, float]:
+    """
+    Requisições de artigo por resultado do cache, lidas do texto de /metrics
+    """
+    return {result: float(value) for result, value in CACHE_METRIC_RE.findall(metrics)}
+
+def cache_hit_rate(before: Dict[str, float], after: Dict[str, float]) -> Optional[float]:
+    """
+    Fração das requisições entre as duas leituras de 'cache_requests' atendidas sem executar
+    a crew (hit, semantic ou coalesced), ou None se não houve requisições
+    """
+    delta = {result: after.get(result, 0.0) - before.get(result, 0.0) for result in after}
+    total = sum(delta.values())
+    if not total:
+        return None
+    return round((total - delta.get("miss", 0.0)) / total, 4)
+
+def run_benchmark(requests: int = 50, concurrency: int = 8, workers: int = 1, token_latency_ms: float = 1.0,
+                  wikipedia_latency_ms: float = 20.0, topics: int = 0, min_words: int = 300,
+                  port: int = 8765, warmup_requests: int = 2, cache: bool = False) -> dict:
+    """
+    Executa o benchmark completo: servidores falsos, API real e gerador de carga.
+
+    Com 'cache', os caches de artigos ficam ligados e o resultado inclui 'cache_hit_rate'
+    (lida do /metrics de um dos workers, então exata só com um worker).
+
+    Returns:
+        dict: {"config": parâmetros usados, "results": métricas medidas}
+    """
+    config = {
+        "requests": requests, "concurrency": concurrency, "workers": workers,
+        "token_latency_ms": token_latency_ms, "wikipedia_latency_ms": wikipedia_latency_ms,
+        "topics": topics, "min_words": min_words, "cache": cache,
+    }
+
+    with start_fake_llm(token_latency=token_latency_ms / 1000) as llm, \
+            start_fake_wikipedia(latency=wikipedia_latency_ms / 1000) as wikipedia:
+        process = start_api(port, workers, benchmark_env(llm.url, wikipedia.url, cache=cache))
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            if warmup_requests:
+                # Tópicos próprios, para não aquecer o cache com os tópicos medidos
+                asyncio.run(generate_load(base_url, warmup_requests, 1, min_words=min_words, prefix="Aquecimento"))
+            if cache:
+                before = cache_requests(httpx.get(f"{base_url}/metrics").text)
+            with MemorySampler(process.pid) as memory:
+                results = asyncio.run(generate_load(base_url, requests, concurrency, topics, min_words))
+            results.update(memory.summary())
+            if cache:
+                results["cache_hit_rate"] = cache_hit_rate(before, cache_requests(httpx.get(f"{base_url}/metrics").text))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    return {"config": config, "results": results}
+
+#-------------------------------------------------------------------
+def compare(current: dict, baseline: dict, tolerance: float = 0.2) -> List[str]:
+    """
+    Compara uma execução com a linha de base.
+
+    Args:
+        tolerance (float): Piora relativa aceita em cada métrica (0.2 = 20%).
+
+    Returns:
+        list: Descrição de cada regressão encontrada (vazia se não houver).
+    """
+    regressions = []
+    for metric, higher_is_better in COMPARED.items():
+        old, new = baseline["results"].get(metric), current["results"].get(metric)
+        if old is None or new is None or old == 0:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        if worse > tolerance:
+            regressions.append(f"{metric}: {old} -> {new} ({change:+.1%})")
+    if current["results"].get("errors"):
+        regressions.append(f"errors: {current['results']['errors']} requisições falharam")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m Benchmarks.LoadTest",
+        description="Benchmark de ponta a ponta da API com LLM e Wikipedia falsos",
+    )
+    parser.add_argument("--requests", type=int, default=50, help="Total de requisições medidas")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clientes simultâneos")
+    parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn")
+    parser.add_argument("--token-latency-ms", type=float, default=1.0, help="Atraso do LLM falso por token")
+    parser.add_argument("--wikipedia-latency-ms", type=float, default=20.0, help="Atraso do stub da Wikipedia")
+    parser.add_argument("--topics", type=int, default=0,
+                        help="Tópicos distintos (0 = um por requisição); só tem efeito com --cache")
+    parser.add_argument("--cache", action="store_true",
+                        help="Mantém os caches de artigos ligados e mede a taxa de acertos")
+    parser.add_argument("--min-words", type=int, default=300, help="Tamanho pedido em cada artigo")
+    parser.add_argument("--port", type=int, default=8765, help="Porta da API durante o benchmark")
+    parser.add_argument("--output", help="Arquivo JSON onde gravar o resultado")
+    parser.add_argument("--baseline", help="Linha de base (JSON) para comparar o resultado")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Piora relativa aceita (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    if args.topics and not args.cache:
+        parser.error("--topics só tem efeito com --cache (sem ele os caches de artigos ficam desligados)")
+
+    current = run_benchmark(
+        requests=args.requests, concurrency=args.concurrency, workers=args.workers,
+        token_latency_ms=args.token_latency_ms, wikipedia_latency_ms=args.wikipedia_latency_ms,
+        topics=args.topics, min_words=args.min_words, port=args.port, cache=args.cache,
+    )
+    print(json.dumps(current, indent=2, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(current, file, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline.get("config") != current["config"]:
+            print("Aviso: a linha de base foi medida com outra configuração", file=sys.stderr)
+        regressions = compare(current, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import unquote
+
+# Vocabulário dos textos determinísticos gerados pelos servidores falsos
+WORDS = (
+    "energia sistema processo dados pesquisa tecnologia desenvolvimento análise modelo estrutura "
+    "aplicação resultado método impacto ambiente sociedade história ciência produção recurso "
+    "mercado política estudo forma região uso fonte custo eficiência rede capacidade"
+).split()
+
+TOPIC_RE = re.compile(r"sobre (.+?)(?: usando|[.,:\n]|$)")
+MIN_WORDS_RE = re.compile(r"pelo menos (\d+) palavras")
+
+#-------------------------------------------------------------------
+def deterministic_text(seed: str, words: int) -> str:
+    """
+    Texto com 'words' palavras, sempre o mesmo para a mesma semente
+    """
+    rng = random.Random(seed)
+    sentences, count = [], 0
+    while count < words:
+        size = min(rng.randint(8, 16), words - count)
+        sentence = " ".join(rng.choice(WORDS) for _ in range(size))
+        sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        count += size
+    paragraphs = [" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)]
+    return "\n\n".join(paragraphs)
+
+#-------------------------------------------------------------------
+class FakeLLM:
+    """
+    Respostas determinísticas no formato esperado pelos agentes do crewai.
+
+    Um agente com ferramentas recebe primeiro uma chamada à ferramenta da Wikipedia
+    e, depois da observação, a resposta final. A resposta final tem o número de
+    palavras pedido na tarefa ("pelo menos N palavras") ou 'default_words',
+    multiplicado por 'length_factor'.
+    """
+
+    def __init__(self, token_latency: float = 0.0, default_words: int = 120, tool_name: str = "Wikipedia Tool",
+                 length_factor: float = 1.0):
+        """
+        Args:
+            token_latency (float): Segundos de espera por token (palavra) gerado.
+            default_words (int): Tamanho das respostas sem tamanho pedido.
+            tool_name (str): Nome da ferramenta chamada pelos agentes que a têm.
+            length_factor (float): Proporção entre o tamanho gerado e o pedido, para simular
+                modelos que escrevem além (> 1) ou aquém (< 1) do tamanho pedido.
+        """
+        self.token_latency = token_latency
+        self.default_words = default_words
+        self.tool_name = tool_name
+        self.length_factor = length_factor
+
+    def reply(self, messages: List[dict]) -> str:
+        """
+        Resposta à conversa informada
+        """
+        contents = [str(message.get("content", "")) for message in messages]
+        prompt = "\n".join(contents)
+        topic_match = TOPIC_RE.search(prompt)
+        topic = topic_match.group(1).strip() if topic_match else "o tópico"
+
+        answered = any(message.get("role") == "assistant" for message in messages)
+        if f"Action: {self.tool_name}" not in prompt and self.tool_name in prompt and not answered:
+            return (
+                f"Thought: Vou pesquisar {topic} na Wikipedia.\n"
+                f"Action: {self.tool_name}\n"
+                f"Action Input: {json.dumps({'topic': topic}, ensure_ascii=False)}"
+            )
+
+        words_match = MIN_WORDS_RE.search(prompt)
+        words = int(words_match.group(1)) if words_match else self.default_words
+        words = max(1, round(words * self.length_factor))
+        return f"Thought: Já tenho a resposta.\nFinal Answer: # {topic}\n\n{deterministic_text(topic, words)}"
+
+    def tokens(self, text: str) -> List[str]:
+        """
+        Divide a resposta nos pedaços enviados em streaming (uma palavra por token)
+        """
+        return re.findall(r"\S+\s*|\s+", text)
+
+#-------------------------------------------------------------------
+class _FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    llm: FakeLLM
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "not found"}})
+            return
+
+        messages = body.get("messages", [])
+        text = self.llm.reply(messages)
+        for stop in body.get("stop") or []:
+            text = text.split(stop)[0]
+        tokens = self.llm.tokens(text)
+        finish_reason = "stop"
+        if body.get("max_tokens") and len(tokens) > body["max_tokens"]:
+            # Respeita o limite de tokens da resposta, como os provedores reais
+            tokens, finish_reason = tokens[:body["max_tokens"]], "length"
+            text = "".join(tokens)
+        usage = {
+            "prompt_tokens": sum(len(str(m.get("content", "")).split()) for m in messages),
+            "completion_tokens": len(tokens),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        model = body.get("model", "local-model")
+
+        if body.get("stream"):
+            self._stream(model, tokens, usage, finish_reason)
+            return
+
+        time.sleep(self.llm.token_latency * len(tokens))
+        self._json(200, {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": finish_reason}],
+            "usage": usage,
+        })
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, model: str, tokens: List[str], usage: dict, finish_reason: str = "stop"):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(delta, finish_reason=None, **extra):
+            payload = {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+            self._chunk(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode())
+
+        try:
+            event({"role": "assistant", "content": ""})
+            for token in tokens:
+                time.sleep(self.llm.token_latency)
+                event({"content": token})
+            event({}, finish_reason=finish_reason, usage=usage)
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # O cliente interrompeu a geração e fechou a conexão
+            self.close_connection = True
+
+    def _json(self, status: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+#-------------------------------------------------------------------
+class _WikipediaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency: float = 0.0
+    summary_words: int = 80
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        match = re.match(r"^/page/(summary|related)/(.+)$", self.path.split("?")[0])
+        if match is None:
+            self._json(404, {"title": "Not found."})
+            return
+
+        time.sleep(self.latency)
+        endpoint, title = match.group(1), unquote(match.group(2)).replace("_", " ")
+        if endpoint == "summary":
+            self._json(200, {"title": title, "extract": deterministic_text(title, self.summary_words)})
+        else:
+            pages = [
+                {"title": f"{title} ({i})", "extract": deterministic_text(f"{title}-{i}", self.summary_words // 2)}
+                for i in range(1, 4)
+            ]
+            self._json(200, {"pages": pages})
+
+    _json = _FakeLLMHandler._json
+
+#-------------------------------------------------------------------
+class StubServer:
+    """
+    Servidor HTTP local executado em uma thread, para uso em benchmarks e testes
+    """
+
+    def __init__(self, handler, host: str = "127.0.0.1", port: int = 0, path: str = ""):
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        self._server = server
+        self.url = f"http://{host}:{server.server_address[1]}{path}"
+        self._thread = threading.Thread(target=server.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """
+        Encerra o servidor
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def start_fake_llm(token_latency: float = 0.0, default_words: int = 120, host: str = "127.0.0.1",
+                   port: int = 0, length_factor: float = 1.0) -> StubServer:
+    """
+    Inicia o LLM falso, compatível com a API da OpenAI (POST {url}/chat/completions).
+
+    O endereço retornado em 'url' é o valor de LOCAL_LLM_API_BASE para o provedor "local".
+    """
+    handler = type("FakeLLMHandler", (_FakeLLMHandler,), {"llm": FakeLLM(token_latency, default_words, length_factor=length_factor)})
+    return StubServer(handler, host, port, path="/v1")
+
+def start_fake_wikipedia(latency: float = 0.0, summary_words: int = 80, host: str = "127.0.0.1",
+                         port: int = 0) -> StubServer:
+    """
+    Inicia o stub da API REST da Wikipedia (/page/summary e /page/related).
+
+    O endereço retornado em 'url' é o valor de WIKIPEDIA_API_URL.
+    """
+    handler = type("WikipediaHandler", (_WikipediaHandler,), {"latency": latency, "summary_words": summary_words})
+    return StubServer(handler, host, port)
@@ -0,0 +1,9 @@
+# Benchmarks de ponta a ponta da API, executados sem rede: um LLM falso compatível com a API da
+# OpenAI (provedor "local") e um stub da API REST da Wikipedia atendem a API real, que recebe
+# carga concorrente. Exemplo:
+#
+#   python -m Benchmarks.LoadTest --requests 100 --concurrency 16 --workers 2 --output resultado.json
+#   python -m Benchmarks.LoadTest --requests 100 --concurrency 16 --workers 2 --baseline resultado.json
+#
+# Com --baseline, o comando termina com código 1 se a vazão, as latências p50/p95/p99 ou a memória
+# por worker piorarem mais que a tolerância (--tolerance, padrão 20%).
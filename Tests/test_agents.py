@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from Agents.LLMRegistry import LLMRegistry
+from Agents.LLMRouter import LLMRouter, ROUTER_REQUESTS
+from Agents.RateLimit import ProviderLimiter, TokenBucket
+
+#========================================================================
+class TestLLMRegistry(unittest.TestCase):
+    """Testes para o registro compartilhado de clientes LLM"""
+
+    def setUp(self):
+        """Cria um registro vazio com o provedor padrão"""
+        self.registry = LLMRegistry()
+        patcher = patch.dict(os.environ, {"LLM_PROVIDER": "groq", "GROQ_API_KEY": "chave"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_client_reused(self):
+        """Testa que o mesmo cliente é devolvido a cada chamada"""
+        client = self.registry.get("writer")
+        self.assertIs(self.registry.get("writer"), client)
+        self.assertEqual(client.model, "groq/llama3-70b-8192")
+        self.assertIsNot(self.registry.get("writer", stream=True), client)
+
+    def test_role_model_override(self):
+        """Testa a escolha de um modelo específico para a pesquisa"""
+        with patch.dict(os.environ, {"RESEARCHER_LLM_MODEL": "llama3-8b-8192"}):
+            self.assertEqual(self.registry.resolve("researcher"), ("groq", "llama3-8b-8192"))
+            self.assertEqual(self.registry.resolve("writer"), ("groq", "llama3-70b-8192"))
+            self.assertIsNot(self.registry.get("researcher"), self.registry.get("writer"))
+
+    def test_unsupported_provider(self):
+        """Testa o erro para provedores desconhecidos"""
+        with patch.dict(os.environ, {"LLM_PROVIDER": "desconhecido"}):
+            with self.assertRaises(ValueError):
+                self.registry.get("writer")
+
+    def test_warm_up(self):
+        """Testa o aquecimento dos clientes de cada papel"""
+        warmed = self.registry.warm_up()
+        self.assertEqual([role for role, _, _ in warmed], ["researcher", "writer", "editor"])
+        # Os papéis usam o mesmo modelo e portanto o mesmo cliente
+        self.assertEqual(len(self.registry._clients), 1)
+
+    def test_warm_up_variants(self):
+        """Testa o aquecimento dos clientes do escritor com limite de tokens"""
+        self.registry.warm_up(roles=("writer",), variants={"writer": [{"max_tokens": 1024}]})
+        client = self.registry.get("writer", max_tokens=1024)
+        self.assertEqual(client.max_tokens, 1024)
+        self.assertEqual(len(self.registry._clients), 2)
+
+    def test_clients_bounded(self):
+        """Testa que os clientes usados há mais tempo são descartados quando o registro fica cheio"""
+        registry = LLMRegistry(max_clients=2)
+        first = registry.get("writer", max_tokens=512)
+        registry.get("writer", max_tokens=768)
+        self.assertIs(registry.get("writer", max_tokens=512), first)
+        registry.get("writer", max_tokens=1024)
+
+        # O cliente de 768 tokens, usado há mais tempo, foi descartado
+        self.assertEqual(sorted(dict(key[2])["max_tokens"] for key in registry._clients), [512, 1024])
+        self.assertIs(registry.get("writer", max_tokens=512), first)
+
+#========================================================================
+class TestRateLimit(unittest.TestCase):
+    """Testes para os limites de uso dos provedores"""
+
+    def test_token_bucket(self):
+        """Testa o consumo e a espera por tokens"""
+        bucket = TokenBucket(rate_per_minute=600, capacity=10)
+        self.assertTrue(bucket.try_acquire(10))
+        self.assertFalse(bucket.try_acquire(5))
+        self.assertFalse(bucket.acquire(5, timeout=0.01))
+        self.assertTrue(bucket.acquire(1, timeout=1))
+
+    def test_provider_concurrency(self):
+        """Testa que o provedor não recebe mais chamadas simultâneas que o limite"""
+        limiter = ProviderLimiter(concurrency=2)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def call():
+            with limiter.slot():
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak[0], 2)
+
+#========================================================================
+class RateLimitError(Exception):
+    """Erro equivalente ao devolvido pelo provedor quando o limite de uso é atingido"""
+    status_code = 429
+
+class FakeLLM:
+    """Cliente LLM de teste com resposta, atraso e erro configuráveis"""
+
+    def __init__(self, model, answer="ok", delay=0.0, error=None):
+        self.model = model
+        self.answer = answer
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.stop = []
+
+    def call(self, messages, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.answer
+
+    def supports_function_calling(self):
+        return True
+
+    def supports_stop_words(self):
+        return True
+
+    def get_context_window_size(self):
+        return 8192
+
+class TestLLMRouter(unittest.TestCase):
+    """Testes para o roteamento de chamadas entre provedores de LLM"""
+
+    def test_failover_on_rate_limit(self):
+        """Testa a troca de provedor quando o primeiro devolve 429 e a pausa do provedor limitado"""
+        groq = FakeLLM("groq/llama3", error=RateLimitError("limite"))
+        gemini = FakeLLM("gemini/gemini-pro", answer="gemini")
+        router = LLMRouter([("groq", "llama3", groq), ("gemini", "gemini-pro", gemini)])
+        before = ROUTER_REQUESTS.value(provider="groq", outcome="rate_limited")
+
+        self.assertEqual(router.call("Olá"), "gemini")
+        self.assertEqual(ROUTER_REQUESTS.value(provider="groq", outcome="rate_limited"), before + 1)
+
+        # O provedor limitado fica em pausa e deixa de ser a primeira escolha
+        self.assertEqual(router.call("Olá"), "gemini")
+        self.assertEqual(groq.calls, 1)
+
+    def test_failover_on_rate_limit_while_streaming(self):
+        """Testa a troca de provedor quando o cliente em streaming recebe 429 (erro encapsulado pelo crewai)"""
+        import litellm
+        from crewai import LLM
+
+        groq = LLM(model="groq/llama3-70b-8192", api_key="chave", stream=True)
+        gemini = FakeLLM("gemini/gemini-pro", answer="gemini")
+        router = LLMRouter([("groq", "llama3", groq), ("gemini", "gemini-pro", gemini)])
+        error = litellm.RateLimitError(message="limite", llm_provider="groq", model="llama3-70b-8192")
+        before = ROUTER_REQUESTS.value(provider="groq", outcome="rate_limited")
+
+        with patch("crewai.llm.litellm.completion", side_effect=error):
+            self.assertEqual(router.call([{"role": "user", "content": "Olá"}]), "gemini")
+        self.assertEqual(ROUTER_REQUESTS.value(provider="groq", outcome="rate_limited"), before + 1)
+
+    def test_other_errors_are_raised(self):
+        """Testa que erros que não são de limite ou disponibilidade não trocam de provedor"""
+        gemini = FakeLLM("gemini/gemini-pro")
+        router = LLMRouter([("groq", "llama3", FakeLLM("groq/llama3", error=ValueError("inválido"))),
+                            ("gemini", "gemini-pro", gemini)])
+        with self.assertRaises(ValueError):
+            router.call("Olá")
+        self.assertEqual(gemini.calls, 0)
+
+    def test_hedged_request(self):
+        """Testa que uma chamada mais lenta que o p95 do provedor recebe uma requisição de reserva"""
+        slow = FakeLLM("groq/llama3", answer="groq", delay=0.01)
+        fast = FakeLLM("gemini/gemini-pro", answer="gemini")
+        router = LLMRouter([("groq", "llama3", slow), ("gemini", "gemini-pro", fast)], hedge=True, hedge_min_samples=3)
+        router.routes[0].latencies.extend([0.01] * 3)
+        router.routes[1].latencies.extend([1.0] * 3)
+
+        slow.delay = 0.5
+        self.assertEqual(router.call("Olá"), "gemini")
+        self.assertEqual(slow.calls, 1)
+
+    def test_registry_builds_router(self):
+        """Testa que o registro monta o roteador a partir de LLM_ROUTER"""
+        registry = LLMRegistry()
+        env = {"LLM_ROUTER": "groq,gemini:gemini-1.5-flash", "GROQ_API_KEY": "a", "GEMINI_API_KEY": "b"}
+        with patch.dict(os.environ, env):
+            router = registry.get("writer")
+            self.assertIsInstance(router, LLMRouter)
+            self.assertIs(registry.get("writer"), router)
+            self.assertEqual([route.client.model for route in router.routes],
+                             ["groq/llama3-70b-8192", "gemini/gemini-1.5-flash"])
+            self.assertEqual(registry.signature(("writer",)),
+                             (("writer", "groq", "llama3-70b-8192", "gemini", "gemini-1.5-flash"),))
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
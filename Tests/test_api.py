@@ -1,8 +1,14 @@
+import json
+import os
+import tempfile
 import unittest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
+from Api import routes
 from Api.routes import app
 from Api.models import ArticleResponse
+import crew_checkpoints
+import crew_semantic_cache
 
 #========================================================================
 class TestAPI(unittest.TestCase):
@@ -11,14 +17,27 @@ class TestAPI(unittest.TestCase):
     def setUp(self):
         """Configura o cliente de teste antes de cada teste"""
         self.client = TestClient(app)
+        # O cache semântico é testado separadamente, para não reaproveitar artigos entre testes
+        patcher = patch.dict(os.environ, {"SEMANTIC_CACHE": "0"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
     
     def test_health_check(self):
         """Testa o endpoint de health check"""
         response = self.client.get("/health/")
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"status": "healthy"})
+
+    def test_metrics(self):
+        """Testa a exposição das métricas no formato do Prometheus"""
+        self.client.get("/health/")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("# TYPE http_request_duration_seconds histogram", response.text)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="/health/",status="200"}', response.text)
     
-    @patch('main.create_crew')
+    @patch('crew_logic.create_crew')
     def test_generate_article_success(self, mock_create_crew):
         """Testa a geração de artigo bem-sucedida"""
         # Configura o mock para retornar um artigo
@@ -43,7 +62,7 @@ class TestAPI(unittest.TestCase):
         self.assertTrue(data["word_count"] >= 300)
         self.assertEqual(len(data["references"]), 2)
     
-    @patch('main.create_crew')
+    @patch('crew_logic.create_crew')
     def test_generate_article_error(self, mock_create_crew):
         """Testa o tratamento de erro ao gerar artigo"""
         # Configura o mock para lançar uma exceção
@@ -60,6 +79,191 @@ class TestAPI(unittest.TestCase):
         data = response.json()
         self.assertEqual(data["detail"], "Erro ao gerar artigo")
     
+    def test_generate_article_stream(self):
+        """Testa o streaming de eventos da geração de artigo"""
+        def fake_runner(topic, min_words, on_event, profile, max_words):
+            on_event("task_completed", {"task": "research", "output": "Resumo"})
+            on_event("token", {"text": "Olá"})
+            return {"title": "Título", "content": "Olá mundo", "profile": profile}
+
+        with patch.object(routes.jobs, "runner", fake_runner):
+            response = self.client.post("/generate-article/stream", json={"topic": "IA"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        events = [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event: ")]
+        self.assertEqual(events, ["task_completed", "token", "article", "done"])
+        self.assertIn('"word_count": 2', response.text)
+        self.assertIn('"profile": "standard"', response.text)
+
+    def test_generate_article_profile(self):
+        """Testa a escolha do perfil pelo orçamento de latência e o relatório das etapas"""
+        routes.article_cache.clear()
+        timings = {"research": 5.0, "writing": 10.0}
+        fake_runner = MagicMock(side_effect=lambda topic, min_words, on_event, profile, max_words: {
+            "title": "Título", "content": "Texto", "profile": profile, "stage_timings": timings,
+        })
+
+        with patch.object(routes.jobs, "runner", fake_runner):
+            full = self.client.post("/generate-article/", json={"topic": "Perfil A", "profile": "full-edit"})
+            tight = self.client.post("/generate-article/", json={"topic": "Perfil B", "latency_budget": 1})
+
+        self.assertEqual(full.json()["profile"], "full-edit")
+        self.assertEqual(full.json()["stage_timings"], timings)
+        # Nenhum perfil cabe em 1 segundo; o mais barato é executado
+        self.assertEqual(tight.json()["profile"], "lean")
+        self.assertEqual(fake_runner.call_args_list[1].args, ("Perfil B", 300, None, "lean", None))
+
+    def test_reused_stages_not_recorded(self):
+        """Testa que as etapas reaproveitadas não entram nas durações estimadas dos perfis"""
+        from crew_profiles import StageEstimates
+
+        routes.article_cache.clear()
+        estimates = StageEstimates(alpha=1.0)
+        fake_runner = MagicMock(return_value={
+            "title": "Título", "content": "Texto", "profile": "standard",
+            "stage_timings": {"research": 0.01, "writing": 12.0}, "reused_stages": ["research"],
+        })
+        research_before = estimates._seconds[("standard", "research")]
+
+        with patch.object(routes.jobs, "runner", fake_runner), patch.object(routes, "stage_estimates", estimates):
+            response = self.client.post("/generate-article/", json={"topic": "Etapas reaproveitadas"})
+
+        self.assertEqual(response.json()["reused_stages"], ["research"])
+        self.assertEqual(estimates._seconds[("standard", "research")], research_before)
+        self.assertEqual(estimates._seconds[("standard", "writing")], 12.0)
+
+    def test_generate_article_cache(self):
+        """Testa que um artigo repetido é servido do cache"""
+        routes.article_cache.clear()
+        fake_runner = MagicMock(return_value={"title": "Título", "content": "Texto do artigo"})
+
+        with patch.object(routes.jobs, "runner", fake_runner):
+            first = self.client.post("/generate-article/", json={"topic": "Energia Solar"})
+            second = self.client.post("/generate-article/", json={"topic": "energia_solar"})
+            bounded = self.client.post("/generate-article/", json={"topic": "Energia Solar", "max_words": 400})
+
+        self.assertEqual(first.headers["X-Cache"], "miss")
+        self.assertEqual(second.headers["X-Cache"], "hit")
+        self.assertEqual(second.json()["title"], "Título")
+        # Um tamanho máximo diferente é outro artigo
+        self.assertEqual(bounded.headers["X-Cache"], "miss")
+        self.assertEqual(fake_runner.call_args_list[0].args, ("Energia Solar", 300, None, "standard", None))
+        self.assertEqual(fake_runner.call_args_list[1].args, ("Energia Solar", 300, None, "standard", 400))
+
+    def test_generate_article_semantic_cache(self):
+        """Testa que o artigo de um tópico parecido é reaproveitado pelo cache semântico"""
+        routes.article_cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = crew_semantic_cache.SemanticTopicCache(path=directory.name)
+        fake_runner = MagicMock(return_value={"title": "Título", "content": "Texto do artigo"})
+
+        with patch.dict(os.environ, {"SEMANTIC_CACHE": "1"}), \
+                patch.object(crew_semantic_cache, "_default_cache", cache), \
+                patch.object(routes.jobs, "runner", fake_runner):
+            first = self.client.post("/generate-article/", json={"topic": "Energia Solar", "min_words": 500})
+            similar = self.client.post("/generate-article/", json={"topic": "A energia solar", "min_words": 300})
+            longer = self.client.post("/generate-article/", json={"topic": "A energia solar", "min_words": 800})
+            bounded = self.client.post("/generate-article/", json={"topic": "A energia solar", "min_words": 1, "max_words": 2})
+
+        self.assertEqual(first.headers["X-Cache"], "miss")
+        self.assertEqual(similar.headers["X-Cache"], "semantic")
+        self.assertEqual(similar.json()["title"], "Título")
+        self.assertEqual(similar.json()["topic"], "A energia solar")
+        # Um artigo menor que o pedido não é reaproveitado
+        self.assertEqual(longer.headers["X-Cache"], "miss")
+        # Nem um artigo maior que o tamanho máximo pedido
+        self.assertEqual(bounded.headers["X-Cache"], "miss")
+        self.assertEqual(fake_runner.call_count, 3)
+
+    def test_generate_articles_batch(self):
+        """Testa a geração em lote com tópicos repetidos e falha parcial"""
+        routes.article_cache.clear()
+        research = MagicMock(side_effect=lambda topic: f"Pesquisa sobre {topic}")
+
+        def write(topic, text, min_words, on_event, max_words):
+            if topic == "Falha":
+                raise RuntimeError("Erro na escrita")
+            return {"title": topic, "content": text}
+
+        with patch.object(routes.batch, "research", research), patch.object(routes.batch, "write", write):
+            response = self.client.post("/generate-articles/", json=[
+                {"topic": "Energia Solar"}, {"topic": "energia solar", "min_words": 500}, {"topic": "Falha"},
+            ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        items = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda item: item["index"])
+        self.assertEqual([item["status"] for item in items], ["completed", "completed", "failed"])
+        self.assertEqual(items[1]["result"]["content"], "Pesquisa sobre Energia Solar")
+        self.assertEqual(items[2]["error"], "Erro na escrita")
+        self.assertEqual(research.call_count, 2)
+
+    def test_generate_articles_batch_queue_full(self):
+        """Testa a resposta 429 do lote quando o pool de execução está saturado"""
+        routes.article_cache.clear()
+        with patch.object(routes.jobs, "admits", return_value=False):
+            response = self.client.post("/generate-articles/", json=[{"topic": "Energia Solar"}])
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response.headers)
+
+    def test_batch_runner_shares_job_slots(self):
+        """Testa que as etapas do lote ocupam as vagas do pool e esperam as próprias etapas sem vaga"""
+        import asyncio
+        import time
+        from Api.batch import BatchRunner
+        from Api.jobs import JobManager
+        from Api.models import ArticleRequest
+
+        manager = JobManager(MagicMock(), max_workers=1, max_queue=1, executor="thread")
+        self.addCleanup(manager.shutdown)
+        peaks = []
+
+        def research(topic):
+            peaks.append(manager.stats()["inflight"])
+            time.sleep(0.01)
+            return f"Pesquisa sobre {topic}"
+
+        runner = BatchRunner(research, lambda topic, text, *_: {"content": text}, manager.submit_task)
+        requests = [(index, ArticleRequest(topic=f"Tópico {index}", priority="low")) for index in range(4)]
+
+        async def collect():
+            return [item async for item in runner.run(requests)]
+
+        with patch.dict(os.environ, {"LLM_ROUTER": "groq,gemini"}):
+            items = asyncio.run(collect())
+
+        self.assertEqual([error for _, _, _, error in items], [None] * 4)
+        # Com 2 vagas, a prioridade "low" (metade das vagas) nunca ocupa mais de uma
+        self.assertEqual(max(peaks), 1)
+        self.assertEqual(manager.stats()["inflight"], 0)
+
+    def test_checkpoints(self):
+        """Testa a consulta e a invalidação dos checkpoints das tarefas"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = crew_checkpoints.CheckpointStore(path=directory.name)
+        checkpoint_id = store.put("Energia Solar", "research", "abc", "Pesquisa")
+        store.put("Energia Solar", "writing", "def", "Artigo", min_words=300)
+
+        with patch.dict(os.environ, {"CHECKPOINT_DIR": directory.name}):
+            listed = self.client.get("/checkpoints/", params={"topic": "energia solar"}).json()
+            detail = self.client.get(f"/checkpoints/{checkpoint_id}").json()
+            deleted = self.client.delete(f"/checkpoints/{checkpoint_id}")
+            missing = self.client.get(f"/checkpoints/{checkpoint_id}")
+            invalidated = self.client.delete("/checkpoints/", params={"task": "writing"}).json()
+
+        self.assertEqual(sorted(entry["task"] for entry in listed), ["research", "writing"])
+        self.assertIsNone(listed[0]["output"])
+        self.assertEqual(detail["output"], "Pesquisa")
+        self.assertEqual(deleted.status_code, 200)
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(invalidated, {"deleted": 1})
+
+        with patch.dict(os.environ, {"CHECKPOINTS": "0"}):
+            self.assertEqual(self.client.get("/checkpoints/").status_code, 404)
+
     def test_invalid_request(self):
         """Testa uma solicitação inválida"""
         # Faz uma solicitação sem o campo obrigatório 'topic'
@@ -71,6 +275,14 @@ class TestAPI(unittest.TestCase):
         # Verifica se o erro de validação é retornado
         self.assertEqual(response.status_code, 422)  # Unprocessable Entity
 
+        # Prioridade fora das classes aceitas
+        response = self.client.post("/generate-article/", json={"topic": "IA", "priority": "urgente"})
+        self.assertEqual(response.status_code, 422)
+
+        # Tamanho máximo menor que o mínimo
+        response = self.client.post("/generate-article/", json={"topic": "IA", "min_words": 500, "max_words": 400})
+        self.assertEqual(response.status_code, 422)
+
 #========================================================================
 if __name__ == "__main__":
     unittest.main()
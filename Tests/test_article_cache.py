@@ -0,0 +1,47 @@
+import asyncio
+import unittest
+from Api.cache import ArticleCache, SingleFlight, article_cache_key
+
+#========================================================================
+class TestArticleCache(unittest.TestCase):
+    """Testes para o cache de artigos e o agrupamento de requisições"""
+
+    def test_key_normalization(self):
+        """Testa que variações do tópico geram a mesma chave"""
+        self.assertEqual(article_cache_key("Energia Solar", 300), article_cache_key(" energia_solar", 300))
+        self.assertNotEqual(article_cache_key("Energia Solar", 300), article_cache_key("Energia Solar", 500))
+
+    def test_lru_and_ttl(self):
+        """Testa a remoção por tamanho e a expiração"""
+        cache = ArticleCache(ttl=60, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.set(key, key.upper())
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), "C")
+
+        expired = ArticleCache(ttl=0)
+        expired.set("a", "A")
+        self.assertIsNone(expired.get("a"))
+
+    def test_single_flight(self):
+        """Testa que chamadas simultâneas idênticas executam uma única vez"""
+        flight = SingleFlight()
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "artigo"
+
+        async def main():
+            return await asyncio.gather(*(flight.do("chave", generate) for _ in range(5)))
+
+        results = asyncio.run(main())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r for r, _ in results], ["artigo"] * 5)
+        self.assertEqual(sorted(c for _, c in results), [False, True, True, True, True])
+        self.assertEqual(len(flight), 0)
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
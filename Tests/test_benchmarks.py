@@ -0,0 +1,207 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from Benchmarks.LoadTest import benchmark_env, cache_hit_rate, cache_requests, compare, main, percentile, summarize
+from Benchmarks.StubServers import FakeLLM, start_fake_llm, start_fake_wikipedia
+
+#========================================================================
+class TestLoadTest(unittest.TestCase):
+    """Testes para o resumo e a comparação dos resultados do benchmark"""
+
+    def test_percentile_and_summary(self):
+        """Testa os percentis e a vazão calculados a partir das latências"""
+        latencies = [i / 100 for i in range(1, 101)]
+        self.assertAlmostEqual(percentile(latencies, 50), 0.505)
+        self.assertAlmostEqual(percentile(latencies, 99), 0.9901)
+        self.assertIsNone(percentile([], 95))
+
+        summary = summarize(latencies, errors=2, duration=10.0)
+        self.assertEqual(summary["requests"], 102)
+        self.assertEqual(summary["throughput_rps"], 10.0)
+        self.assertEqual(summary["latency_p50_ms"], 505.0)
+
+    def test_compare_with_baseline(self):
+        """Testa a detecção de regressões acima da tolerância"""
+        baseline = {"results": {"throughput_rps": 10.0, "latency_p95_ms": 100.0, "memory_peak_mb": 200.0}}
+        current = {"results": {"throughput_rps": 9.5, "latency_p95_ms": 150.0, "memory_peak_mb": 210.0, "errors": 0}}
+        regressions = compare(current, baseline, tolerance=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("latency_p95_ms"))
+
+    def test_benchmark_env_disables_caches(self):
+        """Testa que o benchmark mede o pipeline completo, sem caches nem checkpoints"""
+        env = benchmark_env("http://llm", "http://wikipedia")
+        self.assertEqual((env["CHECKPOINTS"], env["SEMANTIC_CACHE"], env["ARTICLE_CACHE_TTL"]), ("0", "0", "0"))
+
+    def test_cache_mode(self):
+        """Testa o modo com os caches ligados e o cálculo da taxa de acertos a partir de /metrics"""
+        env = benchmark_env("http://llm", "http://wikipedia", cache=True)
+        self.assertEqual(env["CHECKPOINTS"], "0")
+        self.assertNotIn("SEMANTIC_CACHE", env)
+        self.assertNotIn("ARTICLE_CACHE_TTL", env)
+
+        before = cache_requests('article_cache_requests_total{result="miss"} 2.0\n')
+        after = cache_requests(
+            '# TYPE article_cache_requests_total counter\n'
+            'article_cache_requests_total{result="hit"} 5.0\n'
+            'article_cache_requests_total{result="miss"} 5.0\n'
+            'article_cache_requests_total{result="semantic"} 1.0\n'
+            'semantic_cache_requests_total{kind="article",result="hit"} 1.0\n'
+        )
+        self.assertEqual(after, {"hit": 5.0, "miss": 5.0, "semantic": 1.0})
+        self.assertEqual(cache_hit_rate(before, after), 0.6667)
+        self.assertIsNone(cache_hit_rate(after, after))
+
+        # Sem --cache, --topics não teria efeito e é recusado
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            main(["--topics", "5"])
+
+#========================================================================
+class TestStubServers(unittest.TestCase):
+    """Testes para o LLM falso e o stub da Wikipedia"""
+
+    def test_fake_llm_replies(self):
+        """Testa a chamada à ferramenta seguida da resposta final com o tamanho pedido"""
+        llm = FakeLLM()
+        system = {"role": "system", "content": "Ferramentas disponíveis: Wikipedia Tool"}
+        task = {"role": "user", "content": "Escreva um artigo de pelo menos 50 palavras sobre Energia Solar usando"}
+
+        action = llm.reply([system, task])
+        self.assertIn("Action: Wikipedia Tool", action)
+        self.assertIn('"topic": "Energia Solar"', action)
+
+        final = llm.reply([system, task, {"role": "assistant", "content": action + "\nObservation: ..."}])
+        answer = final.split("Final Answer:")[1]
+        self.assertTrue(answer.strip().startswith("# Energia Solar"))
+        self.assertEqual(len(answer.split()) - 3, 50)
+        self.assertEqual(final, llm.reply([system, task, {"role": "assistant", "content": "..."}]))
+
+    def test_crew_against_stubs(self):
+        """Testa a execução real do pipeline contra o LLM falso e o stub da Wikipedia"""
+        import crew_checkpoints
+        import crew_logic
+        from Agents.LLMRegistry import llm_registry
+        from Tools.WikipediaTool import REQUEST_LATENCY, WikipediaTool
+
+        checkpoints = tempfile.TemporaryDirectory()
+        self.addCleanup(checkpoints.cleanup)
+
+        with start_fake_llm() as llm, start_fake_wikipedia() as wikipedia:
+            env = {"LLM_PROVIDER": "local", "LOCAL_LLM_API_BASE": llm.url, "CHECKPOINT_DIR": checkpoints.name,
+                   "SEMANTIC_CACHE": "0", "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true"}
+            before = REQUEST_LATENCY.snapshot().get(("summary",), {"count": 0})["count"]
+            tool = WikipediaTool(api_url=wikipedia.url, cache=None)
+            with patch.dict(os.environ, env), patch.object(crew_logic, "WikipediaTool", return_value=tool):
+                llm_registry.clear()
+                self.addCleanup(llm_registry.clear)
+                with patch.object(crew_logic, "run_writing", side_effect=RuntimeError("falha na escrita")), \
+                        self.assertRaises(RuntimeError):
+                    crew_logic.create_crew("Energia Solar", min_words=80)
+
+                # A repetição do pedido que falhou retoma a partir do checkpoint da pesquisa
+                article = crew_logic.create_crew("Energia Solar", min_words=80)
+
+                # O mesmo tópico com outro tamanho também retoma a partir do checkpoint da pesquisa
+                events = []
+                longer = crew_logic.create_crew("Energia Solar", min_words=120, on_event=lambda *e: events.append(e))
+
+        # O pesquisador consultou o stub da Wikipedia antes da resposta final, uma única vez
+        self.assertEqual(REQUEST_LATENCY.snapshot()[("summary",)]["count"], before + 1)
+        self.assertEqual(article["title"], "Energia Solar")
+        self.assertEqual(len(article["content"].split()), 80)
+        self.assertEqual(len(longer["content"].split()), 120)
+        restored = [data["task"] for event, data in events if event == "task_restored"]
+        self.assertEqual(restored, ["research"])
+        self.assertEqual(article["reused_stages"], ["research"])
+        self.assertEqual(longer["reused_stages"], ["research"])
+        # Das execuções concluídas, só o checkpoint da pesquisa é mantido
+        self.assertEqual([entry["task"] for entry in crew_checkpoints.CheckpointStore(checkpoints.name).list()],
+                         ["research"])
+
+    def test_cli_crew_against_stubs(self):
+        """Testa que a repetição do script retoma a pesquisa, mas gera de novo o artigo final"""
+        import crew_checkpoints
+        import main
+        from Tools.WikipediaTool import REQUEST_LATENCY, WikipediaTool
+
+        checkpoints = tempfile.TemporaryDirectory()
+        self.addCleanup(checkpoints.cleanup)
+
+        with start_fake_llm() as llm, start_fake_wikipedia() as wikipedia:
+            env = {"OPENAI_API_KEY": "chave", "OPENAI_API_BASE": llm.url, "MODEL": "openai/local-model",
+                   "CHECKPOINT_DIR": checkpoints.name, "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true"}
+            before = REQUEST_LATENCY.snapshot().get(("summary",), {"count": 0})["count"]
+            editing_lookups = sum(crew_checkpoints.CHECKPOINT_REQUESTS.value(task="editing", result=result)
+                                  for result in ("hit", "miss"))
+            tool = WikipediaTool(api_url=wikipedia.url, cache=None)
+            with patch.dict(os.environ, env), patch.object(main, "WikipediaTool", return_value=tool):
+                first = main.run_crew("Energia Solar")
+                second = main.run_crew("Energia Solar")
+
+        self.assertTrue(first.strip())
+        self.assertTrue(second.strip())
+        # A pesquisa foi feita uma única vez; a edição nunca foi procurada nos checkpoints
+        self.assertEqual(REQUEST_LATENCY.snapshot()[("summary",)]["count"], before + 1)
+        self.assertEqual(sum(crew_checkpoints.CHECKPOINT_REQUESTS.value(task="editing", result=result)
+                             for result in ("hit", "miss")), editing_lookups)
+        self.assertEqual([entry["task"] for entry in crew_checkpoints.CheckpointStore(checkpoints.name).list()],
+                         ["research"])
+
+    def test_longform_against_stubs(self):
+        """Testa a escrita em seções paralelas de um artigo longo contra o LLM falso"""
+        import crew_logic
+        from Agents.LLMRegistry import llm_registry
+
+        with start_fake_llm() as llm:
+            env = {"LLM_PROVIDER": "local", "LOCAL_LLM_API_BASE": llm.url, "CHECKPOINTS": "0",
+                   "LONGFORM_MIN_WORDS": "1000", "LONGFORM_SECTION_WORDS": "400",
+                   "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true"}
+            with patch.dict(os.environ, env):
+                llm_registry.clear()
+                self.addCleanup(llm_registry.clear)
+                events = []
+                article = crew_logic.run_writing("Energia Solar", "Pesquisa sobre energia solar.", 1000,
+                                                 on_event=lambda *e: events.append(e))
+
+        outline = next(data for event, data in events if event == "outline")
+        self.assertEqual(len(outline["sections"]), 3)
+        self.assertEqual(article["title"], "Energia Solar")
+        self.assertEqual(article["content"].count("## "), 3)
+        self.assertGreaterEqual(len(article["content"].split()), 1000)
+        self.assertEqual(sum(event == "section_completed" for event, _ in events), 3)
+
+    def test_length_control_against_stubs(self):
+        """Testa o limite de um escritor prolixo e a continuação de um escritor sucinto contra o LLM falso"""
+        import crew_logic
+        from Agents.LLMRegistry import llm_registry
+
+        env = {"LLM_PROVIDER": "local", "CHECKPOINTS": "0", "WRITER_LENGTH_SLACK": "1.5",
+               "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true"}
+        self.addCleanup(llm_registry.clear)
+
+        # O modelo escreve o quádruplo do pedido: o limite de tokens encerra a geração e o texto
+        # é cortado no limite de palavras, no fim de uma frase
+        with start_fake_llm(length_factor=4.0) as llm, patch.dict(os.environ, {**env, "LOCAL_LLM_API_BASE": llm.url}):
+            llm_registry.clear()
+            article = crew_logic.run_writing("Energia Solar", "Pesquisa sobre energia solar.", 100)
+            bounded = crew_logic.run_writing("Energia Solar", "Pesquisa sobre energia solar.", 100, max_words=120)
+
+        self.assertTrue(100 <= len(article["content"].split()) <= 150)
+        self.assertTrue(article["content"].endswith("."))
+        self.assertTrue(100 <= len(bounded["content"].split()) <= 120)
+
+        # O modelo escreve a metade do pedido: uma continuação completa o que falta
+        events = []
+        with start_fake_llm(length_factor=0.5) as llm, patch.dict(os.environ, {**env, "LOCAL_LLM_API_BASE": llm.url}):
+            llm_registry.clear()
+            short = crew_logic.run_writing("Energia Solar", "Pesquisa sobre energia solar.", 100,
+                                           on_event=lambda *e: events.append(e))
+
+        continuation = [data for event, data in events if event == "continuation"]
+        self.assertEqual(len(continuation), 1)
+        self.assertEqual(len(short["content"].split()), 50 + continuation[0]["words"])
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
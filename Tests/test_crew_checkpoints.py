@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import crew_checkpoints
+from crew_checkpoints import CheckpointStore, definition_digest
+
+#========================================================================
+class TestCheckpointStore(unittest.TestCase):
+    """Testes para os checkpoints das tarefas do pipeline"""
+
+    def setUp(self):
+        """Cria o armazenamento em um diretório temporário"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = CheckpointStore(path=directory.name, ttl=60, max_entries=10)
+
+    def test_put_and_get(self):
+        """Testa a retomada da tarefa com o mesmo tópico e a mesma definição"""
+        definition = definition_digest("Pesquise sobre Energia Solar", "groq/llama3")
+        self.assertIsNone(self.store.get("Energia Solar", "research", definition))
+
+        checkpoint_id = self.store.put("Energia Solar", "research", definition, "Pesquisa")
+        self.assertEqual(self.store.get("  energia   solar ", "research", definition), "Pesquisa")
+        self.assertEqual(self.store.get("Energia_Solar", "research", definition), "Pesquisa")
+        self.assertEqual(self.store.load(checkpoint_id)["output"], "Pesquisa")
+
+        # Outra definição (ex.: outro modelo) não reaproveita o checkpoint
+        other = definition_digest("Pesquise sobre Energia Solar", "gemini/gemini-pro")
+        self.assertNotEqual(definition, other)
+        self.assertIsNone(self.store.get("Energia Solar", "research", other))
+
+    def test_list_and_invalidate(self):
+        """Testa a listagem e a invalidação por tópico e por tarefa"""
+        self.store.put("Energia Solar", "research", "a", "Pesquisa")
+        self.store.put("Energia Solar", "writing", "b", "Artigo", min_words=300)
+        self.store.put("Energia Eólica", "research", "a", "Pesquisa")
+
+        entries = self.store.list(topic="energia solar")
+        self.assertEqual({entry["task"] for entry in entries}, {"research", "writing"})
+        self.assertNotIn("output", entries[0])
+        writing = self.store.list(task="writing")[0]
+        self.assertEqual(writing["metadata"], {"min_words": 300})
+        self.assertEqual(writing["size"], len("Artigo"))
+
+        self.assertEqual(self.store.invalidate(topic="Energia Solar", task="writing"), 1)
+        self.assertTrue(self.store.delete(self.store.checkpoint_id("Energia Eólica", "research", "a")))
+        self.assertFalse(self.store.delete("inexistente"))
+        self.assertEqual([entry["task"] for entry in self.store.list()], ["research"])
+
+    def test_retention(self):
+        """Testa a expiração por TTL e a remoção dos checkpoints usados há mais tempo"""
+        self.store.put("Energia Solar", "research", "a", "Pesquisa")
+        with patch("crew_checkpoints.time.time", return_value=10**10):
+            self.assertIsNone(self.store.get("Energia Solar", "research", "a"))
+        self.assertEqual(self.store.list(), [])
+
+        for i in range(12):
+            self.store.put(f"Tópico {i}", "research", "a", str(i))
+        self.assertLessEqual(len(self.store.list()), 10)
+        self.assertIsNotNone(self.store.get("Tópico 11", "research", "a"))
+
+    def test_run_scope(self):
+        """Testa que só a pesquisa é mantida após uma execução concluída e tudo é mantido após uma que falhou"""
+        with self.assertRaises(RuntimeError), crew_checkpoints.run_scope():
+            self.store.put("Energia Solar", "research", "a", "Pesquisa")
+            self.store.put("Energia Solar", "writing", "b", "Artigo pela metade")
+            raise RuntimeError("falha na edição")
+        self.assertEqual(len(self.store.list()), 2)
+
+        # A repetição retoma as tarefas e, ao terminar, remove os checkpoints de escrita e edição
+        with crew_checkpoints.run_scope():
+            self.assertEqual(self.store.get("Energia Solar", "research", "a"), "Pesquisa")
+            self.assertEqual(self.store.get("Energia Solar", "writing", "b"), "Artigo pela metade")
+            with crew_checkpoints.run_scope():
+                self.store.put("Energia Solar", "editing", "c", "Artigo")
+            # O bloco aninhado não remove os checkpoints antes do fim da execução
+            self.assertEqual(len(self.store.list()), 3)
+        self.assertEqual([entry["task"] for entry in self.store.list()], ["research"])
+
+        # Fora de uma execução, os checkpoints são mantidos
+        self.store.put("Energia Solar", "writing", "b", "Artigo")
+        self.assertEqual(len(self.store.list()), 2)
+
+    def test_disabled(self):
+        """Testa que CHECKPOINTS=0 desativa os checkpoints"""
+        with patch.dict(os.environ, {"CHECKPOINTS": "0"}):
+            self.assertIsNone(crew_checkpoints.get_checkpoint_store())
+        with patch.dict(os.environ, {"CHECKPOINT_DIR": self.store.path}):
+            self.assertEqual(crew_checkpoints.get_checkpoint_store().path, self.store.path)
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import crew_compaction
+
+#========================================================================
+class TestCrewCompaction(unittest.TestCase):
+    """Testes para a compactação da pesquisa entregue ao escritor"""
+
+    RELEVANT = "A energia solar fotovoltaica converte a luz do sol em eletricidade por meio de painéis solares."
+    UNRELATED = "O campeonato de futebol teve recorde de público nos estádios durante a temporada passada."
+
+    def test_chunk_text(self):
+        """Testa a divisão em trechos respeitando parágrafos e o tamanho máximo"""
+        text = "Primeiro parágrafo curto.\n\n" + " ".join(["Frase com cinco palavras aqui."] * 6)
+        chunks = crew_compaction.chunk_text(text, max_words=10)
+        self.assertEqual(chunks[0], "Primeiro parágrafo curto.")
+        self.assertTrue(all(len(chunk.split()) <= 10 for chunk in chunks))
+        self.assertEqual(sum(len(chunk.split()) for chunk in chunks), 3 + 30)
+
+    def test_bm25_ranks_relevant_chunk_first(self):
+        """Testa que o trecho sobre o tópico recebe a maior pontuação, ignorando acentos"""
+        chunks = [self.UNRELATED, self.RELEVANT]
+        scores = crew_compaction.bm25_scores(
+            [crew_compaction.terms(chunk) for chunk in chunks],
+            crew_compaction.terms("Energia Solar"),
+        )
+        self.assertGreater(scores[1], scores[0])
+        self.assertEqual(scores[0], 0)
+
+    def test_compact_keeps_budget_and_drops_duplicates(self):
+        """Testa que a compactação respeita o orçamento, remove repetições e preserva a ordem"""
+        research = "\n\n".join([self.UNRELATED, self.RELEVANT, self.RELEVANT, self.UNRELATED + " Mais detalhes."])
+        result = crew_compaction.compact(research, "Energia Solar", budget=30, chunk_words=120)
+
+        self.assertEqual(result.chunks_total, 4)
+        self.assertEqual(result.text, self.RELEVANT)
+        self.assertLessEqual(result.tokens, 30)
+        self.assertEqual(result.tokens_saved, result.original_tokens - result.tokens)
+        self.assertGreater(result.report()["tokens_saved"], 0)
+
+    def test_compact_disabled_or_within_budget(self):
+        """Testa que o texto não é alterado quando a compactação está desativada ou já cabe no orçamento"""
+        research = f"{self.RELEVANT}\n\n{self.UNRELATED}"
+        for budget in (0, 10_000):
+            result = crew_compaction.compact(research, "Energia Solar", budget=budget)
+            self.assertEqual(result.text, research)
+            self.assertEqual(result.tokens_saved, 0)
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from crewai.utilities.events import (
+    crewai_event_bus, LLMCallCompletedEvent, LLMCallStartedEvent, LLMStreamChunkEvent
+)
+import crew_events
+
+#========================================================================
+class TestCrewEvents(unittest.TestCase):
+    """Testes para o encaminhamento de eventos da crew"""
+
+    def test_events_routed_to_current_thread(self):
+        """Testa que apenas a thread registrada recebe os eventos"""
+        received = []
+
+        with crew_events.listen(lambda event, data: received.append((event, data))):
+            crewai_event_bus.emit(None, LLMStreamChunkEvent(chunk="Olá"))
+
+            # Eventos emitidos por outra execução (outra thread) não são entregues
+            other = threading.Thread(
+                target=crewai_event_bus.emit, args=(None, LLMStreamChunkEvent(chunk="outro"))
+            )
+            other.start()
+            other.join()
+
+        crewai_event_bus.emit(None, LLMStreamChunkEvent(chunk="depois"))
+        self.assertEqual(received, [("token", {"text": "Olá"})])
+
+    def test_llm_call_duration(self):
+        """Testa que cada chamada ao LLM é medida pelo modelo que a executou"""
+        crew_events.instrument()
+        llm = SimpleNamespace(model="groq/teste")
+        before = crew_events.LLM_CALL_DURATION.snapshot().get(("groq/teste", "completed"), {"count": 0})["count"]
+
+        crewai_event_bus.emit(llm, LLMCallStartedEvent(messages="Olá"))
+        crewai_event_bus.emit(llm, LLMCallCompletedEvent(response="Oi", call_type="llm_call"))
+
+        after = crew_events.LLM_CALL_DURATION.snapshot()[("groq/teste", "completed")]["count"]
+        self.assertEqual(after, before + 1)
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import unittest
+from unittest.mock import patch
+from crew_length import bounds, length_instructions, tail, token_bucket, trim, writer_variants
+
+#========================================================================
+class TestLength(unittest.TestCase):
+    """Testes para os limites de tamanho e a contagem de palavras durante a geração"""
+
+    def test_writer_variants(self):
+        """Testa as opções dos clientes do escritor aquecidos para o tamanho padrão"""
+        with patch.dict(os.environ, {"WRITER_LENGTH_CONTROL": "1"}):
+            variants = writer_variants(300)
+        max_tokens = bounds(300).max_tokens
+        self.assertEqual(variants, {"writer": [{"max_tokens": max_tokens}, {"stream": True, "max_tokens": max_tokens}]})
+        with patch.dict(os.environ, {"WRITER_LENGTH_CONTROL": "0"}):
+            self.assertEqual(writer_variants(300), {})
+
+    def test_bounds(self):
+        """Testa o limite de palavras e de tokens derivado do tamanho pedido"""
+        limits = bounds(300, slack=1.5)
+        self.assertEqual(limits.stop_words, 450)
+        # 450 palavras -> 600 tokens estimados, com margem e reserva para o raciocínio (950)
+        self.assertEqual(limits.max_tokens, 1024)
+        self.assertEqual([token_bucket(tokens) for tokens in (1, 513, 769, 1025, 2049, 5000)],
+                         [512, 768, 1024, 1536, 3072, 6144])
+        # A escala mantém poucos limites diferentes para todos os tamanhos de artigo
+        self.assertLessEqual(len({bounds(words).max_tokens for words in range(50, 5000)}), 12)
+        self.assertEqual(bounds(300, 400).stop_words, 400)
+        self.assertEqual(bounds(300, slack=0.5).stop_words, 300)
+        self.assertEqual(length_instructions(300), "de pelo menos 300 palavras")
+        self.assertIn("no máximo 400 palavras", length_instructions(300, 400))
+
+    def test_trim(self):
+        """Testa o corte no fim da última frase completa dentro do limite"""
+        text = "Primeira frase aqui. Segunda frase também.\n\n## Seção\n\nTerceira frase cortada no"
+        self.assertEqual(trim(text, 20), text)
+        self.assertEqual(trim(text, 9), "Primeira frase aqui. Segunda frase também.")
+        self.assertEqual(trim(text, 5), "Primeira frase aqui.")
+        self.assertEqual(trim("palavras sem pontuação alguma", 3), "palavras sem pontuação")
+
+    def test_tail(self):
+        """Testa o final do texto enviado na continuação"""
+        text = "Um dois três.\n\nQuatro cinco seis sete."
+        self.assertEqual(tail(text, 10), text)
+        self.assertEqual(tail(text, 4), "Quatro cinco seis sete.")
+        self.assertEqual(tail(text, 2), "seis sete.")
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import crew_logic
+from Agents.LLMRegistry import llm_registry
+from crew_semantic_cache import SemanticTopicCache
+
+#========================================================================
+class TestCrewLogic(unittest.TestCase):
+    """Testes para a montagem do artigo a partir do texto gerado"""
+
+    def test_to_article_with_heading(self):
+        """Testa a extração do título e das referências"""
+        article = crew_logic.to_article(
+            "Energia Solar",
+            "# Energia Solar no Brasil\n\nTexto do artigo (https://pt.wikipedia.org/wiki/Energia_solar).",
+            "Fonte: https://en.wikipedia.org/wiki/Solar_energy",
+        )
+        self.assertEqual(article["title"], "Energia Solar no Brasil")
+        self.assertTrue(article["content"].startswith("Texto do artigo"))
+        self.assertEqual(article["references"], [
+            "https://en.wikipedia.org/wiki/Solar_energy",
+            "https://pt.wikipedia.org/wiki/Energia_solar",
+        ])
+
+    def test_to_article_without_heading(self):
+        """Testa o título padrão quando o texto não tem cabeçalho"""
+        article = crew_logic.to_article("IA", "Texto simples.")
+        self.assertEqual(article["title"], "Artigo sobre IA")
+        self.assertEqual(article["content"], "Texto simples.")
+
+    def test_research_reuse_scoped_by_profile(self):
+        """Testa que a pesquisa de um tópico parecido só é reaproveitada com o mesmo perfil e modelos"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = SemanticTopicCache(path=directory.name)
+        kickoff = MagicMock(return_value=MagicMock(raw="Pesquisa nova"))
+
+        with patch.dict(os.environ, {"CHECKPOINTS": "0", "LLM_PROVIDER": "local"}), \
+                patch.object(crew_logic, "get_semantic_cache", return_value=cache), \
+                patch.object(crew_logic, "_kickoff", kickoff):
+            llm_registry.clear()
+            self.addCleanup(llm_registry.clear)
+            self.assertEqual(crew_logic.run_research("Energia Solar", profile="lean"), "Pesquisa nova")
+            kickoff.return_value = MagicMock(raw="Pesquisa completa")
+
+            # A pesquisa curta do perfil "lean" não serve ao perfil "standard"
+            self.assertEqual(crew_logic.run_research("energia solar", profile="standard"), "Pesquisa completa")
+            self.assertEqual(crew_logic.run_research("Energia solar", profile="lean"), "Pesquisa nova")
+            self.assertEqual(crew_logic.run_research("Energia solar", profile="standard"), "Pesquisa completa")
+
+        self.assertEqual(kickoff.call_count, 2)
+
+    def _write_with_stages(self, outputs, min_words, max_words, longform_min_words):
+        """Escreve um artigo com a saída de cada etapa definida por 'outputs' e retorna as tarefas executadas"""
+        tasks = []
+
+        def run_task(topic, task, role, stage, on_event=None, **metadata):
+            tasks.append(task)
+            return outputs[stage]
+
+        env = {"CHECKPOINTS": "0", "LLM_PROVIDER": "local", "WRITER_LENGTH_CONTROL": "1",
+               "LONGFORM_MIN_WORDS": str(longform_min_words)}
+        with patch.dict(os.environ, env), patch.object(crew_logic, "_run_task", side_effect=run_task):
+            llm_registry.clear()
+            self.addCleanup(llm_registry.clear)
+            article = crew_logic.run_writing("Energia Solar", "Pesquisa sobre energia solar.",
+                                             min_words=min_words, max_words=max_words)
+        return article, tasks
+
+    def test_continuation_respects_max_words(self):
+        """Testa que a continuação de um artigo curto não passa de 'max_words'"""
+        article, tasks = self._write_with_stages({
+            "writing": "# Energia Solar\n\n" + "Frase curta sobre o sol. " * 10,
+            "continuation": "Mais uma frase sobre o sol. " * 200,
+        }, min_words=100, max_words=120, longform_min_words=0)
+
+        self.assertEqual([task.name for task in tasks], ["writing", "continuation"])
+        self.assertIn("no máximo 67 palavras", tasks[1].description)
+        self.assertLessEqual(crew_logic.crew_longform.word_count(article["content"]), 120)
+        self.assertGreater(crew_logic.crew_longform.word_count(article["content"]), 100)
+
+    def test_sections_respect_max_words(self):
+        """Testa que as seções, inclusive as complementadas, não passam de 'max_words' no total"""
+        article, tasks = self._write_with_stages({
+            "outline": "# Energia Solar\n## Origem\n## Usos",
+            "section": "Frase curta sobre o sol. " * 200,
+        }, min_words=400, max_words=450, longform_min_words=400)
+
+        self.assertEqual([task.name for task in tasks], ["outline", "section", "section"])
+        self.assertLessEqual(crew_logic.crew_longform.word_count(article["content"]), 450)
+
+        article, tasks = self._write_with_stages({
+            "outline": "# Energia Solar\n## Origem\n## Usos",
+            "section": "Frase curta sobre o sol. " * 20,
+        }, min_words=400, max_words=450, longform_min_words=400)
+
+        # As seções curtas são complementadas só até a sua parte de 'max_words'
+        self.assertEqual([task.name for task in tasks], ["outline"] + ["section"] * 4)
+        self.assertLessEqual(crew_logic.crew_longform.word_count(article["content"]), 450)
+
+    def test_sections_share_process_pool(self):
+        """Testa que as seções de artigos simultâneos dividem o mesmo limite de LONGFORM_CONCURRENCY"""
+        import threading
+        import time
+
+        lock, active, peaks = threading.Lock(), [0], []
+
+        def run_task(topic, task, role, stage, on_event=None, **metadata):
+            if stage == "outline":
+                return "# Energia Solar"
+            with lock:
+                active[0] += 1
+                peaks.append(active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return "Frase curta sobre o sol. " * 30
+
+        env = {"CHECKPOINTS": "0", "LLM_PROVIDER": "local", "LONGFORM_MIN_WORDS": "400",
+               "LONGFORM_SECTION_WORDS": "100", "LONGFORM_CONCURRENCY": "2"}
+        with patch.dict(os.environ, env), patch.object(crew_logic, "_run_task", side_effect=run_task), \
+                patch.object(crew_logic, "_section_executor", None):
+            llm_registry.clear()
+            self.addCleanup(llm_registry.clear)
+            articles = [
+                threading.Thread(target=crew_logic.run_writing, args=(f"Tópico {index}", "Pesquisa.", 400))
+                for index in range(2)
+            ]
+            for thread in articles:
+                thread.start()
+            for thread in articles:
+                thread.join()
+            crew_logic._section_executor.shutdown()
+
+        self.assertEqual(len(peaks), 8)
+        self.assertEqual(max(peaks), 2)
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
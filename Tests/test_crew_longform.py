@@ -0,0 +1,51 @@
+import unittest
+from crew_longform import (
+    default_headings, parse_outline, plan_sections, section_body, section_instructions, short_sections, stitch,
+)
+
+#========================================================================
+class TestLongform(unittest.TestCase):
+    """Testes para o planejamento e a montagem dos artigos escritos em seções"""
+
+    def test_plan_sections(self):
+        """Testa a divisão do tamanho pedido entre as seções"""
+        plan = plan_sections(3000, section_words=500, max_sections=8)
+        self.assertEqual((plan.sections, plan.words_per_section), (6, 525))
+        self.assertEqual(plan_sections(10000, section_words=500, max_sections=8).sections, 8)
+        self.assertEqual(plan_sections(600, section_words=500, max_sections=8).sections, 2)
+
+    def test_parse_outline(self):
+        """Testa a leitura do título e das seções do esboço"""
+        outline = "# Energia Solar no Brasil\n\n## Introdução\n- **Tecnologias**\n2. Mercado\n## Introdução\n"
+        title, headings = parse_outline(outline, 3, "Energia Solar")
+        self.assertEqual(title, "Energia Solar no Brasil")
+        self.assertEqual(headings, ["Introdução", "Tecnologias", "Mercado"])
+
+        # Esboço sem seções suficientes usa a estrutura padrão
+        title, headings = parse_outline("Texto sem formato", 4, "Energia Solar")
+        self.assertEqual(title, "Artigo sobre Energia Solar")
+        self.assertEqual(headings, default_headings(4))
+        self.assertEqual(default_headings(4), ["Introdução", "Desenvolvimento 1", "Desenvolvimento 2", "Conclusão"])
+        self.assertEqual(default_headings(2), ["Introdução", "Conclusão"])
+
+    def test_stitch(self):
+        """Testa a remoção dos títulos repetidos e a montagem do artigo"""
+        self.assertEqual(section_body("## Mercado\n\n**Mercado**\nTexto da seção.", "Mercado"), "Texto da seção.")
+        article = stitch("Título", ["A", "B"], ["Texto A.", "Texto B."])
+        self.assertEqual(article, "# Título\n\n## A\n\nTexto A.\n\n## B\n\nTexto B.")
+
+    def test_transitions_and_short_sections(self):
+        """Testa as orientações de transição e a escolha das seções a complementar"""
+        headings = ["A", "B", "C"]
+        self.assertIn("primeira seção", section_instructions(0, headings))
+        self.assertIn('"A"', section_instructions(1, headings))
+        self.assertIn('"C"', section_instructions(1, headings))
+        self.assertIn("última seção", section_instructions(2, headings))
+
+        bodies = ["palavra " * 100, "palavra " * 40, "palavra " * 90]
+        self.assertEqual(short_sections(bodies, 250, 100), [(1, 60), (2, 10)])
+        self.assertEqual(short_sections(bodies, 200, 100), [])
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
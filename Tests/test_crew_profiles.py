@@ -0,0 +1,39 @@
+import unittest
+from crew_profiles import StageEstimates, choose_profile
+
+#========================================================================
+class TestProfiles(unittest.TestCase):
+    """Testes para a escolha do perfil do pipeline"""
+
+    def setUp(self):
+        """Cria estimativas conhecidas para cada perfil"""
+        self.estimates = StageEstimates(alpha=0.5, defaults={
+            ("lean", "research"): 5.0, ("lean", "writing"): 10.0,
+            ("standard", "research"): 10.0, ("standard", "writing"): 10.0,
+            ("full-edit", "research"): 10.0, ("full-edit", "writing"): 10.0, ("full-edit", "editing"): 10.0,
+        })
+
+    def test_without_budget(self):
+        """Testa que sem orçamento o perfil pedido (ou o padrão) é executado"""
+        self.assertEqual(choose_profile(), "standard")
+        self.assertEqual(choose_profile("full-edit"), "full-edit")
+        with self.assertRaises(ValueError):
+            choose_profile("rapido")
+
+    def test_budget(self):
+        """Testa a escolha do perfil mais completo que cabe no orçamento, até o pedido"""
+        self.assertEqual(choose_profile(None, 60, self.estimates), "full-edit")
+        self.assertEqual(choose_profile("standard", 60, self.estimates), "standard")
+        self.assertEqual(choose_profile("full-edit", 25, self.estimates), "standard")
+        self.assertEqual(choose_profile(None, 16, self.estimates), "lean")
+        self.assertEqual(choose_profile(None, 1, self.estimates), "lean")
+
+    def test_record(self):
+        """Testa a atualização das estimativas com as durações medidas"""
+        self.estimates.record("full-edit", {"editing": 30.0, "desconhecida": 1.0})
+        self.assertEqual(self.estimates.estimate("full-edit"), 40.0)
+        self.assertEqual(choose_profile("full-edit", 35, self.estimates), "standard")
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+import crew_semantic_cache
+from crew_semantic_cache import SemanticTopicCache, embed_topic, key_tokens
+
+#========================================================================
+class TestSemanticTopicCache(unittest.TestCase):
+    """Testes para o cache semântico de tópicos"""
+
+    def setUp(self):
+        """Cria um cache em um diretório temporário"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = SemanticTopicCache(path=directory.name, max_entries=10, ttl=60)
+
+    def test_embedding_similarity(self):
+        """Testa que variações do mesmo tópico ficam mais próximas que tópicos diferentes"""
+        solar = embed_topic("Energia Solar")
+        self.assertAlmostEqual(float(solar @ embed_topic("energia solar")), 1.0, places=5)
+        self.assertGreater(float(solar @ embed_topic("energia solar fotovoltaica")), 0.7)
+        self.assertGreater(float(solar @ embed_topic("Solar energy")), 0.7)
+        self.assertLess(float(solar @ embed_topic("Energia nuclear")), 0.7)
+        self.assertFalse(embed_topic("  ").any())
+
+    def test_research_reused_for_similar_topic(self):
+        """Testa a reutilização da pesquisa de um tópico parecido e a recusa de tópicos diferentes"""
+        self.cache.add("research", "Energia Solar", "Pesquisa sobre energia solar")
+
+        document, topic, similarity = self.cache.get("research", "energia solar fotovoltaica")
+        self.assertEqual(document, "Pesquisa sobre energia solar")
+        self.assertEqual(topic, "Energia Solar")
+        self.assertGreaterEqual(similarity, 0.7)
+
+        self.assertIsNone(self.cache.get("research", "Energia nuclear"))
+        self.assertIsNone(self.cache.get("article", "Energia Solar"))
+
+    def test_near_miss_topics_rejected(self):
+        """Testa que tópicos que diferem só por um número não são reaproveitados"""
+        self.assertEqual(key_tokens("Copa do Mundo 2022, parte II"), "2022 ii")
+        self.assertEqual(key_tokens("Energia Solar"), "")
+
+        self.cache.add("article", "Diabetes tipo 1", "artigo tipo 1")
+        self.cache.add("research", "Copa do Mundo 2014", "pesquisa 2014")
+        self.cache.add("research", "Tópico de carga 12", "carga 12")
+
+        # Mesmo acima do limiar de similaridade, um número diferente é outro tópico
+        self.assertGreater(float(embed_topic("Diabetes tipo 1") @ embed_topic("Diabetes tipo 2")), 0.9)
+        self.assertIsNone(self.cache.get("article", "Diabetes tipo 2"))
+        self.assertIsNone(self.cache.get("research", "Copa do Mundo 2022"))
+        self.assertIsNone(self.cache.get("research", "Tópico de carga 47"))
+        self.assertIsNone(self.cache.get("research", "Copa do Mundo"))
+
+        self.assertEqual(self.cache.get("article", "diabetes tipo 1")[0], "artigo tipo 1")
+        self.assertEqual(self.cache.get("research", "A Copa do Mundo de 2014")[0], "pesquisa 2014")
+
+    def test_spelled_out_numbers(self):
+        """Testa que números e ordinais por extenso contam como números"""
+        self.assertEqual(key_tokens("Diabetes tipo um"), key_tokens("diabetes tipo 1"))
+        self.assertEqual(key_tokens("Segunda Guerra Mundial"), "2")
+        self.assertEqual(key_tokens("2ª Guerra Mundial"), "2")
+        self.assertEqual(key_tokens("Three Body Problem"), "3")
+
+        self.cache.add("article", "Diabetes tipo um", "artigo tipo um")
+        self.cache.add("research", "Primeira Guerra Mundial", "pesquisa primeira guerra")
+
+        self.assertIsNone(self.cache.get("article", "Diabetes tipo dois"))
+        self.assertIsNone(self.cache.get("research", "Segunda Guerra Mundial"))
+        self.assertIsNone(self.cache.get("research", "Terceira Guerra Mundial"))
+        self.assertEqual(self.cache.get("article", "Diabetes tipo 1")[0], "artigo tipo um")
+        self.assertEqual(self.cache.get("research", "primeira guerra mundial")[0], "pesquisa primeira guerra")
+
+    def test_metadata_filter(self):
+        """Testa os filtros de metadados na busca"""
+        self.cache.add("article", "Energia Solar", "{}", min_words=300)
+        self.assertIsNotNone(self.cache.get("article", "energia solar", where={"min_words": {"$gte": 300}}))
+        self.assertIsNone(self.cache.get("article", "energia solar", where={"min_words": {"$gte": 500}}))
+
+    def test_expiration_and_eviction(self):
+        """Testa a expiração por TTL e a remoção das entradas usadas há mais tempo"""
+        self.cache.add("research", "Energia Solar", "antiga")
+        with patch("crew_semantic_cache.time.time", return_value=10**10):
+            self.assertIsNone(self.cache.get("research", "Energia Solar"))
+            # A inserção seguinte remove a entrada expirada
+            self.cache.add("research", "Energia nuclear", "nova")
+        self.assertEqual(self.cache.stats()["research"], 1)
+        self.cache.clear()
+
+        for i in range(12):
+            self.cache.add("research", f"Tópico {i} " + "x" * i, str(i))
+        self.assertLessEqual(self.cache.stats()["research"], 10)
+
+    def test_expired_nearest_entry_skipped(self):
+        """Testa que uma entrada expirada mais parecida não esconde uma entrada válida"""
+        now = 10**9
+        with patch("crew_semantic_cache.time.time", return_value=now):
+            self.cache.add("research", "Energia Solar", "antiga")
+        with patch("crew_semantic_cache.time.time", return_value=now + 50):
+            self.cache.add("research", "Energia solar fotovoltaica", "recente")
+        with patch("crew_semantic_cache.time.time", return_value=now + 70):
+            document, topic, _ = self.cache.get("research", "Energia Solar")
+        self.assertEqual((document, topic), ("recente", "Energia solar fotovoltaica"))
+
+    def test_disabled(self):
+        """Testa que SEMANTIC_CACHE=0 desativa o cache"""
+        with patch.dict("os.environ", {"SEMANTIC_CACHE": "0"}):
+            self.assertIsNone(crew_semantic_cache.get_semantic_cache())
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import crew_tracing
+
+#========================================================================
+class TestCrewTracing(unittest.TestCase):
+    """Testes para o rastreamento das etapas da crew"""
+
+    def setUp(self):
+        """Grava os spans em um arquivo temporário"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "spans.jsonl")
+        patcher = patch.dict(os.environ, {"CREW_TRACE_FILE": self.path, "CREW_TRACE_SAMPLE_RATE": "1"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_spans(self):
+        with open(self.path, encoding="utf-8") as file:
+            return [json.loads(line) for line in file]
+
+    def test_nested_spans_exported(self):
+        """Testa a hierarquia dos spans e sua gravação em JSONL"""
+        with crew_tracing.span("article", topic="IA") as article:
+            with crew_tracing.span("research") as research:
+                research.set(prompt_tokens=10)
+        self.assertIsNone(crew_tracing.current_span())
+
+        spans = {span["name"]: span for span in self.read_spans()}
+        self.assertEqual(spans["research"]["parent_span_id"], article.span_id)
+        self.assertEqual(spans["research"]["trace_id"], spans["article"]["trace_id"])
+        self.assertEqual(spans["research"]["attributes"], {"prompt_tokens": 10})
+        self.assertEqual(spans["article"]["attributes"], {"topic": "IA"})
+        self.assertGreaterEqual(spans["article"]["end_time_unix_nano"], spans["article"]["start_time_unix_nano"])
+
+    def test_failed_span(self):
+        """Testa que o erro é registrado no span e propagado"""
+        with self.assertRaises(RuntimeError):
+            with crew_tracing.span("writing"):
+                raise RuntimeError("falhou")
+        span, = self.read_spans()
+        self.assertEqual(span["status"], "error")
+        self.assertEqual(span["attributes"]["error"], "falhou")
+
+    def test_unsampled_trace_not_exported(self):
+        """Testa que traces fora da amostragem não são gravados, inclusive seus filhos"""
+        with patch.dict(os.environ, {"CREW_TRACE_SAMPLE_RATE": "0"}):
+            with crew_tracing.span("article"):
+                with crew_tracing.span("research"):
+                    pass
+        self.assertFalse(os.path.exists(self.path))
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
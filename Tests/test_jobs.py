@@ -0,0 +1,170 @@
+import asyncio
+import os
+import threading
+import unittest
+from Api.jobs import JobManager, QueueFullError, parse_admission
+from crew_metrics import Counter, drain, merge
+
+WORKER_RUNS = Counter("test_worker_runs_total", "Execuções do runner de teste por resultado", labelnames=("result",))
+
+def count_run(fail=False):
+    """Runner de teste que registra uma métrica no processo em que é executado"""
+    WORKER_RUNS.inc(result="failed" if fail else "ok")
+    if fail:
+        raise ValueError("falha no worker")
+    return os.getpid()
+
+#========================================================================
+class TestJobManager(unittest.TestCase):
+    """Testes para o pool de execução da crew"""
+
+    def setUp(self):
+        """Cria um runner que só termina quando o evento for liberado"""
+        self.release = threading.Event()
+
+        def runner(topic):
+            self.release.wait(5)
+            if topic == "erro":
+                raise RuntimeError("Falha na crew")
+            return {"title": topic}
+
+        self.manager = JobManager(runner, max_workers=1, max_queue=1)
+
+    def tearDown(self):
+        self.release.set()
+        self.manager.shutdown()
+
+    def test_submit_and_complete(self):
+        """Testa o ciclo de vida de um job bem-sucedido"""
+        job = self.manager.submit("IA")
+        self.assertIn(job.status, ("pending", "running"))
+        self.assertIs(self.manager.get(job.id), job)
+
+        self.release.set()
+        self.assertEqual(job.future.result(timeout=5), {"title": "IA"})
+        self.assertEqual(job.status, "completed")
+
+    def test_failed_job(self):
+        """Testa que erros do runner marcam o job como falho"""
+        self.release.set()
+        job = self.manager.submit("erro")
+        with self.assertRaises(RuntimeError):
+            job.future.result(timeout=5)
+        self.assertEqual(job.status, "failed")
+
+    def test_queue_full(self):
+        """Testa que o pool recusa jobs além da capacidade"""
+        self.manager.submit("a")
+        self.manager.submit("b")
+        with self.assertRaises(QueueFullError):
+            self.manager.submit("c")
+
+        self.release.set()
+        self.manager.shutdown()
+        self.assertEqual(self.manager.stats()["inflight"], 0)
+
+    def test_run_async(self):
+        """Testa a execução aguardada sem bloquear o event loop"""
+        self.release.set()
+        result = asyncio.run(self.manager.run("IA"))
+        self.assertEqual(result, {"title": "IA"})
+
+    def test_admission_by_priority(self):
+        """Testa que prioridades menores são recusadas antes, deixando vagas para as maiores"""
+        self.manager.submit("a", priority="low")
+        with self.assertRaises(QueueFullError):
+            self.manager.submit("b", priority="low")
+        self.manager.submit("b", priority="normal")
+        with self.assertRaises(QueueFullError):
+            self.manager.submit("c", priority="high")
+        self.assertEqual(self.manager.stats()["admission_limits"], {"high": 2, "normal": 2, "low": 1})
+        with self.assertRaises(ValueError):
+            parse_admission("urgente=1")
+
+    def test_priority_order(self):
+        """Testa que jobs mais prioritários passam à frente na fila"""
+        order = []
+
+        def runner(topic):
+            self.release.wait(5)
+            order.append(topic)
+
+        manager = JobManager(runner, max_workers=1, max_queue=10)
+        self.addCleanup(manager.shutdown)
+
+        # O primeiro job ocupa o único worker; os demais aguardam na fila
+        jobs = [manager.submit(topic, priority=priority)
+                for topic, priority in (("primeiro", "low"), ("baixa", "low"), ("normal", "normal"), ("alta", "high"))]
+        self.assertEqual(manager.stats()["queued_by_priority"], {"high": 1, "normal": 1, "low": 1})
+
+        self.release.set()
+        for job in jobs:
+            job.future.result(timeout=5)
+        self.assertEqual(order, ["primeiro", "alta", "normal", "baixa"])
+
+    def test_process_workers_recycled(self):
+        """Testa os workers em processos substituídos a cada 'max_tasks_per_child' execuções"""
+        manager = JobManager(os.getpid, max_workers=1, executor="process", max_tasks_per_child=1, preload=("json",))
+        self.addCleanup(manager.shutdown)
+        manager.start()
+
+        pids = [asyncio.run(manager.run()) for _ in range(3)]
+        self.assertNotIn(os.getpid(), pids)
+        self.assertEqual(len(set(pids)), 3)
+
+    def test_process_workers_without_semantic_cache(self):
+        """Testa que os workers em processos não abrem o cache semântico, que pertence ao processo da API"""
+        import crew_semantic_cache
+
+        manager = JobManager(crew_semantic_cache.get_semantic_cache, max_workers=1, executor="process",
+                             preload=("json",))
+        self.addCleanup(manager.shutdown)
+        self.assertIsNone(asyncio.run(manager.run()))
+
+    def test_process_worker_metrics_merged(self):
+        """Testa que as métricas registradas nos workers em processos chegam às métricas da API"""
+        WORKER_RUNS.reset()
+        manager = JobManager(count_run, max_workers=1, executor="process", preload=("json",))
+        self.addCleanup(manager.shutdown)
+
+        self.assertNotEqual(asyncio.run(manager.run()), os.getpid())
+        with self.assertRaisesRegex(ValueError, "falha no worker"):
+            asyncio.run(manager.run(True))
+        self.assertEqual(WORKER_RUNS.value(result="ok"), 1)
+        self.assertEqual(WORKER_RUNS.value(result="failed"), 1)
+
+    def test_local_and_process_jobs_share_workers(self):
+        """Testa que as execuções locais e as dos workers em processos dividem o mesmo limite de execuções"""
+        manager = JobManager(os.getpid, max_workers=1, max_queue=4, executor="process", preload=("json",))
+        self.addCleanup(manager.shutdown)
+
+        local = manager.submit_task(self.release.wait, 5)
+        job = manager.submit()
+        # O único worker está ocupado pela execução local, então o job aguarda na fila
+        self.assertEqual(job.status, "pending")
+        self.assertEqual(manager.stats()["queued"], 1)
+
+        self.release.set()
+        self.assertTrue(local.result(timeout=5))
+        self.assertNotEqual(job.future.result(timeout=30), os.getpid())
+
+    def test_metrics_drain_and_merge(self):
+        """Testa a coleta das métricas de um processo e a soma em outro, criando as que não existem"""
+        WORKER_RUNS.reset()
+        WORKER_RUNS.inc(2, result="ok")
+        deltas = [delta for delta in drain() if delta["name"] == WORKER_RUNS.name]
+        self.assertEqual(WORKER_RUNS.value(result="ok"), 0)
+
+        merge(deltas)
+        merge(deltas)
+        self.assertEqual(WORKER_RUNS.value(result="ok"), 4)
+        merge([{**deltas[0], "name": "test_worker_runs_merged_total"}])
+        self.assertIn("test_worker_runs_merged_total", {delta["name"] for delta in drain()})
+
+    def test_unknown_job(self):
+        """Testa a consulta de um job inexistente"""
+        self.assertIsNone(self.manager.get("inexistente"))
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+# Raiz do projeto, de onde o módulo da API é importado
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Dependências que não podem ser carregadas na importação da API
+HEAVY_MODULES = ("crewai", "crewai_tools", "langchain", "langchain_core", "litellm", "chromadb")
+
+# Orçamento, em milissegundos, para importar a API (configurável por IMPORT_TIME_BUDGET_MS)
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2000"))
+
+#========================================================================
+def import_times(module):
+    """Importa o módulo num processo novo com -X importtime e retorna {módulo: tempo acumulado em ms}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", line)
+        if match:
+            times[match.group(2)] = int(match.group(1)) / 1000
+    return times
+
+#========================================================================
+class TestStartup(unittest.TestCase):
+    """Testes para o tempo de inicialização da API"""
+
+    def test_api_import_is_light(self):
+        """Testa que importar a API não carrega a crew nem suas dependências pesadas"""
+        times = import_times("Api.routes")
+        loaded = sorted(name for name in times if name.split(".")[0] in HEAVY_MODULES + ("crew_logic", "main"))
+        self.assertEqual(loaded, [])
+
+    def test_cache_key_is_light(self):
+        """Testa que as chaves de cache, calculadas no event loop, não carregam a crew"""
+        code = (
+            "import sys; from Api.cache import article_cache_key; from Api.batch import BatchRunner; "
+            "article_cache_key('Energia Solar', 300); "
+            f"print(sorted(name for name in sys.modules if name.split('.')[0] in {HEAVY_MODULES + ('Agents', 'Tools')!r}))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_api_import_time_budget(self):
+        """Testa que a importação da API cabe no orçamento de tempo"""
+        times = import_times("Api.routes")
+        self.assertLess(times["Api"], IMPORT_TIME_BUDGET_MS, f"Importação da API levou {times['Api']:.0f} ms")
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,287 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+import requests
+from Tools import WikipediaTool
+from Tools.WikipediaCache import WikipediaCache
+from Tools.WikipediaCorpus import LocalWikipediaCorpus, build_index
+
+#========================================================================
+def fake_response(status_code, data=None, headers=None):
+    """Cria uma resposta HTTP falsa"""
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data or {}
+    response.headers = headers or {}
+    return response
+
+#========================================================================
+class TestWikipediaTool(unittest.TestCase):
+    """Testes para a ferramenta da Wikipedia"""
+
+    def setUp(self):
+        """Cria a ferramenta sem cache e sem espera entre as tentativas"""
+        self.tool = WikipediaTool(backoff=0, max_retries=2, cache=None)
+        self.session = MagicMock()
+        patcher = patch("Tools.WikipediaTool.get_session", return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_summary(self):
+        """Testa a busca de um resumo com timeouts configurados"""
+        self.session.get.return_value = fake_response(200, {"extract": "Resumo"})
+
+        self.assertEqual(self.tool.run("Energia Solar"), "Resumo")
+        url = self.session.get.call_args.args[0]
+        self.assertTrue(url.endswith("/page/summary/Energia_Solar"))
+        self.assertEqual(self.session.get.call_args.kwargs["timeout"], (self.tool.connect_timeout, self.tool.read_timeout))
+
+    def test_retry_on_temporary_error(self):
+        """Testa novas tentativas após 503 e timeout"""
+        self.session.get.side_effect = [
+            fake_response(503),
+            requests.Timeout("lento"),
+            fake_response(200, {"extract": "Resumo"}),
+        ]
+        self.assertEqual(self.tool.run("IA"), "Resumo")
+        self.assertEqual(self.session.get.call_count, 3)
+
+    def test_no_retry_on_not_found(self):
+        """Testa que 404 não é repetido"""
+        self.session.get.return_value = fake_response(404)
+        self.assertIn("404", self.tool.run("Inexistente"))
+        self.assertEqual(self.session.get.call_count, 1)
+
+    def test_retries_exhausted(self):
+        """Testa a mensagem de erro após esgotar as tentativas"""
+        self.session.get.side_effect = requests.ConnectionError("sem rede")
+        self.assertIn("sem rede", self.tool.run("IA"))
+        self.assertEqual(self.session.get.call_count, 3)
+
+    def test_run_many(self):
+        """Testa a busca em lote com tópicos duplicados e páginas relacionadas"""
+        def get(url, timeout):
+            if "/related/" in url:
+                return fake_response(200, {"pages": [{"title": "Sol", "extract": "Estrela"}]})
+            return fake_response(200, {"extract": url.rsplit("/", 1)[1]})
+
+        self.session.get.side_effect = get
+        results = self.tool.run_many(["A", "B", "A"], include_related=True)
+
+        self.assertEqual(list(results), ["A", "B"])
+        self.assertTrue(results["A"].startswith("A"))
+        self.assertIn("- Sol: Estrela", results["B"])
+        self.assertEqual(self.session.get.call_count, 4)
+
+    def test_invalid_json(self):
+        """Testa que uma página de erro em HTML no lugar do JSON é tratada como falha"""
+        response = fake_response(200)
+        response.json.side_effect = ValueError("Expecting value")
+        self.session.get.return_value = response
+        self.assertIn("resposta inválida", self.tool.run("IA"))
+        self.assertEqual(self.tool.run_many(["IA"], include_related=True)["IA"],
+                         "Erro ao buscar informações na Wikipedia: resposta inválida")
+
+    def test_settings_read_per_instance(self):
+        """Testa que as variáveis WIKIPEDIA_* são lidas ao criar a ferramenta, e não na importação"""
+        with patch.dict("os.environ", {"WIKIPEDIA_API_URL": "http://stub", "WIKIPEDIA_MAX_RETRIES": "7",
+                                       "WIKIPEDIA_BACKEND": "LOCAL"}):
+            tool = WikipediaTool(cache=None)
+        self.assertEqual((tool.api_url, tool.max_retries, tool.backend), ("http://stub", 7, "local"))
+        self.assertEqual(WikipediaTool(cache=None, max_retries=1).max_retries, 1)
+
+    def test_latency_histogram(self):
+        """Testa o registro da latência das requisições"""
+        self.session.get.return_value = fake_response(200, {"extract": "Resumo"})
+        before = self.tool.latency.snapshot().get(("summary",), {"count": 0})["count"]
+        self.tool.run("IA")
+        self.assertEqual(self.tool.latency.snapshot()[("summary",)]["count"], before + 1)
+
+#========================================================================
+class TestWikipediaCache(unittest.TestCase):
+    """Testes para o cache das consultas à Wikipedia"""
+
+    def setUp(self):
+        """Cria um cache com nível em disco num diretório temporário"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "cache.sqlite")
+        self.cache = WikipediaCache(path=self.path, max_entries=2)
+        self.addCleanup(self.cache.close)
+
+    def test_normalized_keys(self):
+        """Testa que variações do mesmo título compartilham a entrada"""
+        self.cache.set("Energia Solar", "Resumo")
+        self.assertEqual(self.cache.get("energia_solar "), "Resumo")
+        self.assertIsNone(self.cache.get("Energia Eólica"))
+        self.assertEqual(self.cache.stats()["memory_hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_lru_eviction_and_disk_tier(self):
+        """Testa a remoção do LRU em memória e a leitura do nível em disco"""
+        for title in ("A", "B", "C"):
+            self.cache.set(title, title.lower())
+        self.assertEqual(self.cache.stats()["memory_entries"], 2)
+
+        self.assertEqual(self.cache.get("A"), "a")
+        self.assertEqual(self.cache.stats()["disk_hits"], 1)
+
+        # O arquivo persiste entre instâncias
+        other = WikipediaCache(path=self.path)
+        self.addCleanup(other.close)
+        self.assertEqual(other.get("C"), "c")
+
+    def test_negative_ttl(self):
+        """Testa que erros expiram segundo o TTL negativo"""
+        cache = WikipediaCache(negative_ttl=0)
+        cache.set("Inexistente", "Erro", negative=True)
+        self.assertIsNone(cache.get("Inexistente"))
+
+    def test_tool_uses_cache(self):
+        """Testa que a ferramenta não repete requisições de tópicos em cache"""
+        session = MagicMock()
+        session.get.side_effect = [fake_response(200, {"extract": "Resumo"}), fake_response(404)]
+        tool = WikipediaTool(cache=self.cache)
+
+        with patch("Tools.WikipediaTool.get_session", return_value=session):
+            for _ in range(2):
+                self.assertEqual(tool.run("IA"), "Resumo")
+                self.assertIn("404", tool.run("Inexistente"))
+        self.assertEqual(session.get.call_count, 2)
+
+    def test_temporary_failures_not_cached(self):
+        """Testa que timeouts e erros 5xx não são guardados como páginas inexistentes"""
+        session = MagicMock()
+        session.get.side_effect = [
+            requests.Timeout("lento"), fake_response(503), fake_response(200, {"extract": "Resumo"}),
+            fake_response(200, {"pages": []}),
+        ]
+        tool = WikipediaTool(cache=self.cache, max_retries=0)
+
+        with patch("Tools.WikipediaTool.get_session", return_value=session):
+            self.assertIn("lento", tool.run("IA"))
+            self.assertIn("503", tool.run("IA"))
+            self.assertEqual(tool.run("IA"), "Resumo")
+            self.assertIsNone(self.cache.get("IA", namespace="related"))
+            # Uma lista vazia de páginas relacionadas é uma resposta real e fica no cache negativo
+            self.assertEqual(tool.run_many(["IA"], include_related=True)["IA"], "Resumo")
+            self.assertEqual(tool.run_many(["IA"], include_related=True)["IA"], "Resumo")
+        self.assertEqual(session.get.call_count, 4)
+
+#========================================================================
+class TestWikipediaCorpus(unittest.TestCase):
+    """Testes para o índice local da Wikipedia"""
+
+    def setUp(self):
+        """Gera um índice a partir de um dump pequeno"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dump = os.path.join(self.tmp.name, "dump.jsonl")
+        self.index = os.path.join(self.tmp.name, "index")
+        self.write_dump([
+            {"title": "Energia solar", "text": "A energia solar é a energia da luz do Sol."},
+            {"title": "Energia eólica", "text": "A energia eólica vem do vento."},
+            {"title": "Solar power", "redirect": "Energia solar"},
+        ])
+        build_index(self.dump, self.index)
+
+    def write_dump(self, records, mode="w"):
+        with open(self.dump, mode, encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def open_corpus(self):
+        corpus = LocalWikipediaCorpus(self.index)
+        self.addCleanup(corpus.close)
+        return corpus
+
+    def test_lookup_and_redirect(self):
+        """Testa a busca exata e por redirect"""
+        corpus = self.open_corpus()
+        self.assertEqual(corpus.lookup("energia_solar")[0], "Energia solar")
+        self.assertEqual(corpus.lookup("Solar Power")[0], "Energia solar")
+        self.assertIsNone(corpus.lookup("Hidrelétrica"))
+
+    def test_fuzzy_resolve(self):
+        """Testa a busca aproximada por erro de digitação e por texto"""
+        corpus = self.open_corpus()
+        self.assertEqual(corpus.resolve("Energia solr")[0], "Energia solar")
+        self.assertEqual(corpus.resolve("vento")[0], "Energia eólica")
+        # Páginas que só compartilham parte dos termos do título não são aceitas
+        self.assertIsNone(corpus.resolve("Energia hidrelétrica"))
+        self.assertIsNone(corpus.resolve("Geotermia"))
+
+    def test_related(self):
+        """Testa as páginas relacionadas, sem a própria página"""
+        corpus = self.open_corpus()
+        self.assertEqual([title for title, _ in corpus.related("Energia solar")], ["Energia eólica"])
+        self.assertEqual({title for title, _ in corpus.related("Energia hidrelétrica", limit=5)},
+                         {"Energia eólica", "Energia solar"})
+
+    def test_incremental_build(self):
+        """Testa que o build incremental processa só as linhas novas"""
+        self.write_dump([
+            {"title": "Energia eólica", "text": "Turbinas convertem o vento em eletricidade."},
+            {"title": "Biomassa", "text": "Energia de matéria orgânica."},
+        ], mode="a")
+        stats = build_index(self.dump, self.index)
+
+        self.assertTrue(stats["incremental"])
+        self.assertEqual(stats["lines_read"], 2)
+        # A versão anterior de "Energia eólica" sai do índice
+        self.assertEqual(stats["documents"], 3)
+        self.write_dump([{"title": "Energia eólica", "text": "Aerogeradores convertem o vento."}], mode="a")
+        self.assertEqual(build_index(self.dump, self.index)["documents"], 3)
+        corpus = self.open_corpus()
+        self.assertIn("Aerogeradores", corpus.lookup("Energia eólica")[1])
+        self.assertEqual(corpus.doc_count, 3)
+        self.assertEqual([title for title, _ in corpus.search("vento")], ["Energia eólica"])
+        self.assertEqual(corpus.search("Turbinas"), [])
+        self.assertEqual(corpus.lookup("Biomassa")[0], "Biomassa")
+        self.assertEqual(corpus.lookup("Solar power")[0], "Energia solar")
+
+    def test_incremental_build_with_redirects(self):
+        """Testa os redirects mantidos entre builds incrementais e uma página com o título de um redirect"""
+        self.write_dump([{"title": "Hidro", "redirect": "Hidrelétrica"}], mode="a")
+        build_index(self.dump, self.index)
+        self.write_dump([
+            {"title": "Hidrelétrica", "text": "A energia hidrelétrica vem da água dos rios."},
+            {"title": "Solar power", "text": "Solar power is energy from sunlight."},
+        ], mode="a")
+        stats = build_index(self.dump, self.index)
+
+        self.assertTrue(stats["incremental"])
+        corpus = self.open_corpus()
+        # O redirect lido no build anterior, ainda sem destino, passa a valer
+        self.assertEqual(corpus.lookup("Hidro")[0], "Hidrelétrica")
+        # A nova página ocupa a chave do redirect sem remover a página de destino
+        self.assertEqual(corpus.lookup("Solar power")[0], "Solar power")
+        self.assertEqual(corpus.lookup("Energia solar")[0], "Energia solar")
+        self.assertIn("Energia solar", [title for title, _ in corpus.search("luz do Sol")])
+
+    def test_replaced_dump_rebuilt(self):
+        """Testa que um dump substituído (e não só acrescido) é reprocessado por inteiro"""
+        self.write_dump([
+            {"title": "Energia nuclear", "text": "A energia nuclear vem da fissão de átomos."},
+            {"title": "Energia eólica", "text": "A energia eólica vem do vento."},
+            {"title": "Solar power", "redirect": "Energia solar"},
+            {"title": "Biomassa", "text": "Energia de matéria orgânica."},
+        ])
+        stats = build_index(self.dump, self.index)
+
+        self.assertFalse(stats["incremental"])
+        corpus = self.open_corpus()
+        self.assertIsNone(corpus.lookup("Energia solar"))
+        self.assertIsNone(corpus.lookup("Solar power"))
+        self.assertEqual(corpus.lookup("Energia nuclear")[0], "Energia nuclear")
+
+    def test_tool_local_backend(self):
+        """Testa a ferramenta usando o índice local"""
+        tool = WikipediaTool(backend="local", index_dir=self.index, cache=None)
+        self.assertIn("luz do Sol", tool.run("Solar power"))
+
+#========================================================================
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,203 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from crew_metrics import Counter
+from crew_topics import normalize_title  # noqa: F401 (também exportada por este módulo)
+
+CACHE_REQUESTS = Counter(
+    "wikipedia_cache_requests_total",
+    "Consultas ao cache da Wikipedia por resultado (memory_hit, disk_hit ou miss)",
+    labelnames=("result",),
+)
+
+#-------------------------------------------------------------------
+class WikipediaCache:
+    """
+    Cache em dois níveis para as consultas da Wikipedia: um LRU em memória
+    e, opcionalmente, um arquivo SQLite persistente entre execuções.
+
+    Respostas bem-sucedidas ficam válidas por 'ttl' segundos; páginas inexistentes
+    (cache negativo) por 'negative_ttl' segundos. Falhas temporárias não são guardadas.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 1024,
+                 max_disk_entries: int = 100_000, ttl: float = 86400,
+                 negative_ttl: float = 300):
+        """
+        Args:
+            path (str): Arquivo SQLite do nível em disco. Se None, usa só a memória.
+            max_entries (int): Máximo de entradas no LRU em memória.
+            max_disk_entries (int): Máximo de entradas no arquivo SQLite.
+            ttl (float): Validade, em segundos, das respostas bem-sucedidas.
+            negative_ttl (float): Validade, em segundos, das páginas inexistentes.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS wikipedia_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS wikipedia_cache_accessed ON wikipedia_cache (accessed_at)"
+            )
+            self._db.commit()
+
+    #-------------------------------------------------------------
+    @classmethod
+    def from_env(cls) -> "WikipediaCache":
+        """
+        Cria o cache a partir das variáveis de ambiente WIKIPEDIA_CACHE_PATH,
+        WIKIPEDIA_CACHE_SIZE, WIKIPEDIA_CACHE_DISK_SIZE, WIKIPEDIA_CACHE_TTL e
+        WIKIPEDIA_CACHE_NEGATIVE_TTL.
+        """
+        return cls(
+            path=os.getenv("WIKIPEDIA_CACHE_PATH") or None,
+            max_entries=int(os.getenv("WIKIPEDIA_CACHE_SIZE", "1024")),
+            max_disk_entries=int(os.getenv("WIKIPEDIA_CACHE_DISK_SIZE", "100000")),
+            ttl=float(os.getenv("WIKIPEDIA_CACHE_TTL", "86400")),
+            negative_ttl=float(os.getenv("WIKIPEDIA_CACHE_NEGATIVE_TTL", "300")),
+        )
+
+    @staticmethod
+    def _key(title: str, namespace: str) -> str:
+        return f"{namespace}:{normalize_title(title)}"
+
+    #-------------------------------------------------------------
+    def get(self, title: str, namespace: str = "summary") -> Optional[str]:
+        """
+        Retorna o valor em cache para o título, ou None se ausente ou expirado
+        """
+        key = self._key(title, namespace)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] > now:
+                self._memory.move_to_end(key)
+                self.hits["memory"] += 1
+                CACHE_REQUESTS.inc(result="memory_hit")
+                return entry[0]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM wikipedia_cache WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE wikipedia_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+                    self._remember(key, row[0], row[1])
+                    self.hits["disk"] += 1
+                    CACHE_REQUESTS.inc(result="disk_hit")
+                    return row[0]
+
+            self.misses += 1
+            CACHE_REQUESTS.inc(result="miss")
+            return None
+
+    def set(self, title: str, value: str, negative: bool = False, namespace: str = "summary"):
+        """
+        Armazena o valor do título nos dois níveis do cache.
+
+        Args:
+            negative (bool): Se True, o valor indica uma página inexistente e usa 'negative_ttl'.
+        """
+        key = self._key(title, namespace)
+        now = time.time()
+        expires_at = now + (self.negative_ttl if negative else self.ttl)
+
+        with self._lock:
+            self._remember(key, value, expires_at)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO wikipedia_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now),
+                )
+                self._evict_disk(now)
+                self._db.commit()
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        # Remove as entradas expiradas e, se ainda acima do limite, as menos acessadas
+        self._db.execute("DELETE FROM wikipedia_cache WHERE expires_at <= ?", (now,))
+        excess = self._db.execute("SELECT COUNT(*) FROM wikipedia_cache").fetchone()[0] - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM wikipedia_cache WHERE key IN"
+                " (SELECT key FROM wikipedia_cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+
+    #-------------------------------------------------------------
+    def clear(self):
+        """
+        Esvazia os dois níveis do cache
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM wikipedia_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores de acertos/faltas e o tamanho do nível em memória
+        """
+        with self._lock:
+            return {
+                "memory_hits": self.hits["memory"],
+                "disk_hits": self.hits["disk"],
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self):
+        """
+        Fecha o arquivo SQLite, se houver
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+#-------------------------------------------------------------------
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache() -> Optional[WikipediaCache]:
+    """
+    Retorna o cache compartilhado pelo processo, ou None se WIKIPEDIA_CACHE=0
+    """
+    global _default_cache
+
+    if os.getenv("WIKIPEDIA_CACHE", "1") == "0":
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = WikipediaCache.from_env()
+        return _default_cache
@@ -0,0 +1,487 @@
+"""
+Backend local da Wikipedia: lê um dump em JSON Lines e monta um índice compacto
+em disco, consultado via mmap, para buscar resumos sem acesso à rede.
+
+Formato do dump (uma linha por página, como gera o 'wikiextractor --json'):
+    {"title": "Energia solar", "text": "A energia solar é ..."}
+    {"title": "Solar", "redirect": "Energia solar"}
+
+Arquivos do índice:
+    docs.idx / docs.bin       tabela de documentos (título e resumo de cada página)
+    titles.idx / keys.bin     títulos normalizados ordenados -> documento (inclui redirects)
+    terms.idx / terms.bin     termos ordenados -> lista de documentos
+    postings.bin              ids dos documentos de cada termo (uint32)
+    redirects.json            redirects lidos do dump (título -> destino), para builds incrementais
+    manifest.json             origem, posição já processada e resumo do trecho processado
+
+Uso:
+    python -m Tools.WikipediaCorpus build dump.jsonl indice/ [--full]
+    python -m Tools.WikipediaCorpus bench indice/ "Energia solar" "Python" [--rest]
+"""
+import argparse
+import bz2
+import difflib
+import gzip
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import statistics
+import struct
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from crew_topics import normalize_title
+
+DOC_ENTRY = struct.Struct("<QIQI")    # título (offset, tamanho), resumo (offset, tamanho)
+TITLE_ENTRY = struct.Struct("<QII")   # chave (offset, tamanho), id do documento
+TERM_ENTRY = struct.Struct("<QIQI")   # termo (offset, tamanho), postings (offset, quantidade)
+
+SUMMARY_CHARS = 1500
+
+# Bytes do início e do fim do trecho já processado comparados no build incremental
+DIGEST_WINDOW = 64 * 1024
+TOKEN_RE = re.compile(r"\w{2,}")
+
+#-------------------------------------------------------------------
+def tokenize(text: str) -> List[str]:
+    """
+    Divide o texto em termos normalizados para o índice invertido
+    """
+    return TOKEN_RE.findall(text.casefold())
+
+def summarize(text: str, max_chars: int = SUMMARY_CHARS) -> str:
+    """
+    Extrai o início do texto, cortado no fim de uma frase, como resumo
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(". ", 0, max_chars)
+    return text[:cut + 1] if cut > 0 else text[:max_chars]
+
+def _open_source(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+def _map(path):
+    # Arquivos vazios não podem ser mapeados; nesse caso basta um buffer vazio
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+#-------------------------------------------------------------------
+class LocalWikipediaCorpus:
+    """
+    Consulta somente leitura de um índice gerado por 'build_index'
+    """
+
+    def __init__(self, index_dir: str):
+        """
+        Args:
+            index_dir (str): Diretório com os arquivos do índice.
+        """
+        self.index_dir = index_dir
+        path = lambda name: os.path.join(index_dir, name)
+
+        self._docs_idx = _map(path("docs.idx"))
+        self._docs = _map(path("docs.bin"))
+        self._titles_idx = _map(path("titles.idx"))
+        self._keys = _map(path("keys.bin"))
+        self._terms_idx = _map(path("terms.idx"))
+        self._terms = _map(path("terms.bin"))
+        self._postings = _map(path("postings.bin"))
+
+        self.doc_count = len(self._docs_idx) // DOC_ENTRY.size
+        self.title_count = len(self._titles_idx) // TITLE_ENTRY.size
+        self.term_count = len(self._terms_idx) // TERM_ENTRY.size
+
+    #-------------------------------------------------------------
+    def _doc(self, doc_id: int) -> Tuple[str, str]:
+        title_off, title_len, text_off, text_len = DOC_ENTRY.unpack_from(self._docs_idx, doc_id * DOC_ENTRY.size)
+        title = self._docs[title_off:title_off + title_len].decode("utf-8")
+        text = self._docs[text_off:text_off + text_len].decode("utf-8")
+        return title, text
+
+    def _title_key(self, i: int) -> bytes:
+        key_off, key_len, _ = TITLE_ENTRY.unpack_from(self._titles_idx, i * TITLE_ENTRY.size)
+        return self._keys[key_off:key_off + key_len]
+
+    def _title_doc(self, i: int) -> int:
+        return TITLE_ENTRY.unpack_from(self._titles_idx, i * TITLE_ENTRY.size)[2]
+
+    def _lower_bound(self, key: bytes) -> int:
+        # Busca binária direto no arquivo mapeado, sem carregar a tabela na memória
+        lo, hi = 0, self.title_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._title_key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _postings_for(self, term: str) -> array:
+        key = term.encode("utf-8")
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            term_off, term_len, post_off, post_count = TERM_ENTRY.unpack_from(self._terms_idx, mid * TERM_ENTRY.size)
+            current = self._terms[term_off:term_off + term_len]
+            if current == key:
+                postings = array("I")
+                postings.frombytes(self._postings[post_off:post_off + post_count * 4])
+                return postings
+            if current < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return array("I")
+
+    #-------------------------------------------------------------
+    def lookup(self, title: str) -> Optional[Tuple[str, str]]:
+        """
+        Busca exata (após normalização) de um título ou redirect
+
+        Returns:
+            Tuple[str, str]: (título da página, resumo), ou None se não existir
+        """
+        key = normalize_title(title).encode("utf-8")
+        i = self._lower_bound(key)
+        if i < self.title_count and self._title_key(i) == key:
+            return self._doc(self._title_doc(i))
+        return None
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        Busca por texto no índice invertido, pontuando cada página pela soma
+        do IDF dos termos da consulta que ela contém
+
+        Returns:
+            List[Tuple[str, float]]: (título, pontuação) das melhores páginas
+        """
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings_for(term)
+            if not postings:
+                continue
+            idf = 1.0 + (self.doc_count / len(postings))
+            for doc_id in postings:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(self._doc(doc_id)[0], score) for doc_id, score in best]
+
+    def _full_score(self, query: str) -> float:
+        """
+        Pontuação de 'search' de uma página que contém todos os termos da consulta
+        (infinita se algum termo não estiver no índice)
+        """
+        score = 0.0
+        for term in set(tokenize(query)):
+            postings = self._postings_for(term)
+            if not postings:
+                return math.inf
+            score += 1.0 + (self.doc_count / len(postings))
+        return score
+
+    def resolve(self, title: str) -> Optional[Tuple[str, str]]:
+        """
+        Encontra a página mais provável para o título: busca exata, depois
+        títulos vizinhos parecidos (erros de digitação, prefixos) e por fim
+        a busca por texto, aceita só se a página contiver todos os termos do título.
+
+        Returns:
+            Tuple[str, str]: (título da página, resumo), ou None se nada for encontrado
+        """
+        found = self.lookup(title)
+        if found is not None:
+            return found
+
+        key = normalize_title(title)
+        if not key:
+            return None
+        i = self._lower_bound(key.encode("utf-8"))
+        neighbors = {}
+        for j in range(max(0, i - 5), min(self.title_count, i + 5)):
+            neighbors[self._title_key(j).decode("utf-8")] = j
+        close = difflib.get_close_matches(key, list(neighbors), n=1, cutoff=0.8)
+        if close:
+            return self._doc(self._title_doc(neighbors[close[0]]))
+        if i < self.title_count and self._title_key(i).decode("utf-8").startswith(key):
+            return self._doc(self._title_doc(i))
+
+        # Uma página que contém só parte dos termos (ex.: só "energia") costuma ser outro assunto
+        hits = self.search(title, limit=1)
+        if hits and math.isclose(hits[0][1], self._full_score(title)):
+            return self.lookup(hits[0][0])
+        return None
+
+    def related(self, title: str, limit: int = 3) -> List[Tuple[str, str]]:
+        """
+        Páginas que compartilham termos com o título, excluindo a própria página
+        """
+        found = self.resolve(title)
+        exclude = found[0] if found else None
+        hits = [t for t, _ in self.search(f"{title} {found[1] if found else ''}", limit=limit + 1) if t != exclude]
+        pages = [self.lookup(t) for t in hits]
+        return [page for page in pages if page is not None][:limit]
+
+    def close(self):
+        """
+        Libera os arquivos mapeados
+        """
+        for buffer in (self._docs_idx, self._docs, self._titles_idx, self._keys,
+                       self._terms_idx, self._terms, self._postings):
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+#-------------------------------------------------------------------
+def _load_existing(index_dir):
+    """
+    Lê os documentos, postings e redirects de um índice já existente para um build incremental.
+
+    Returns:
+        tuple: (documentos, títulos próprios -> documento, postings, redirects)
+    """
+    corpus = LocalWikipediaCorpus(index_dir)
+    try:
+        docs = [corpus._doc(i) for i in range(corpus.doc_count)]
+        titles, redirects = {}, {}
+        for i in range(corpus.title_count):
+            key, doc_id = corpus._title_key(i).decode("utf-8"), corpus._title_doc(i)
+            # As demais chaves da tabela são redirects, que apontam para o título do documento
+            target = normalize_title(docs[doc_id][0])
+            if key == target:
+                titles[key] = doc_id
+            else:
+                redirects[key] = target
+        postings = {}
+        for i in range(corpus.term_count):
+            term_off, term_len, post_off, post_count = TERM_ENTRY.unpack_from(corpus._terms_idx, i * TERM_ENTRY.size)
+            term = corpus._terms[term_off:term_off + term_len].decode("utf-8")
+            doc_ids = array("I")
+            doc_ids.frombytes(corpus._postings[post_off:post_off + post_count * 4])
+            postings[term] = set(doc_ids)
+    finally:
+        corpus.close()
+
+    # Os redirects gravados incluem os que ainda não tinham destino no índice
+    redirects_path = os.path.join(index_dir, "redirects.json")
+    if os.path.exists(redirects_path):
+        with open(redirects_path, encoding="utf-8") as f:
+            redirects.update(json.load(f))
+    return docs, titles, postings, redirects
+
+def _source_digest(path, offset):
+    """
+    Resumo do início e do fim do trecho do dump já processado ('offset' bytes), que muda
+    quando o dump é substituído ou reescrito em vez de apenas crescer
+    """
+    digest = hashlib.sha256(str(offset).encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(min(offset, DIGEST_WINDOW)))
+        f.seek(max(0, offset - DIGEST_WINDOW))
+        digest.update(f.read(min(offset, DIGEST_WINDOW)))
+    return digest.hexdigest()
+
+def _write_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def build_index(source: str, index_dir: str, full: bool = False) -> dict:
+    """
+    Gera (ou atualiza) o índice a partir de um dump em JSON Lines.
+
+    Por padrão o build é incremental: se o dump só cresceu desde o último build
+    (o trecho já processado tem o mesmo resumo), apenas as linhas novas são
+    processadas e mescladas ao índice existente. Páginas repetidas substituem a
+    versão anterior, que é removida do índice, e os redirects do build anterior
+    continuam valendo.
+
+    Args:
+        source (str): Caminho do dump (.jsonl, .jsonl.gz ou .jsonl.bz2).
+        index_dir (str): Diretório onde o índice será gravado.
+        full (bool): Se True, ignora o índice existente e reprocessa o dump inteiro.
+
+    Returns:
+        dict: Estatísticas do build (documentos, títulos, termos, linhas lidas).
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    manifest_path = os.path.join(index_dir, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path) and not full:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    size = os.path.getsize(source)
+    incremental = (
+        manifest.get("source") == os.path.abspath(source)
+        and manifest.get("offset", 0) <= size
+        and not source.endswith((".gz", ".bz2"))
+        and manifest.get("digest") == _source_digest(source, manifest.get("offset", 0))
+    )
+
+    # 'titles' contém só os títulos das próprias páginas; os redirects são resolvidos no fim
+    docs: List[Tuple[str, str]] = []
+    titles: Dict[str, int] = {}
+    postings: Dict[str, set] = {}
+    redirects: Dict[str, str] = {}
+    offset = 0
+    if incremental:
+        docs, titles, postings, redirects = _load_existing(index_dir)
+        offset = manifest["offset"]
+
+    replaced = set()
+    lines = 0
+    with _open_source(source) as f:
+        f.seek(offset)
+        for raw in f:
+            # Uma linha incompleta no fim do arquivo fica para o próximo build
+            if not raw.endswith(b"\n"):
+                break
+            offset += len(raw)
+            raw = raw.strip()
+            if not raw:
+                continue
+            record = json.loads(raw)
+            lines += 1
+            title = record.get("title", "").strip()
+            key = normalize_title(title)
+            if not key:
+                continue
+            if record.get("redirect"):
+                redirects[key] = normalize_title(record["redirect"])
+                continue
+
+            text = record.get("text") or record.get("extract") or ""
+            doc_id = len(docs)
+            if key in titles:
+                replaced.add(titles[key])
+            docs.append((title, summarize(text)))
+            titles[key] = doc_id
+            for term in set(tokenize(f"{title} {text}")):
+                postings.setdefault(term, set()).add(doc_id)
+
+    # Remove as versões substituídas das páginas e renumera os documentos restantes
+    if replaced:
+        renumber = {}
+        for doc_id, doc in enumerate(docs):
+            if doc_id not in replaced:
+                renumber[doc_id] = len(renumber)
+        docs = [doc for doc_id, doc in enumerate(docs) if doc_id in renumber]
+        titles = {key: renumber[doc_id] for key, doc_id in titles.items()}
+        postings = {term: {renumber[doc_id] for doc_id in doc_ids if doc_id in renumber}
+                    for term, doc_ids in postings.items()}
+
+    # Uma página com o mesmo título de um redirect tem precedência sobre ele
+    keys = dict(titles)
+    for key, target in redirects.items():
+        if target in titles and key not in titles:
+            keys[key] = titles[target]
+
+    # Monta os arquivos binários
+    docs_bin, docs_idx = bytearray(), bytearray()
+    for title, text in docs:
+        title_bytes, text_bytes = title.encode("utf-8"), text.encode("utf-8")
+        docs_idx += DOC_ENTRY.pack(len(docs_bin), len(title_bytes), len(docs_bin) + len(title_bytes), len(text_bytes))
+        docs_bin += title_bytes + text_bytes
+
+    keys_bin, titles_idx = bytearray(), bytearray()
+    for key_bytes, doc_id in sorted((k.encode("utf-8"), d) for k, d in keys.items()):
+        titles_idx += TITLE_ENTRY.pack(len(keys_bin), len(key_bytes), doc_id)
+        keys_bin += key_bytes
+
+    terms_bin, terms_idx, postings_bin = bytearray(), bytearray(), bytearray()
+    for term_bytes, doc_ids in sorted((t.encode("utf-8"), d) for t, d in postings.items()):
+        doc_ids = sorted(doc_ids)
+        if not doc_ids:
+            continue
+        terms_idx += TERM_ENTRY.pack(len(terms_bin), len(term_bytes), len(postings_bin), len(doc_ids))
+        terms_bin += term_bytes
+        postings_bin += array("I", doc_ids).tobytes()
+
+    files = {
+        "docs.idx": docs_idx, "docs.bin": docs_bin,
+        "titles.idx": titles_idx, "keys.bin": keys_bin,
+        "terms.idx": terms_idx, "terms.bin": terms_bin, "postings.bin": postings_bin,
+    }
+    files["redirects.json"] = json.dumps(redirects, ensure_ascii=False).encode("utf-8")
+    for name, data in files.items():
+        _write_atomic(os.path.join(index_dir, name), data)
+
+    stats = {"documents": len(docs), "titles": len(keys), "terms": len(terms_idx) // TERM_ENTRY.size,
+             "lines_read": lines, "incremental": incremental}
+    manifest = {"source": os.path.abspath(source), "offset": offset, "digest": _source_digest(source, offset),
+                "built_at": time.time(), **stats}
+    _write_atomic(manifest_path, json.dumps(manifest, indent=2).encode("utf-8"))
+    return stats
+
+#-------------------------------------------------------------------
+def _percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {"p50_ms": pick(0.50) * 1000, "p95_ms": pick(0.95) * 1000, "mean_ms": statistics.fmean(samples) * 1000}
+
+def benchmark(index_dir: str, topics: List[str], repeat: int = 100, rest: bool = False) -> dict:
+    """
+    Mede a latência de busca de resumos no índice local e, opcionalmente,
+    na API REST da Wikipedia (sem cache) para comparação.
+    """
+    corpus = LocalWikipediaCorpus(index_dir)
+    samples = []
+    try:
+        for _ in range(repeat):
+            for topic in topics:
+                start = time.perf_counter()
+                corpus.resolve(topic)
+                samples.append(time.perf_counter() - start)
+    finally:
+        corpus.close()
+    results = {"local": _percentiles(samples)}
+
+    if rest:
+        from Tools.WikipediaTool import WikipediaTool
+
+        tool = WikipediaTool(backend="rest", cache=None)
+        samples = []
+        for topic in topics:
+            start = time.perf_counter()
+            tool.run(topic)
+            samples.append(time.perf_counter() - start)
+        results["rest"] = _percentiles(samples)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Índice local da Wikipedia")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Gera ou atualiza o índice a partir de um dump JSON Lines")
+    build.add_argument("source")
+    build.add_argument("index_dir")
+    build.add_argument("--full", action="store_true", help="Reprocessa o dump inteiro")
+
+    bench = commands.add_parser("bench", help="Compara a latência do índice local com a API REST")
+    bench.add_argument("index_dir")
+    bench.add_argument("topics", nargs="+")
+    bench.add_argument("--repeat", type=int, default=100)
+    bench.add_argument("--rest", action="store_true", help="Inclui a API REST na comparação")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        result = build_index(args.source, args.index_dir, full=args.full)
+    else:
+        result = benchmark(args.index_dir, args.topics, repeat=args.repeat, rest=args.rest)
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,103 @@
-from crewai_tools.tools.base_tool import BaseTool
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar, Dict, Iterable, Optional
+from urllib.parse import quote
+
 import requests
+from requests.adapters import HTTPAdapter
+from crewai.tools import BaseTool
+from pydantic import Field
+
+import crew_tracing
+from crew_metrics import Counter, Histogram
+from Tools.WikipediaCache import WikipediaCache, get_default_cache
+from Tools.WikipediaCorpus import LocalWikipediaCorpus
+
+API_URL = "https://en.wikipedia.org/api/rest_v1"
+
+# Códigos de status que indicam falha temporária e justificam uma nova tentativa
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+REQUEST_LATENCY = Histogram(
+    "wikipedia_request_seconds",
+    "Latência das requisições HTTP à Wikipedia",
+    labelnames=("endpoint",),
+)
+TOOL_DURATION = Histogram(
+    "wikipedia_tool_seconds",
+    "Duração de cada execução da ferramenta da Wikipedia, incluindo cache e novas tentativas",
+    labelnames=("backend",),
+)
+REQUEST_ERRORS = Counter(
+    "wikipedia_request_errors_total",
+    "Requisições à Wikipedia que falharam (timeout, conexão ou status de erro)",
+    labelnames=("endpoint", "reason"),
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+#-------------------------------------------------------------------
+def get_session() -> requests.Session:
+    """
+    Retorna a sessão HTTP compartilhada pelo processo, com pool de conexões keep-alive.
+
+    O tamanho do pool é definido por WIKIPEDIA_POOL_SIZE (padrão 10).
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            pool_size = int(os.getenv("WIKIPEDIA_POOL_SIZE", "10"))
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            # A Wikipedia pede um User-Agent identificável para clientes automatizados
+            session.headers["User-Agent"] = os.getenv(
+                "WIKIPEDIA_USER_AGENT", "CREWIA-ArticleGenerator/1.0 (https://github.com/stefanybrier/CREWIA)"
+            )
+            _session = session
+        return _session
+
+_corpora = {}
 
+def get_corpus(index_dir: Optional[str]) -> LocalWikipediaCorpus:
+    """
+    Retorna o índice local aberto (uma vez por processo) para o diretório informado
+    """
+    if not index_dir:
+        raise ValueError("WIKIPEDIA_INDEX_DIR deve ser definido para usar o backend local")
+    with _session_lock:
+        if index_dir not in _corpora:
+            _corpora[index_dir] = LocalWikipediaCorpus(index_dir)
+        return _corpora[index_dir]
 
-class WikipediaTool:
-    name = "Wikipedia Tool"
-    description = "Usa a Wikipedia para buscar informações sobre um tópico"
+#-------------------------------------------------------------------
+class WikipediaTool(BaseTool):
+    name: str = "Wikipedia Tool"
+    description: str = "Usa a Wikipedia para buscar informações sobre um tópico"
 
-    def run(self, topic: str) -> str:
+    # As variáveis WIKIPEDIA_* são lidas a cada instância criada, e não na importação do módulo
+    api_url: str = Field(default_factory=lambda: os.getenv("WIKIPEDIA_API_URL", API_URL))
+    connect_timeout: float = Field(default_factory=lambda: float(os.getenv("WIKIPEDIA_CONNECT_TIMEOUT", "3.05")))
+    read_timeout: float = Field(default_factory=lambda: float(os.getenv("WIKIPEDIA_READ_TIMEOUT", "10")))
+    max_retries: int = Field(default_factory=lambda: int(os.getenv("WIKIPEDIA_MAX_RETRIES", "3")))
+    backoff: float = Field(default_factory=lambda: float(os.getenv("WIKIPEDIA_BACKOFF", "0.5")))
+    max_concurrency: int = Field(default_factory=lambda: int(os.getenv("WIKIPEDIA_MAX_CONCURRENCY", "4")))
+    related_limit: int = 3
+    cache: Optional[WikipediaCache] = Field(default_factory=get_default_cache)
+
+    # "rest" consulta a API da Wikipedia; "local" usa o índice offline em WIKIPEDIA_INDEX_DIR
+    backend: str = Field(default_factory=lambda: os.getenv("WIKIPEDIA_BACKEND", "rest").lower())
+    index_dir: Optional[str] = Field(default_factory=lambda: os.getenv("WIKIPEDIA_INDEX_DIR"))
+
+    latency: ClassVar[Histogram] = REQUEST_LATENCY
+
+    def _run(self, topic: str) -> str:
         """
         Executa a busca na Wikipedia
 
@@ -16,11 +107,133 @@ class WikipediaTool:
         Returns:
             str: Resumo extraído da Wikipedia
         """
-        url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{topic.replace(' ', '_')}"
-        response = requests.get(url)
+        with crew_tracing.span("wikipedia_tool", topic=topic, backend=self.backend), \
+                TOOL_DURATION.time(backend=self.backend):
+            if self.backend == "local":
+                found = get_corpus(self.index_dir).resolve(topic)
+                return found[1] if found else "Nenhuma informação encontrada."
+            return self._cached("summary", topic, self._fetch_summary)
+
+    def _fetch_summary(self, topic: str):
+        try:
+            response = self._get("summary", topic)
+        except requests.RequestException as e:
+            return f"Erro ao buscar informações na Wikipedia: {e}", None
 
         if response.status_code == 200:
-            data = response.json()
-            return data.get("extract", "Nenhuma informação encontrada.")
+            try:
+                data = response.json()
+            except ValueError:
+                # Uma página de erro em HTML (ex.: de um proxy) no lugar do JSON da API
+                return "Erro ao buscar informações na Wikipedia: resposta inválida", None
+            return data.get("extract", "Nenhuma informação encontrada."), True
+        else:
+            message = f"Erro ao buscar informações na Wikipedia. Código de status: {response.status_code}"
+            return message, False if response.status_code == 404 else None
+
+    def _cached(self, namespace: str, topic: str, fetch):
+        """
+        Consulta o cache antes de chamar 'fetch(topic)', que retorna (texto, encontrado).
+        Páginas inexistentes (encontrado False) são guardadas por um tempo menor (cache
+        negativo); falhas temporárias (encontrado None, ex.: timeout ou 5xx) não são guardadas.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(topic, namespace=namespace)
+            if cached is not None:
+                return cached
+
+        text, found = fetch(topic)
+        if self.cache is not None and found is not None:
+            self.cache.set(topic, text, negative=not found, namespace=namespace)
+        return text
+
+    #-------------------------------------------------------------
+    def run_many(self, topics: Iterable[str], include_related: bool = False,
+                 max_concurrency: Optional[int] = None) -> Dict[str, str]:
+        """
+        Busca os resumos de vários tópicos em paralelo
+
+        Args:
+            topics (Iterable[str]): Tópicos a serem pesquisados (duplicados são buscados uma vez)
+            include_related (bool): Se True, acrescenta os resumos das páginas relacionadas
+            max_concurrency (int): Máximo de requisições simultâneas (padrão: 'self.max_concurrency')
+
+        Returns:
+            Dict[str, str]: Resumo de cada tópico, na ordem em que foram informados
+        """
+        unique_topics = list(dict.fromkeys(topics))
+        if not unique_topics:
+            return {}
+
+        fetch = self._run_with_related if include_related else self._run
+        workers = min(max_concurrency or self.max_concurrency, len(unique_topics))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wikipedia") as executor:
+            return dict(zip(unique_topics, executor.map(fetch, unique_topics)))
+
+    def _run_with_related(self, topic: str) -> str:
+        summary = self._run(topic)
+        if self.backend == "local":
+            pages = get_corpus(self.index_dir).related(topic, limit=self.related_limit)
+            related = "\n".join(f"- {title}: {text}" for title, text in pages)
         else:
-            return f"Erro ao buscar informações na Wikipedia. Código de status: {response.status_code}"
+            related = self._cached("related", topic, self._fetch_related)
+        if not related:
+            return summary
+        return summary + "\n\nPáginas relacionadas:\n" + related
+
+    def _fetch_related(self, topic: str):
+        try:
+            response = self._get("related", topic)
+        except requests.RequestException:
+            return "", None
+        if response.status_code != 200:
+            return "", False if response.status_code == 404 else None
+        try:
+            pages = response.json().get("pages", [])
+        except ValueError:
+            return "", None
+
+        related = [
+            f"- {page.get('title', '')}: {page.get('extract', '')}"
+            for page in pages[:self.related_limit]
+        ]
+        return "\n".join(related), bool(related)
+
+    #-------------------------------------------------------------
+    def _get(self, endpoint: str, topic: str) -> requests.Response:
+        """
+        Faz um GET na API REST da Wikipedia com timeouts e novas tentativas.
+
+        Status temporários (429/5xx), timeouts e falhas de conexão são repetidos
+        até 'max_retries' vezes, com backoff exponencial e jitter aleatório.
+
+        Raises:
+            requests.RequestException: Se a última tentativa falhar por timeout ou conexão.
+        """
+        url = f"{self.api_url}/page/{endpoint}/{quote(topic.replace(' ', '_'), safe='')}"
+        session = get_session()
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                with self.latency.time(endpoint=endpoint):
+                    response = session.get(url, timeout=(self.connect_timeout, self.read_timeout))
+            except (requests.Timeout, requests.ConnectionError) as e:
+                REQUEST_ERRORS.inc(endpoint=endpoint, reason=type(e).__name__)
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    return response
+                REQUEST_ERRORS.inc(endpoint=endpoint, reason=str(response.status_code))
+                if attempt == self.max_retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+
+            time.sleep(self._retry_delay(attempt, retry_after))
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        # Respeita o Retry-After do servidor quando ele for um número de segundos
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), 30.0)
+        return random.uniform(0, self.backoff * (2 ** attempt))
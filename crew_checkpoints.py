@@ -0,0 +1,265 @@
+# Checkpoints das etapas do pipeline: a saída de cada tarefa concluída (pesquisa, escrita, edição)
+# é gravada em disco, identificada pelo tópico e pela definição da tarefa. Uma nova execução com a
+# mesma tarefa (ex.: a repetição de um pedido que falhou na escrita, ou o mesmo tópico com outro
+# 'min_words') retoma a partir da última tarefa concluída em vez de refazer a pesquisa.
+# Quando a execução é concluída ('run_scope'), só os checkpoints da pesquisa são mantidos: os de escrita
+# e edição são removidos, e os artigos prontos ficam só no cache de artigos, com a sua própria validade
+# (ARTICLE_CACHE_TTL).
+
+import contextvars
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from crew_metrics import Counter
+from crew_topics import normalize_title
+
+CHECKPOINT_REQUESTS = Counter(
+    "checkpoint_requests_total",
+    "Consultas aos checkpoints do pipeline por tarefa e resultado (hit ou miss)",
+    labelnames=("task", "result"),
+)
+
+# Diretório padrão dos checkpoints, mantido entre execuções para permitir a retomada
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "crewia-checkpoints")
+
+#-------------------------------------------------------------------
+def definition_digest(*parts):
+    """
+    Resumo da definição de uma tarefa (descrição, saída esperada, modelos, entradas...).
+    Qualquer mudança em uma das partes gera um resumo diferente e, portanto, outro checkpoint.
+    """
+    payload = json.dumps([str(part) for part in parts], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+def _normalize_topic(topic):
+    return normalize_title(topic)
+
+# Tarefas cujos checkpoints são mantidos após a execução concluída: a pesquisa é retomada por um novo
+# pedido do mesmo tópico (ex.: com outro 'min_words'), que só executa a escrita e a edição
+KEPT_TASKS = ("research",)
+
+# Checkpoints gravados ou usados pela execução em andamento ('run_scope'), compartilhados com as
+# threads que copiam o contexto (ex.: as seções escritas em paralelo)
+_run_checkpoints = contextvars.ContextVar("run_checkpoints", default=None)
+
+@contextmanager
+def run_scope(keep=KEPT_TASKS):
+    """
+    Delimita uma execução completa: os checkpoints gravados ou usados dentro do bloco, exceto os das
+    tarefas em 'keep', são removidos quando ele termina sem erro, pois só servem para retomar uma
+    execução que falhou. Um bloco aninhado faz parte do bloco externo, que é quem remove os checkpoints.
+    """
+    if _run_checkpoints.get() is not None:
+        yield
+        return
+
+    used = []
+    token = _run_checkpoints.set(used)
+    try:
+        yield
+    finally:
+        _run_checkpoints.reset(token)
+    for store, checkpoint_id, task in used:
+        if task not in keep:
+            store.delete(checkpoint_id)
+
+def _track(store, checkpoint_id, task):
+    used = _run_checkpoints.get()
+    if used is not None:
+        used.append((store, checkpoint_id, task))
+
+#-------------------------------------------------------------------
+class CheckpointStore:
+    """
+    Saídas das tarefas do pipeline gravadas como arquivos JSON em um diretório.
+
+    Cada checkpoint é identificado pelo tópico normalizado, pelo nome da tarefa e
+    pelo resumo da sua definição. Checkpoints mais antigos que 'ttl' são ignorados
+    e removidos; acima de 'max_entries', os usados há mais tempo são apagados.
+    """
+
+    def __init__(self, path=DEFAULT_DIR, ttl=7 * 86400, max_entries=500):
+        """
+        Args:
+            path (str): Diretório dos checkpoints, criado se não existir.
+            ttl (float): Validade, em segundos, de cada checkpoint.
+            max_entries (int): Máximo de checkpoints guardados.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Cria o armazenamento a partir de CHECKPOINT_DIR, CHECKPOINT_TTL e CHECKPOINT_MAX_ENTRIES
+        """
+        return cls(
+            path=os.getenv("CHECKPOINT_DIR") or DEFAULT_DIR,
+            ttl=float(os.getenv("CHECKPOINT_TTL", str(7 * 86400))),
+            max_entries=int(os.getenv("CHECKPOINT_MAX_ENTRIES", "500")),
+        )
+
+    @staticmethod
+    def checkpoint_id(topic, task, definition):
+        """
+        Identificador do checkpoint da tarefa 'task' do tópico com a definição informada
+        """
+        key = f"{_normalize_topic(topic)}\0{task}\0{definition}"
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    def _file(self, checkpoint_id):
+        return os.path.join(self.path, f"{checkpoint_id}.json")
+
+    def _read(self, checkpoint_id):
+        try:
+            with open(self._file(checkpoint_id), encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if entry["created_at"] + self.ttl <= time.time():
+            self._remove(checkpoint_id)
+            return None
+        return entry
+
+    def _remove(self, checkpoint_id):
+        try:
+            os.remove(self._file(checkpoint_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    #-------------------------------------------------------------
+    def get(self, topic, task, definition):
+        """
+        Saída gravada da tarefa, ou None se ela ainda não foi concluída com essa definição
+        """
+        checkpoint_id = self.checkpoint_id(topic, task, definition)
+        with self._lock:
+            entry = self._read(checkpoint_id)
+            if entry is not None:
+                # A data de modificação do arquivo marca o último uso, usado na remoção dos mais antigos
+                os.utime(self._file(checkpoint_id))
+                _track(self, checkpoint_id, task)
+
+        CHECKPOINT_REQUESTS.inc(task=task, result="hit" if entry else "miss")
+        return entry["output"] if entry else None
+
+    def put(self, topic, task, definition, output, **metadata):
+        """
+        Grava a saída da tarefa concluída.
+
+        Args:
+            **metadata: Informações extras exibidas na listagem (ex.: min_words).
+
+        Returns:
+            str: Identificador do checkpoint.
+        """
+        checkpoint_id = self.checkpoint_id(topic, task, definition)
+        entry = {
+            "id": checkpoint_id, "topic": topic, "task": task, "definition": definition,
+            "created_at": time.time(), "metadata": metadata, "output": output,
+        }
+        # Grava em um arquivo temporário e o renomeia, para nunca deixar um checkpoint pela metade
+        temporary = self._file(f"{checkpoint_id}.{uuid.uuid4().hex}.tmp")
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(entry, file, ensure_ascii=False)
+        with self._lock:
+            os.replace(temporary, self._file(checkpoint_id))
+            self._prune()
+        _track(self, checkpoint_id, task)
+        return checkpoint_id
+
+    def _prune(self):
+        files = [name for name in os.listdir(self.path) if name.endswith(".json")]
+        excess = len(files) - self.max_entries
+        if excess <= 0:
+            return
+        # Remove os checkpoints usados há mais tempo, com folga de 10% para não remover a cada gravação
+        def last_used(name):
+            try:
+                return os.path.getmtime(os.path.join(self.path, name))
+            except FileNotFoundError:
+                return 0.0
+        for name in sorted(files, key=last_used)[:excess + self.max_entries // 10]:
+            self._remove(name[:-len(".json")])
+
+    #-------------------------------------------------------------
+    def load(self, checkpoint_id):
+        """
+        Checkpoint completo (metadados e saída), ou None se não existir ou tiver expirado
+        """
+        with self._lock:
+            return self._read(checkpoint_id)
+
+    def list(self, topic=None, task=None):
+        """
+        Checkpoints válidos, do mais recente ao mais antigo, sem a saída das tarefas
+
+        Args:
+            topic (str): Só os checkpoints deste tópico.
+            task (str): Só os checkpoints desta tarefa.
+        """
+        entries = []
+        with self._lock:
+            for name in os.listdir(self.path):
+                if not name.endswith(".json"):
+                    continue
+                entry = self._read(name[:-len(".json")])
+                if entry is None:
+                    continue
+                if topic is not None and _normalize_topic(entry["topic"]) != _normalize_topic(topic):
+                    continue
+                if task is not None and entry["task"] != task:
+                    continue
+                entry["size"] = len(entry.pop("output"))
+                entries.append(entry)
+        return sorted(entries, key=lambda entry: entry["created_at"], reverse=True)
+
+    def delete(self, checkpoint_id):
+        """
+        Remove um checkpoint
+
+        Returns:
+            bool: True se o checkpoint existia.
+        """
+        with self._lock:
+            return self._remove(checkpoint_id)
+
+    def invalidate(self, topic=None, task=None):
+        """
+        Remove os checkpoints do tópico e/ou da tarefa (todos, se nenhum for informado)
+
+        Returns:
+            int: Quantidade de checkpoints removidos.
+        """
+        removed = 0
+        for entry in self.list(topic, task):
+            removed += self.delete(entry["id"])
+        return removed
+
+#-------------------------------------------------------------------
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_checkpoint_store():
+    """
+    Retorna o armazenamento de checkpoints configurado, ou None se CHECKPOINTS=0
+    """
+    global _default_store
+
+    if os.getenv("CHECKPOINTS", "1") == "0":
+        return None
+    path = os.getenv("CHECKPOINT_DIR") or DEFAULT_DIR
+    with _default_store_lock:
+        if _default_store is None or _default_store.path != path:
+            _default_store = CheckpointStore.from_env()
+        return _default_store
@@ -0,0 +1,206 @@
+# Compacta o texto pesquisado antes de entregá-lo ao escritor: divide a pesquisa em trechos,
+# ordena os trechos pela relevância para o tópico (BM25), descarta passagens quase idênticas
+# e mantém apenas os melhores trechos dentro de um orçamento de tokens.
+
+import os
+import re
+import unicodedata
+from collections import Counter as TermCounter
+from dataclasses import dataclass
+
+import numpy as np
+
+from Agents.RateLimit import estimate_tokens
+from crew_metrics import Counter
+
+# Tokens da pesquisa antes (original) e depois (compacted) da compactação
+RESEARCH_TOKENS = Counter(
+    "research_tokens_total",
+    "Tokens estimados da pesquisa entregue ao escritor, antes e depois da compactação",
+    labelnames=("stage",),
+)
+
+# Parâmetros do BM25
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Dimensão dos vetores de shingles usados na detecção de trechos quase idênticos
+SHINGLE_DIM = 4096
+
+WORD_RE = re.compile(r"\w+")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+#-------------------------------------------------------------------
+@dataclass
+class Compaction:
+    """
+    Resultado da compactação de uma pesquisa
+    """
+    text: str
+    original_tokens: int
+    tokens: int
+    chunks_total: int
+    chunks_kept: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+    def report(self) -> dict:
+        """
+        Resumo da compactação, usado nos eventos da execução
+        """
+        return {
+            "original_tokens": self.original_tokens,
+            "tokens": self.tokens,
+            "tokens_saved": self.tokens_saved,
+            "chunks_total": self.chunks_total,
+            "chunks_kept": self.chunks_kept,
+        }
+
+#-------------------------------------------------------------------
+def terms(text):
+    """
+    Termos de um texto: palavras em minúsculas e sem acentos
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return WORD_RE.findall(text)
+
+def chunk_text(text, max_words=120):
+    """
+    Divide o texto em trechos de até 'max_words' palavras, respeitando parágrafos e frases.
+
+    Returns:
+        list: Trechos na ordem original.
+    """
+    chunks = []
+    for paragraph in PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph.split()) <= max_words:
+            chunks.append(paragraph)
+            continue
+
+        # Parágrafos longos são agrupados frase a frase; frases longas demais são cortadas por palavras
+        current = []
+        for sentence in SENTENCE_RE.split(paragraph):
+            words = sentence.split()
+            while len(words) > max_words:
+                if current:
+                    chunks.append(" ".join(current))
+                    current = []
+                chunks.append(" ".join(words[:max_words]))
+                words = words[max_words:]
+            if current and len(current) + len(words) > max_words:
+                chunks.append(" ".join(current))
+                current = []
+            current.extend(words)
+        if current:
+            chunks.append(" ".join(current))
+    return chunks
+
+#-------------------------------------------------------------------
+def bm25_scores(chunk_terms, query_terms, k1=BM25_K1, b=BM25_B):
+    """
+    Pontuação BM25 de cada trecho para a consulta.
+
+    Args:
+        chunk_terms (list): Termos de cada trecho.
+        query_terms (list): Termos da consulta (ex.: o tópico).
+
+    Returns:
+        np.ndarray: Uma pontuação por trecho.
+    """
+    vocabulary = {term: i for i, term in enumerate(dict.fromkeys(query_terms))}
+    if not chunk_terms or not vocabulary:
+        return np.zeros(len(chunk_terms))
+
+    # Frequência de cada termo da consulta em cada trecho (trechos x termos)
+    tf = np.zeros((len(chunk_terms), len(vocabulary)))
+    for i, chunk in enumerate(chunk_terms):
+        for term, count in TermCounter(chunk).items():
+            j = vocabulary.get(term)
+            if j is not None:
+                tf[i, j] = count
+
+    lengths = np.array([len(chunk) for chunk in chunk_terms], dtype=float)
+    avgdl = max(lengths.mean(), 1.0)
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((len(chunk_terms) - df + 0.5) / (df + 0.5))
+
+    norm = k1 * (1 - b + b * lengths / avgdl)
+    return (tf * (k1 + 1) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+def similarity_matrix(chunk_terms, ngram=3):
+    """
+    Similaridade de Jaccard entre os trechos, calculada sobre shingles de 'ngram' palavras.
+
+    Returns:
+        np.ndarray: Matriz (trechos x trechos) com valores entre 0 e 1.
+    """
+    vectors = np.zeros((len(chunk_terms), SHINGLE_DIM), dtype=np.float32)
+    for i, chunk in enumerate(chunk_terms):
+        shingles = {" ".join(chunk[j:j + ngram]) for j in range(max(1, len(chunk) - ngram + 1))}
+        vectors[i, [hash(shingle) % SHINGLE_DIM for shingle in shingles]] = 1.0
+
+    sizes = vectors.sum(axis=1)
+    intersection = vectors @ vectors.T
+    union = sizes[:, None] + sizes[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+#-------------------------------------------------------------------
+def compact(research, topic, budget=None, chunk_words=None, dedup_threshold=None):
+    """
+    Mantém os trechos da pesquisa mais relevantes para o tópico dentro do orçamento de tokens.
+
+    Os trechos são escolhidos por relevância (BM25), ignorando os quase idênticos a um
+    trecho já escolhido, e são devolvidos na ordem original do texto.
+
+    Args:
+        research (str): Texto pesquisado.
+        topic (str): Tópico do artigo, usado como consulta.
+        budget (int): Máximo de tokens estimados. Padrão: RESEARCH_TOKEN_BUDGET (2000); 0 desativa.
+        chunk_words (int): Tamanho dos trechos em palavras. Padrão: RESEARCH_CHUNK_WORDS (120).
+        dedup_threshold (float): Similaridade a partir da qual um trecho é considerado repetido.
+            Padrão: RESEARCH_DEDUP_THRESHOLD (0.8).
+
+    Returns:
+        Compaction: Texto compactado e a contagem de tokens antes e depois.
+    """
+    if budget is None:
+        budget = int(os.getenv("RESEARCH_TOKEN_BUDGET", "2000"))
+    if chunk_words is None:
+        chunk_words = int(os.getenv("RESEARCH_CHUNK_WORDS", "120"))
+    if dedup_threshold is None:
+        dedup_threshold = float(os.getenv("RESEARCH_DEDUP_THRESHOLD", "0.8"))
+
+    original_tokens = estimate_tokens(research)
+    chunks = chunk_text(research, chunk_words)
+    result = Compaction(research, original_tokens, original_tokens, len(chunks), len(chunks))
+
+    if budget > 0 and len(chunks) > 1:
+        chunk_terms = [terms(chunk) for chunk in chunks]
+        scores = bm25_scores(chunk_terms, terms(topic))
+        similarity = similarity_matrix(chunk_terms)
+        sizes = [estimate_tokens(chunk) for chunk in chunks]
+
+        # Maior pontuação primeiro; empates ficam na ordem original do texto
+        kept, used = [], 0
+        for i in np.argsort(-scores, kind="stable"):
+            if kept and similarity[i, kept].max() >= dedup_threshold:
+                continue
+            if used + sizes[i] > budget:
+                continue
+            kept.append(i)
+            used += sizes[i]
+
+        if len(kept) < len(chunks):
+            text = "\n\n".join(chunks[i] for i in sorted(kept))
+            result = Compaction(text, original_tokens, estimate_tokens(text) if kept else 0, len(chunks), len(kept))
+
+    RESEARCH_TOKENS.inc(result.original_tokens, stage="original")
+    RESEARCH_TOKENS.inc(result.tokens, stage="compacted")
+    return result
@@ -0,0 +1,153 @@
+# Encaminha os eventos do barramento do crewai (início/fim de tarefas e tokens do LLM)
+# para quem acompanha uma execução específica da crew, como o endpoint de streaming da API.
+# Os mesmos eventos alimentam as métricas, os spans e os logs de cada tarefa e chamada ao LLM.
+
+import threading
+from contextlib import contextmanager
+
+import crew_tracing
+from crew_logging import get_logger
+from crew_metrics import Histogram
+
+TASK_DURATION = Histogram(
+    "crew_task_duration_seconds",
+    "Duração de cada tarefa da crew (pesquisa, escrita, edição)",
+    labelnames=("task", "status"),
+)
+LLM_CALL_DURATION = Histogram(
+    "llm_call_duration_seconds",
+    "Duração de cada chamada ao LLM",
+    labelnames=("model", "status"),
+)
+
+logger = get_logger("crew")
+
+# Callbacks registrados por thread: a crew executa suas tarefas de forma sequencial
+# na mesma thread que chamou 'kickoff()', então a thread identifica a execução.
+_listeners = {}
+_lock = threading.Lock()
+_handlers_registered = False
+
+# Spans abertos pela thread atual: tarefas (por id da tarefa) e chamadas ao LLM (pilha)
+_spans = threading.local()
+
+#-------------------------------------------------------------------
+def _dispatch(event, **data):
+    """
+    Entrega o evento ao callback registrado pela thread atual, se houver
+    """
+    callback = _listeners.get(threading.get_ident())
+    if callback is not None:
+        callback(event, data)
+
+def _task_name(task):
+    return getattr(task, "name", None) or getattr(task, "description", "")
+
+def _open_tasks():
+    if not hasattr(_spans, "tasks"):
+        _spans.tasks = {}
+        _spans.llm_calls = []
+    return _spans.tasks
+
+def _start_task(task):
+    _open_tasks()[id(task)] = crew_tracing.start_span("task", task=_task_name(task))
+    logger.debug("tarefa iniciada task=%s", _task_name(task))
+
+def _end_task(task, error=None):
+    opened = _open_tasks().pop(id(task), None)
+    if opened is None:
+        return
+    status = "failed" if error is not None else "completed"
+    duration = crew_tracing.end_span(*opened, error=error)
+    TASK_DURATION.observe(duration, task=_task_name(task), status=status)
+    if error is not None:
+        logger.warning("tarefa falhou task=%s duration=%.3fs error=%s", _task_name(task), duration, error)
+    else:
+        logger.info("tarefa concluída task=%s duration=%.3fs", _task_name(task), duration)
+
+def _start_llm_call(llm):
+    _open_tasks()
+    model = getattr(llm, "model", "desconhecido")
+    _spans.llm_calls.append((model, *crew_tracing.start_span("llm_call", model=model)))
+
+def _end_llm_call(error=None):
+    _open_tasks()
+    if not _spans.llm_calls:
+        return
+    model, span, token = _spans.llm_calls.pop()
+    duration = crew_tracing.end_span(span, token, error=error)
+    LLM_CALL_DURATION.observe(duration, model=model, status="failed" if error is not None else "completed")
+    logger.debug("chamada ao LLM model=%s duration=%.3fs", model, duration)
+
+#-------------------------------------------------------------------
+def instrument():
+    """
+    Registra (uma única vez por processo) os handlers no barramento global do crewai
+    """
+    global _handlers_registered
+
+    with _lock:
+        if _handlers_registered:
+            return
+
+        from crewai.utilities.events import (
+            crewai_event_bus,
+            LLMCallCompletedEvent,
+            LLMCallFailedEvent,
+            LLMCallStartedEvent,
+            LLMStreamChunkEvent,
+            TaskCompletedEvent,
+            TaskFailedEvent,
+            TaskStartedEvent,
+        )
+
+        def on_task_started(source, event):
+            _start_task(event.task)
+            _dispatch("task_started", task=_task_name(event.task))
+
+        def on_task_completed(source, event):
+            _end_task(event.task)
+            _dispatch("task_completed", task=_task_name(event.task), output=event.output.raw)
+
+        def on_task_failed(source, event):
+            _end_task(event.task, error=event.error)
+            _dispatch("task_failed", task=_task_name(event.task), error=event.error)
+
+        def on_llm_started(source, event):
+            _start_llm_call(source)
+
+        def on_llm_completed(source, event):
+            _end_llm_call()
+
+        def on_llm_failed(source, event):
+            _end_llm_call(error=event.error)
+
+        def on_stream_chunk(source, event):
+            _dispatch("token", text=event.chunk)
+
+        crewai_event_bus.register_handler(TaskStartedEvent, on_task_started)
+        crewai_event_bus.register_handler(TaskCompletedEvent, on_task_completed)
+        crewai_event_bus.register_handler(TaskFailedEvent, on_task_failed)
+        crewai_event_bus.register_handler(LLMCallStartedEvent, on_llm_started)
+        crewai_event_bus.register_handler(LLMCallCompletedEvent, on_llm_completed)
+        crewai_event_bus.register_handler(LLMCallFailedEvent, on_llm_failed)
+        crewai_event_bus.register_handler(LLMStreamChunkEvent, on_stream_chunk)
+        _handlers_registered = True
+
+#-------------------------------------------------------------------
+@contextmanager
+def listen(callback):
+    """
+    Envia ao callback os eventos da crew executada na thread atual.
+
+    Args:
+        callback (Callable): Função chamada como callback(evento, dados) para
+            'task_started', 'task_completed', 'task_failed' e 'token'.
+    """
+    instrument()
+    thread_id = threading.get_ident()
+    _listeners[thread_id] = callback
+    try:
+        yield
+    finally:
+        _listeners.pop(thread_id, None)
@@ -0,0 +1,135 @@
+# Controle do tamanho dos artigos durante a geração: 'min_words' e 'max_words' viram parâmetros da
+# chamada ao LLM em vez de só serem conferidos no fim.
+#   - o escritor recebe um limite de tokens de resposta (max_tokens) calculado a partir do tamanho pedido,
+#     que encerra a geração no provedor;
+#   - a resposta que passa do limite de palavras é cortada no fim da última frase completa;
+#   - um artigo que fica abaixo de 'min_words' é complementado por uma chamada de continuação que
+#     recebe só o final do texto, em vez de ser escrito de novo, sem passar de 'max_words'.
+# Este módulo contém os cálculos; a execução das tarefas fica em 'crew_logic'.
+
+import math
+import os
+import re
+from dataclasses import dataclass
+
+from Agents.RateLimit import estimate_completion_tokens
+
+# Tokens reservados para o raciocínio ("Thought: ...") e o marcador antes da resposta final
+ANSWER_OVERHEAD_TOKENS = 200
+
+# Folga sobre a estimativa de tokens do texto, pois a estimativa é feita para textos em inglês
+TOKEN_MARGIN = 1.25
+
+# Menor limite de tokens de resposta. Acima dele, os limites seguem a escala 512, 768, 1024, 1536,
+# 2048, 3072...: cada cliente LLM do registro tem um limite fixo, e a escala mantém poucos clientes
+# diferentes (dois por duplicação do tamanho) para todos os tamanhos de artigo pedidos
+MIN_MAX_TOKENS = 512
+
+# Fim de frase: pontuação final, seguida ou não de aspas, parênteses ou marcação, antes de um espaço ou do fim
+SENTENCE_END_RE = re.compile(r"[.!?…][\"'”’)\]*_]*(?=\s|$)")
+WORD_RE = re.compile(r"\S+")
+
+#-------------------------------------------------------------------
+def token_bucket(tokens):
+    """
+    Menor limite da escala de 'MIN_MAX_TOKENS' que comporta 'tokens'
+    """
+    size = MIN_MAX_TOKENS
+    while size < tokens:
+        # Alterna entre x1,5 e x4/3: 512 -> 768 -> 1024 -> 1536 -> 2048...
+        size = size * 3 // 2 if size & (size - 1) == 0 else size * 4 // 3
+    return size
+
+@dataclass
+class LengthBounds:
+    """
+    Limites de tamanho de uma chamada de escrita
+    """
+    min_words: int
+    stop_words: int
+    max_tokens: int
+
+def enabled():
+    """
+    Se o tamanho é controlado durante a geração (WRITER_LENGTH_CONTROL, padrão 1; 0 desativa)
+    """
+    return os.getenv("WRITER_LENGTH_CONTROL", "1") != "0"
+
+def bounds(min_words, max_words=None, slack=None):
+    """
+    Limites da geração de um texto com pelo menos 'min_words' palavras.
+
+    Args:
+        min_words (int): Tamanho mínimo pedido.
+        max_words (int): Tamanho máximo pedido, ou None.
+        slack (float): Sem 'max_words', a resposta é limitada a 'min_words' vezes
+            esta folga. Padrão: WRITER_LENGTH_SLACK (1.5).
+
+    Returns:
+        LengthBounds: Palavras a partir das quais a resposta é cortada ('trim') e limite de tokens
+            da resposta, com margem para que o texto chegue a essas palavras antes do corte por tokens.
+    """
+    if slack is None:
+        slack = float(os.getenv("WRITER_LENGTH_SLACK", "1.5"))
+    stop_words = max_words if max_words else math.ceil(min_words * max(1.0, slack))
+    tokens = estimate_completion_tokens(stop_words) * TOKEN_MARGIN + ANSWER_OVERHEAD_TOKENS
+    return LengthBounds(min_words, stop_words, token_bucket(tokens))
+
+def writer_variants(min_words=300):
+    """
+    Opções dos clientes do escritor usados por um artigo de 'min_words' palavras (sem e com streaming),
+    para que o aquecimento do registro ('LLMRegistry.warm_up') crie os clientes que os escritores usam
+
+    Returns:
+        dict: {"writer": [opções, ...]}, vazio sem o controle de tamanho.
+    """
+    if not enabled():
+        return {}
+    max_tokens = bounds(min_words).max_tokens
+    return {"writer": [{"max_tokens": max_tokens}, {"stream": True, "max_tokens": max_tokens}]}
+
+def length_instructions(min_words, max_words=None):
+    """
+    Trecho da descrição da tarefa com o tamanho pedido
+    """
+    if max_words:
+        return f"de pelo menos {min_words} palavras e no máximo {max_words} palavras"
+    return f"de pelo menos {min_words} palavras"
+
+#-------------------------------------------------------------------
+def trim(text, max_words):
+    """
+    Corta o texto que chegou a 'max_words' palavras (como uma resposta encerrada pelo limite de
+    tokens) no fim da última frase (ou linha) completa dentro do limite.
+
+    Um texto abaixo do limite é devolvido sem alterações. Títulos que ficariam sem conteúdo
+    no fim são removidos; sem nenhum fim de frase no trecho, o corte é feito na palavra.
+    """
+    words = list(WORD_RE.finditer(text))
+    if len(words) < max_words:
+        return text
+
+    prefix = text[:words[max_words - 1].end()]
+    ends = [match.end() for match in SENTENCE_END_RE.finditer(prefix)]
+    cut = max(ends[-1] if ends else 0, prefix.rfind("\n"))
+    if cut <= 0:
+        return prefix.rstrip()
+
+    lines = prefix[:cut].rstrip().splitlines()
+    while lines and (lines[-1].lstrip().startswith("#") or not lines[-1].strip()):
+        lines.pop()
+    return "\n".join(lines) if lines else prefix.rstrip()
+
+def tail(text, words):
+    """
+    Últimas 'words' palavras do texto, a partir do início de um parágrafo quando possível.
+    É o contexto enviado na continuação, em vez do artigo inteiro.
+    """
+    matches = list(WORD_RE.finditer(text))
+    if len(matches) <= words:
+        return text.strip()
+    start = matches[-words].start()
+    paragraph = text.find("\n\n", start)
+    if paragraph != -1 and len(WORD_RE.findall(text[paragraph:])) >= words // 2:
+        start = paragraph
+    return text[start:].strip()
@@ -0,0 +1,77 @@
+# Configuração dos provedores e modelos LLM de cada papel, lida das variáveis de ambiente.
+# Não importa o crewai: é usada tanto pelo registro de clientes ('Agents.LLMRegistry') quanto
+# pela API para montar chaves de cache sem carregar a crew.
+
+import os
+
+# Configuração de cada provedor suportado: prefixo do modelo no crewai/litellm,
+# variável de ambiente com a chave de API e modelo padrão. O provedor "local" atende
+# qualquer servidor compatível com a API da OpenAI (ex.: o LLM falso dos benchmarks),
+# no endereço definido em LOCAL_LLM_API_BASE.
+PROVIDERS = {
+    "groq": {"prefix": "groq/", "api_key_env": "GROQ_API_KEY", "model": "llama3-70b-8192"},
+    "gemini": {"prefix": "gemini/", "api_key_env": "GEMINI_API_KEY", "model": "gemini-pro"},
+    "local": {"prefix": "openai/", "api_key_env": "LOCAL_LLM_API_KEY", "model": "local-model",
+              "api_base_env": "LOCAL_LLM_API_BASE"},
+}
+
+# Papéis de agentes que usam LLM, aquecidos por padrão em 'LLMRegistry.warm_up()'.
+ROLES = ("researcher", "writer", "editor")
+
+#-------------------------------------------------------------------
+def resolve(role=None):
+    """
+    Determina o provedor e o modelo de um papel.
+
+    Usa {PAPEL}_LLM_PROVIDER / {PAPEL}_LLM_MODEL (ex.: RESEARCHER_LLM_MODEL) e,
+    na ausência deles, LLM_PROVIDER / LLM_MODEL e o modelo padrão do provedor.
+
+    Args:
+        role (str): Papel do agente ("researcher", "writer", ...). Pode ser None.
+
+    Returns:
+        tuple: (provedor, modelo)
+    """
+    prefix = f"{role.upper()}_" if role else ""
+    provider = (os.getenv(f"{prefix}LLM_PROVIDER") or os.getenv("LLM_PROVIDER", "groq")).lower()
+
+    # Se o provedor não for reconhecido, levanta um erro.
+    if provider not in PROVIDERS:
+        raise ValueError(f"Provedor LLM não suportado: {provider}")
+
+    model = os.getenv(f"{prefix}LLM_MODEL") or os.getenv("LLM_MODEL") or PROVIDERS[provider]["model"]
+    return provider, model
+
+def routes(role=None):
+    """
+    Provedores entre os quais as chamadas do papel são distribuídas.
+
+    Usa {PAPEL}_LLM_ROUTER ou LLM_ROUTER, uma lista separada por vírgulas de
+    provedores, cada um opcionalmente com o modelo (ex.: "groq,gemini:gemini-1.5-flash").
+    Sem essa configuração, o papel usa apenas o provedor de 'resolve()'.
+
+    Returns:
+        list: [(provedor, modelo), ...] em ordem de preferência.
+    """
+    prefix = f"{role.upper()}_" if role else ""
+    config = os.getenv(f"{prefix}LLM_ROUTER") or os.getenv("LLM_ROUTER")
+    if not config:
+        return [resolve(role)]
+
+    result = []
+    for entry in config.split(","):
+        provider, _, model = entry.strip().partition(":")
+        provider = provider.lower()
+        if provider not in PROVIDERS:
+            raise ValueError(f"Provedor LLM não suportado: {provider}")
+        result.append((provider, model or PROVIDERS[provider]["model"]))
+    return result
+
+def signature(roles=ROLES):
+    """
+    Provedores e modelos de cada papel, usados por exemplo em chaves de cache
+
+    Returns:
+        tuple: ((papel, provedor, modelo[, provedor, modelo...]), ...)
+    """
+    return tuple((role, *(value for route in routes(role) for value in route)) for role in roles)
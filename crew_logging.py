@@ -0,0 +1,56 @@
+# Logs do projeto com nível configurável e amostragem, no lugar das mensagens 'verbose' do crewai,
+# que imprimem cada passo dos agentes no console e têm custo mensurável sob carga.
+
+import logging
+import os
+import random
+import threading
+
+_configured = False
+_lock = threading.Lock()
+
+#-------------------------------------------------------------------
+class SamplingFilter(logging.Filter):
+    """
+    Mantém só uma fração dos registros abaixo de WARNING; avisos e erros passam sempre
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+#-------------------------------------------------------------------
+def configure():
+    """
+    Configura (uma única vez) o logger 'crewia' a partir de LOG_LEVEL (padrão INFO)
+    e LOG_SAMPLE_RATE (fração dos logs abaixo de WARNING mantidos, padrão 1.0)
+    """
+    global _configured
+
+    with _lock:
+        if _configured:
+            return
+        logger = logging.getLogger("crewia")
+        logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        handler.addFilter(SamplingFilter(float(os.getenv("LOG_SAMPLE_RATE", "1.0"))))
+        logger.addHandler(handler)
+        logger.propagate = False
+        _configured = True
+
+def get_logger(name):
+    """
+    Retorna o logger do componente (ex.: get_logger("crew") -> 'crewia.crew')
+    """
+    configure()
+    return logging.getLogger(f"crewia.{name}")
+
+def verbose():
+    """
+    Indica se a saída 'verbose' do crewai deve ser mantida (CREW_VERBOSE=1)
+    """
+    return os.getenv("CREW_VERBOSE", "0") == "1"
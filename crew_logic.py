@@ -1,8 +1,8 @@
 # Importa a função 'load_dotenv' para carregar variáveis de ambiente a partir de um arquivo .env
 from dotenv import load_dotenv
 
-# Importa os agentes de pesquisa e escrita do módulo 'Agents'
-from Agents import ResearcherAgent, WriterAgent
+# Importa os agentes de pesquisa, escrita e edição do módulo 'Agents'
+from Agents import EditorAgent, ResearcherAgent, WriterAgent
 
 # Importa as classes 'Crew' e 'Task' da biblioteca 'crewai', que ajudam a criar equipes e tarefas
 from crewai import Crew, Task
@@ -10,44 +10,455 @@ from crewai import Crew, Task
 # Importa a ferramenta 'WikipediaTool' do módulo 'Tools', que será usada para buscar informações na Wikipedia
 from Tools import WikipediaTool
 
-# Importa o módulo 'os', que permite interagir com o sistema operacional (não usado diretamente neste trecho)
+# Importa o módulo 'crew_events', que encaminha os eventos da crew (tarefas e tokens) para quem acompanha a execução
+import crew_events
+
+# Importa o módulo 'crew_compaction', que reduz a pesquisa aos trechos mais relevantes antes da escrita
+import crew_compaction
+
+# Importa o cache semântico, que reaproveita a pesquisa de tópicos parecidos já pesquisados
+from crew_semantic_cache import get_semantic_cache
+
+# Importa os checkpoints das tarefas, que permitem retomar o pipeline a partir da última tarefa concluída
+import crew_checkpoints
+
+# Importa o registro de clientes LLM, cujos modelos fazem parte da definição de cada tarefa nos checkpoints
+from Agents.LLMRegistry import llm_registry
+
+# Importa os perfis do pipeline (lean, standard, full-edit), que definem as etapas executadas
+import crew_profiles
+
+# Importa o planejamento e a montagem dos artigos longos, escritos em seções paralelas
+import crew_longform
+
+# Importa o controle de tamanho, que limita os tokens da escrita e corta o texto que passa do tamanho pedido
+import crew_length
+
+# Importa o pool de threads e o contexto, usados para escrever as seções em paralelo no mesmo trace
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Importa o rastreamento por etapas, os logs e as métricas de tokens de cada execução
+import crew_tracing
+from crew_logging import get_logger, verbose
+from crew_metrics import Counter
+
+# Importa o módulo 're', usado para extrair o título e as referências do texto gerado
+import re
+
+# Importa o módulo 'time', usado para medir a duração de cada etapa
+import time
+
+# Importa o módulo 'os', usado para ler a configuração da escrita em seções
 import os
 
 # Carrega as variáveis de ambiente do arquivo .env (útil para armazenar configurações sensíveis)
 load_dotenv()
 
-# Define a função 'create_crew', que cria e gerencia a execução de uma equipe (crew) de agentes para pesquisar e escrever um artigo
-def create_crew(topic):
-    # Cria uma instância da ferramenta 'WikipediaTool' para buscar informações sobre o tópico
-    wikipedia_tool = WikipediaTool()
-    
+# Registra as métricas, spans e logs das tarefas e chamadas ao LLM de todas as crews do processo
+crew_events.instrument()
+
+logger = get_logger("crew")
+
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens de prompt e de resposta usados em cada etapa do pipeline",
+    labelnames=("stage", "kind"),
+)
+
+# Expressão usada para encontrar URLs citadas na pesquisa e no artigo
+URL_RE = re.compile(r"https?://[^\s)\]>\"']+")
+
+# Pool de threads das seções, compartilhado por todos os artigos do processo, para que vários artigos longos
+# simultâneos não passem juntos de LONGFORM_CONCURRENCY seções em escrita (criado no primeiro uso)
+_section_executor = None
+_section_executor_lock = threading.Lock()
+
+def _get_section_executor():
+    global _section_executor
+
+    with _section_executor_lock:
+        if _section_executor is None:
+            _section_executor = ThreadPoolExecutor(
+                max_workers=max(1, int(os.getenv("LONGFORM_CONCURRENCY", "4"))), thread_name_prefix="section-writer"
+            )
+        return _section_executor
+
+# O pipeline tem até três etapas, que também podem ser executadas separadamente (ex.: na geração em lote):
+#   1. 'run_research' -> texto com as informações pesquisadas sobre o tópico
+#   2. 'run_writing'  -> artigo escrito a partir desse texto, compactado antes para caber no orçamento de tokens
+#   3. 'run_editing'  -> artigo revisado pelo editor (só no perfil "full-edit")
+# As etapas executadas dependem do perfil (ver 'crew_profiles').
+# Em todas as funções, 'on_event' (opcional) recebe os eventos da execução (início/fim das tarefas e tokens
+# do escritor) como on_event(evento, dados).
+# A saída de cada etapa concluída é gravada como checkpoint (CHECKPOINT_DIR); uma nova execução da mesma
+# tarefa (mesmo tópico, descrição e modelos) usa o checkpoint no lugar de executar a crew de novo. Quando o
+# artigo é concluído ('create_crew' ou 'run_writing'), os checkpoints de escrita e edição da execução são removidos.
+
+# Resumo da definição da tarefa usado nos checkpoints: descrição, saída esperada, papel do agente,
+# limite de iterações e modelos do papel
+def _task_definition(task, role):
+    return crew_checkpoints.definition_digest(
+        task.description, task.expected_output, task.agent.role, task.agent.max_iter, llm_registry.signature((role,))
+    )
+
+# Tarefas reaproveitadas (checkpoint ou cache semântico) na execução em andamento de 'create_crew', cujas
+# etapas não entram nas estimativas de duração dos perfis
+_reused_tasks = contextvars.ContextVar("reused_tasks", default=None)
+
+def _mark_reused(task_name):
+    reused = _reused_tasks.get()
+    if reused is not None:
+        reused.append(task_name)
+
+# Retorna a saída gravada da tarefa, avisando o callback quando ela for reaproveitada
+def _restore(store, topic, task, definition, on_event=None):
+    if store is None:
+        return None
+    output = store.get(topic, task.name, definition)
+    if output is not None:
+        _mark_reused(task.name)
+        checkpoint_id = store.checkpoint_id(topic, task.name, definition)
+        logger.info("tarefa retomada do checkpoint topic=%r task=%s checkpoint=%s", topic, task.name, checkpoint_id)
+        if on_event is not None:
+            on_event("task_restored", {"task": task.name, "checkpoint": checkpoint_id})
+    return output
+
+# Executa uma crew como a etapa 'stage', medindo seu tempo e seus tokens e encaminhando
+# seus eventos ao callback quando houver um
+def _kickoff(crew, stage, on_event=None):
+    with crew_tracing.span(stage) as span:
+        if on_event is None:
+            output = crew.kickoff()
+        else:
+            # Encaminha os eventos desta execução ao callback enquanto a crew roda
+            with crew_events.listen(on_event):
+                output = crew.kickoff()
+
+        usage = output.token_usage
+        LLM_TOKENS.inc(usage.prompt_tokens, stage=stage, kind="prompt")
+        LLM_TOKENS.inc(usage.completion_tokens, stage=stage, kind="completion")
+        span.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+        return output
+
+# Executa a tarefa de um único agente como a etapa 'stage', reaproveitando o checkpoint da mesma tarefa
+# quando houver e gravando a saída quando a crew for executada. 'metadata' vai para a listagem dos checkpoints.
+def _run_task(topic, task, role, stage, on_event=None, **metadata):
+    store = crew_checkpoints.get_checkpoint_store()
+    definition = _task_definition(task, role)
+    output = _restore(store, topic, task, definition, on_event)
+    if output is None:
+        crew = Crew(agents=[task.agent], tasks=[task], verbose=verbose())
+        output = _kickoff(crew, stage, on_event).raw
+        if store is not None:
+            store.put(topic, task.name, definition, output, **metadata)
+    return output
+
+# Cria o escritor de uma chamada com os limites de tamanho 'limits' ('crew_length.bounds'), que definem o limite
+# de tokens da resposta. Sem limites (WRITER_LENGTH_CONTROL=0), o provedor usa o seu limite padrão.
+# O streaming de tokens só é ativado quando 'stream' for True.
+def _writer(limits=None, stream=False):
+    return WriterAgent().create_agent(stream=stream, max_tokens=limits.max_tokens if limits is not None else None)
+
+# Executa uma tarefa do escritor como '_run_task' e corta a resposta que chegou a 'limits.stop_words' palavras
+# no fim da última frase completa dentro desse limite
+def _run_bounded(topic, task, limits, stage, on_event=None, **metadata):
+    output = _run_task(topic, task, "writer", stage, on_event, **metadata)
+    return output if limits is None else crew_length.trim(output, limits.stop_words)
+
+# Executa a etapa de pesquisa e retorna o texto pesquisado. A pesquisa já concluída do mesmo tópico
+# (checkpoint) ou a de um tópico parecido (cache semântico) é reaproveitada sem executar a crew de pesquisa.
+# O perfil define o limite de chamadas de ferramenta do pesquisador (perfil "lean"), e só é reaproveitada
+# a pesquisa de um tópico parecido feita com o mesmo perfil e os mesmos modelos do pesquisador.
+def run_research(topic, on_event=None, profile=crew_profiles.DEFAULT_PROFILE):
     # Cria o agente de pesquisa, que usará a ferramenta WikipediaTool para buscar informações
-    researcher = ResearcherAgent().create_agent(tools=[wikipedia_tool])
-    
-    # Cria o agente de escrita, que será responsável por redigir o artigo
-    writer = WriterAgent().create_agent()
+    max_iter = crew_profiles.research_max_iter(profile)
+    researcher = ResearcherAgent().create_agent(tools=[WikipediaTool()], max_iter=max_iter)
 
     # Cria uma tarefa de pesquisa, onde o agente 'researcher' vai buscar informações sobre o tópico
     research_task = Task(
+        name="research",  # Nome usado para identificar a tarefa nos eventos da execução
         description=f"Pesquise informações detalhadas sobre {topic}",  # Descrição da tarefa de pesquisa
         agent=researcher,  # O agente responsável por essa tarefa será o 'researcher'
         expected_output="Informações detalhadas sobre o tópico em formato JSON"  # O formato esperado de saída é um JSON com informações detalhadas
     )
 
-    # Cria uma tarefa de escrita, onde o agente 'writer' escreverá um artigo com base nas informações pesquisadas
+    store = crew_checkpoints.get_checkpoint_store()
+    definition = _task_definition(research_task, "researcher")
+    research = _restore(store, topic, research_task, definition, on_event)
+    if research is not None:
+        return research
+
+    cache = get_semantic_cache()
+    scope = {"signature": str(llm_registry.signature(("researcher",))), "profile": profile}
+    where = {"$and": [{key: value} for key, value in scope.items()]}
+    found = cache.get("research", topic, where=where) if cache is not None else None
+    if found is not None:
+        research, similar_topic, similarity = found
+        _mark_reused("research")
+        logger.info("pesquisa reaproveitada topic=%r similar_topic=%r similarity=%.3f", topic, similar_topic, similarity)
+        if on_event is not None:
+            on_event("research_reused", {"topic": similar_topic, "similarity": round(similarity, 3)})
+        return research
+
+    crew = Crew(agents=[researcher], tasks=[research_task], verbose=verbose())
+    research = _kickoff(crew, "research", on_event).raw
+    if store is not None:
+        store.put(topic, "research", definition, research)
+    if cache is not None:
+        cache.add("research", topic, research, **scope)
+    return research
+
+# Executa a etapa de escrita a partir do texto pesquisado e retorna o artigo como dicionário
+# com 'title', 'content', 'references' e 'research_tokens_saved'. 'min_words' e 'max_words' (opcional) definem o tamanho
+# pedido ao escritor e, com o controle de tamanho ('crew_length'), limitam a geração; um artigo abaixo de 'min_words'
+# é complementado por uma chamada de continuação. A partir de LONGFORM_MIN_WORDS o artigo é escrito em seções
+# paralelas ('_write_sections').
+def run_writing(topic, research, min_words=300, on_event=None, max_words=None):
+    with crew_checkpoints.run_scope():
+        return _run_writing(topic, research, min_words, on_event, max_words)
+
+def _run_writing(topic, research, min_words, on_event, max_words):
+    # Mantém apenas os trechos mais relevantes da pesquisa (RESEARCH_TOKEN_BUDGET)
+    with crew_tracing.span("compaction") as span:
+        compacted = crew_compaction.compact(research, topic)
+        span.set(**compacted.report())
+    if on_event is not None:
+        on_event("compaction", compacted.report())
+
+    if 0 < crew_longform.longform_min_words() <= min_words:
+        content = _write_sections(topic, research, compacted.text, min_words, on_event, max_words)
+        article = to_article(topic, content, research)
+        article["research_tokens_saved"] = compacted.tokens_saved
+        return article
+
+    # Cria o agente de escrita; o streaming de tokens só é ativado quando há quem os consuma
+    limits = crew_length.bounds(min_words, max_words) if crew_length.enabled() else None
+    writer = _writer(limits, stream=on_event is not None)
+
+    # Cria uma tarefa de escrita, onde o agente 'writer' escreverá um artigo com base nas informações pesquisadas,
+    # que são incluídas na própria descrição da tarefa
     writing_task = Task(
-        description=f"Escreva um artigo de pelo menos 300 palavras sobre {topic} usando as informações pesquisadas",  # Descrição da tarefa de escrita
+        name="writing",  # Nome usado para identificar a tarefa nos eventos da execução
+        description=(
+            f"Escreva um artigo {crew_length.length_instructions(min_words, max_words)} sobre {topic} usando as informações pesquisadas abaixo.\n\n"
+            f"Informações pesquisadas:\n{compacted.text}"
+        ),
         agent=writer,  # O agente responsável por essa tarefa será o 'writer'
-        expected_output="Artigo completo com título, introdução, desenvolvimento e conclusão",  # O resultado esperado é um artigo completo
-        context=[research_task]  # A tarefa de escrita depende da tarefa de pesquisa, então ela é passada como contexto
+        expected_output="Artigo completo com título, introdução, desenvolvimento e conclusão"  # O resultado esperado é um artigo completo
+    )
+
+    content = _run_bounded(topic, writing_task, limits, "writing", on_event, min_words=min_words, max_words=max_words)
+    if limits is not None:
+        content = _continue_article(topic, content, min_words, on_event, max_words)
+    article = to_article(topic, content, research)
+    article["research_tokens_saved"] = compacted.tokens_saved
+    return article
+
+# Escreve um artigo longo em seções e retorna o texto em markdown:
+#   1. um esboço define o título e os títulos das seções;
+#   2. cada seção é escrita em paralelo por um escritor próprio, a partir dos trechos da pesquisa mais relevantes
+#      para ela e com orientações de transição para as seções vizinhas;
+#   3. as seções são unidas e, se o total ficar abaixo de 'min_words', as seções curtas são complementadas em paralelo.
+# Com o controle de tamanho, cada seção é limitada pela sua parte de 'max_words' (ou pela folga sobre o tamanho pedido),
+# inclusive quando é complementada, e o artigo montado é cortado em 'max_words'.
+# As seções de todos os artigos do processo dividem o mesmo pool de LONGFORM_CONCURRENCY threads.
+# Os tokens não são enviados em streaming, pois as seções seriam intercaladas; cada seção concluída gera 'section_completed'.
+def _write_sections(topic, research, context, min_words, on_event=None, max_words=None):
+    plan = crew_longform.plan_sections(min_words)
+    limited = max_words is not None and crew_length.enabled()
+
+    outline_task = Task(
+        name="outline",  # Nome usado para identificar a tarefa nos eventos da execução
+        description=(
+            f"Crie o esboço de um artigo sobre {topic}, com exatamente {plan.sections} seções, usando as informações "
+            f"pesquisadas abaixo. Responda com o título do artigo na primeira linha, começando com '# ', e uma linha "
+            f"por seção com o seu título, começando com '## '.\n\nInformações pesquisadas:\n{context}"
+        ),
+        agent=WriterAgent().create_agent(),
+        expected_output=f"Título do artigo e os títulos das {plan.sections} seções em markdown"
+    )
+    outline = _run_task(topic, outline_task, "writer", "outline", on_event)
+    title, headings = crew_longform.parse_outline(outline, plan.sections, topic)
+    if on_event is not None:
+        on_event("outline", {"title": title, "sections": headings, "words_per_section": plan.words_per_section})
+
+    # Cada seção recebe a sua parte de 'max_words', descontadas as palavras do título e dos subtítulos
+    section_words, section_max = plan.words_per_section, None
+    if limited:
+        headings_words = crew_longform.word_count(crew_longform.stitch(title, headings, [""] * len(headings)))
+        section_max = max(1, (max_words - headings_words) // len(headings))
+        section_words = min(section_words, section_max)
+
+    # Cada seção recebe a parte da pesquisa mais relevante para o seu título
+    budget = int(os.getenv("LONGFORM_SECTION_TOKEN_BUDGET", "800"))
+
+    def write_section(index, words, previous=""):
+        heading = headings[index]
+        if previous:
+            description = (
+                f"Continue a seção \"{heading}\" de um artigo sobre {topic}, acrescentando pelo menos {words} palavras "
+                f"sem repetir o texto já escrito abaixo.\n\nTexto já escrito:\n{previous}"
+            )
+        else:
+            section_context = _section_context(research, topic, heading, budget)
+            description = (
+                f"Escreva a seção \"{heading}\" ({index + 1} de {len(headings)}) de um artigo sobre {topic}, com pelo menos "
+                f"{words} palavras, usando as informações pesquisadas abaixo. "
+                f"{crew_longform.section_instructions(index, headings)}\n\nInformações pesquisadas:\n{section_context}"
+            )
+        # Uma seção complementada só pode crescer até a sua parte de 'max_words'
+        stop_words = section_max - crew_longform.word_count(previous) if section_max else None
+        limits = crew_length.bounds(words, stop_words) if crew_length.enabled() else None
+        task = Task(
+            name="section",  # Todas as seções aparecem como 'section' nos eventos e métricas
+            description=description,
+            agent=_writer(limits),
+            expected_output=f"Texto da seção \"{heading}\", sem o título"
+        )
+        body = crew_longform.section_body(_run_bounded(topic, task, limits, "section", on_event), heading)
+        if on_event is not None:
+            on_event("section_completed", {"index": index, "heading": heading, "words": crew_longform.word_count(body)})
+        return body
+
+    def run_parallel(jobs):
+        # Cada thread copia o contexto atual, para que os spans das seções fiquem no trace do artigo
+        executor = _get_section_executor()
+        futures = [executor.submit(contextvars.copy_context().run, write_section, *job) for job in jobs]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            # Com uma seção falhando, as que ainda aguardam no pool compartilhado não são escritas
+            for future in futures:
+                future.cancel()
+            raise
+
+    with crew_tracing.span("sections", sections=len(headings)) as span:
+        bodies = run_parallel([(index, section_words) for index in range(len(headings))])
+
+        # Complementa as seções curtas quando o artigo montado não chega ao tamanho pedido
+        short = crew_longform.short_sections(bodies, min_words, section_words)
+        if section_max:
+            short = [(index, missing) for index, missing in short
+                     if crew_longform.word_count(bodies[index]) < section_max]
+        if short:
+            extra = run_parallel([(index, missing, bodies[index]) for index, missing in short])
+            for (index, _), addition in zip(short, extra):
+                bodies[index] = f"{bodies[index]}\n\n{addition}"
+
+        words = sum(crew_longform.word_count(body) for body in bodies)
+        span.set(words=words, extended_sections=len(short))
+
+    logger.info("artigo escrito em seções topic=%r sections=%d words=%d extended_sections=%d",
+                topic, len(headings), words, len(short))
+    content = crew_longform.stitch(title, headings, bodies)
+    return crew_length.trim(content, max_words) if limited else content
+
+# Complementa um artigo que ficou abaixo de 'min_words' com uma única chamada de continuação, em vez de escrevê-lo de novo.
+# A chamada recebe só o final do texto (WRITER_CONTINUATION_CONTEXT_WORDS palavras) e pede as palavras que faltam,
+# limitada às palavras que ainda cabem em 'max_words'.
+def _continue_article(topic, content, min_words, on_event=None, max_words=None):
+    written = crew_longform.word_count(content)
+    missing = min_words - written
+    remaining = max_words - written if max_words else None
+    if missing <= 0 or (remaining is not None and remaining <= 0):
+        return content
+
+    limits = crew_length.bounds(missing, remaining)
+    size = f"pelo menos {missing} palavras" + (f" e no máximo {remaining} palavras" if remaining else "")
+    context = crew_length.tail(content, int(os.getenv("WRITER_CONTINUATION_CONTEXT_WORDS", "300")))
+    continuation_task = Task(
+        name="continuation",  # Nome usado para identificar a tarefa nos eventos da execução
+        description=(
+            f"Continue o artigo sobre {topic}, a partir do ponto em que o trecho abaixo termina, acrescentando {size}. "
+            f"Não repita o trecho nem o título e termine o artigo com uma conclusão."
+            f"\n\nFinal do artigo:\n{context}"
+        ),
+        agent=_writer(limits),
+        expected_output="Continuação do artigo, sem título"
     )
+    addition = crew_longform.section_body(_run_bounded(topic, continuation_task, limits, "continuation", on_event))
+    if on_event is not None:
+        on_event("continuation", {"missing": missing, "words": crew_longform.word_count(addition)})
+    logger.info("artigo complementado topic=%r missing=%d added=%d", topic, missing, crew_longform.word_count(addition))
+    return f"{content.rstrip()}\n\n{addition}"
+
+# Trechos da pesquisa mais relevantes para uma seção, dentro do orçamento de tokens da seção
+def _section_context(research, topic, heading, budget):
+    return crew_compaction.compact(research, f"{topic} {heading}", budget=budget).text
+
+# Executa a etapa de edição: o editor revisa o artigo escrito, que é retornado com o título
+# e o conteúdo revisados e as referências do artigo original mais as citadas na revisão.
+def run_editing(topic, article, on_event=None):
+    editor = EditorAgent().create_agent()
 
-    # Cria uma instância de 'Crew', representando a equipe de agentes, e define as tarefas que os agentes vão executar
-    crew = Crew(
-        agents=[researcher, writer],  # A equipe é composta pelos agentes 'researcher' e 'writer'
-        tasks=[research_task, writing_task],  # As tarefas atribuídas são 'research_task' e 'writing_task'
-        verbose=True  # Ativa o modo verboso para acompanhar o progresso das tarefas
+    # O artigo é incluído na própria descrição da tarefa de revisão
+    editing_task = Task(
+        name="editing",  # Nome usado para identificar a tarefa nos eventos da execução
+        description=(
+            f"Revise o artigo abaixo sobre {topic}, corrigindo erros e aprimorando a clareza e o estilo "
+            f"sem remover informações.\n\n# {article['title']}\n\n{article['content']}"
+        ),
+        agent=editor,  # O agente responsável por essa tarefa será o 'editor'
+        expected_output="Artigo final revisado em markdown, com o título na primeira linha, pronto para publicação"
     )
 
-    # Inicia a execução da equipe e retorna o resultado. O 'kickoff()' provavelmente executa as tarefas de forma sequencial ou paralela.
-    return crew.kickoff()
+    content = _run_task(topic, editing_task, "editor", "editing", on_event)
+    edited = to_article(topic, content)
+    if not content.lstrip().startswith("#"):
+        # Sem cabeçalho na revisão, o título do artigo escrito é mantido
+        edited["title"] = article["title"]
+    edited["references"] = list(dict.fromkeys(article["references"] + edited["references"]))
+    return {**article, **edited}
+
+# Converte o texto gerado pelo escritor no dicionário usado pela API
+def to_article(topic, content, research=""):
+    content = content.strip()
+    title = f"Artigo sobre {topic}"
+
+    # Usa a primeira linha como título quando ela for um cabeçalho markdown
+    first_line, _, rest = content.partition("\n")
+    if first_line.startswith("#"):
+        title = first_line.lstrip("#").strip() or title
+        content = rest.strip()
+
+    urls = (url.rstrip(".,;:") for url in URL_RE.findall(f"{research}\n{content}"))
+    references = list(dict.fromkeys(urls))
+    return {"title": title, "content": content, "references": references}
+
+# Define a função 'create_crew', que executa as etapas do perfil em sequência para pesquisar e escrever um artigo.
+# O artigo retornado informa o perfil executado ('profile'), a duração de cada etapa em segundos ('stage_timings')
+# e as etapas com alguma tarefa reaproveitada de um checkpoint ou do cache semântico ('reused_stages').
+# 'max_words' (opcional) limita o tamanho do artigo escrito (ver 'run_writing').
+def create_crew(topic, min_words=300, on_event=None, profile=crew_profiles.DEFAULT_PROFILE, max_words=None):
+    stages = crew_profiles.PROFILES[profile]
+    timings, reused, reused_stages = {}, [], []
+    if on_event is not None:
+        on_event("profile", {"profile": profile, "stages": list(stages)})
+
+    def run_stage(stage, function, *args):
+        start, restored = time.perf_counter(), len(reused)
+        result = function(*args)
+        timings[stage] = time.perf_counter() - start
+        if len(reused) > restored:
+            reused_stages.append(stage)
+        return result
+
+    token = _reused_tasks.set(reused)
+    try:
+        with crew_checkpoints.run_scope(), \
+                crew_tracing.span("article", topic=topic, min_words=min_words, max_words=max_words, profile=profile) as span:
+            research = run_stage("research", run_research, topic, on_event, profile)
+            article = run_stage("writing", run_writing, topic, research, min_words, on_event, max_words)
+            if "editing" in stages:
+                article = run_stage("editing", run_editing, topic, article, on_event)
+    finally:
+        _reused_tasks.reset(token)
+
+    article["profile"] = profile
+    article["stage_timings"] = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+    article["reused_stages"] = reused_stages
+    logger.info("artigo gerado topic=%r profile=%s duration=%.3fs research_tokens_saved=%d",
+                topic, profile, span.duration, article["research_tokens_saved"])
+    return article
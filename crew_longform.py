@@ -0,0 +1,137 @@
+# Escrita de artigos longos em seções: um esboço define o título e as seções, cada seção é
+# escrita em paralelo a partir dos trechos da pesquisa mais relevantes para ela e as seções
+# são unidas no artigo final. O tempo total passa a depender da seção mais longa, e não do
+# texto inteiro, e nenhuma chamada ao LLM precisa gerar o artigo completo de uma vez.
+# Este módulo contém o planejamento e a montagem; a execução das tarefas fica em 'crew_logic'.
+
+import math
+import os
+import re
+from dataclasses import dataclass
+
+# Linhas do esboço que representam seções: "## Título", "- Título", "* Título" ou "1. Título"
+SECTION_LINE_RE = re.compile(r"^\s*(?:#{2,}\s*|[-*•]\s+|\d+[.)]\s+)(.+?)\s*$")
+TITLE_LINE_RE = re.compile(r"^\s*#\s+(.+?)\s*$")
+
+#-------------------------------------------------------------------
+@dataclass
+class SectionPlan:
+    """
+    Divisão de um artigo longo em seções
+    """
+    sections: int
+    words_per_section: int
+
+def longform_min_words():
+    """
+    Tamanho pedido a partir do qual o artigo é escrito em seções (LONGFORM_MIN_WORDS, padrão 1500; 0 desativa)
+    """
+    return int(os.getenv("LONGFORM_MIN_WORDS", "1500"))
+
+def plan_sections(min_words, section_words=None, max_sections=None):
+    """
+    Quantidade de seções e palavras pedidas a cada uma para chegar a 'min_words'.
+
+    Args:
+        min_words (int): Tamanho mínimo do artigo.
+        section_words (int): Tamanho desejado de cada seção. Padrão: LONGFORM_SECTION_WORDS (500).
+        max_sections (int): Máximo de seções. Padrão: LONGFORM_MAX_SECTIONS (8).
+
+    Returns:
+        SectionPlan: Ao menos duas seções; cada uma pede 5% a mais que a sua parte,
+            pois os modelos costumam ficar um pouco abaixo do tamanho pedido.
+    """
+    if section_words is None:
+        section_words = int(os.getenv("LONGFORM_SECTION_WORDS", "500"))
+    if max_sections is None:
+        max_sections = int(os.getenv("LONGFORM_MAX_SECTIONS", "8"))
+
+    sections = min(max(2, math.ceil(min_words / section_words)), max(2, max_sections))
+    return SectionPlan(sections, math.ceil(min_words * 1.05 / sections))
+
+#-------------------------------------------------------------------
+def default_headings(sections):
+    """
+    Títulos genéricos usados quando o esboço não traz seções suficientes
+    """
+    middle = ["Desenvolvimento"] if sections == 3 else [f"Desenvolvimento {i}" for i in range(1, sections - 1)]
+    return ["Introdução"] + middle + ["Conclusão"]
+
+def parse_outline(text, sections, topic):
+    """
+    Extrai o título e os títulos das seções do esboço gerado.
+
+    Returns:
+        tuple: (título, [títulos das seções]) com exatamente 'sections' seções.
+    """
+    title, headings = f"Artigo sobre {topic}", []
+    for line in text.splitlines():
+        title_match = TITLE_LINE_RE.match(line)
+        if title_match and not headings:
+            title = title_match.group(1)
+            continue
+        section_match = SECTION_LINE_RE.match(line)
+        if section_match:
+            heading = section_match.group(1).strip("*_ ")
+            if heading and heading not in headings:
+                headings.append(heading)
+
+    if len(headings) < sections:
+        # Um esboço incompleto ou fora do formato é substituído pela estrutura padrão
+        return title, default_headings(sections)
+    return title, headings[:sections]
+
+def section_body(text, heading=None):
+    """
+    Texto da seção sem as linhas de título que o modelo costuma repetir no início
+    """
+    lines = text.strip().splitlines()
+    while lines and (lines[0].lstrip().startswith("#") or not lines[0].strip()
+                     or (heading and lines[0].strip().strip("*_: ").lower() == heading.lower())):
+        lines.pop(0)
+    return "\n".join(lines).strip()
+
+def word_count(text):
+    """
+    Número de palavras do texto
+    """
+    return len(text.split())
+
+def stitch(title, headings, bodies):
+    """
+    Monta o artigo em markdown: título, e cada seção com o seu subtítulo
+    """
+    parts = [f"# {title}"]
+    for heading, body in zip(headings, bodies):
+        parts.append(f"## {heading}\n\n{body}")
+    return "\n\n".join(parts)
+
+#-------------------------------------------------------------------
+def section_instructions(index, headings):
+    """
+    Orientações de posição e de transição da seção 'index' (a partir de 0), para que as
+    seções escritas em paralelo se encadeiem sem uma revisão posterior do texto inteiro
+    """
+    instructions = []
+    if index == 0:
+        instructions.append("Esta é a primeira seção: apresente o tema ao leitor.")
+    else:
+        instructions.append(f"A seção anterior é \"{headings[index - 1]}\"; comece dando continuidade a ela.")
+    if index == len(headings) - 1:
+        instructions.append("Esta é a última seção: conclua o artigo.")
+    else:
+        instructions.append(f"A próxima seção é \"{headings[index + 1]}\"; termine preparando a transição para ela.")
+    instructions.append("Não repita o título da seção nem escreva o conteúdo das demais seções.")
+    return " ".join(instructions)
+
+def short_sections(bodies, min_words, words_per_section):
+    """
+    Seções a complementar quando o artigo montado não chega a 'min_words'
+
+    Returns:
+        list: (índice, palavras que faltam) das seções abaixo do tamanho pedido.
+    """
+    counts = [word_count(body) for body in bodies]
+    if sum(counts) >= min_words:
+        return []
+    return [(index, words_per_section - count) for index, count in enumerate(counts) if count < words_per_section]
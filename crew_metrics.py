@@ -0,0 +1,221 @@
+# Métricas simples em memória (contadores e histogramas de latência) compartilhadas
+# pelos componentes do projeto, como a ferramenta da Wikipedia e a API, e sua exposição
+# no formato de texto do Prometheus. As métricas de outros processos (ex.: os workers da crew)
+# são coletadas com 'drain' e somadas às do processo da API com 'merge'.
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Limites (em segundos) dos buckets padrão dos histogramas de latência
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Todas as métricas criadas no processo, na ordem de criação
+REGISTRY = []
+
+#-------------------------------------------------------------------
+class _Metric:
+    """
+    Base das métricas: guarda um valor por combinação de labels
+    """
+    kind = ""
+
+    def __init__(self, name, description, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Labels esperados para '{self.name}': {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def reset(self):
+        """
+        Descarta todos os valores registrados
+        """
+        with self._lock:
+            self._values.clear()
+
+    def spec(self):
+        """
+        Definição da métrica, usada para recriá-la em outro processo
+        """
+        return {"name": self.name, "kind": self.kind, "description": self.description, "labelnames": self.labelnames}
+
+    def _drain(self):
+        # Retorna os valores e recomeça do zero, sem perder observações feitas entre as duas operações
+        with self._lock:
+            values, self._values = self._values, {}
+            return values
+
+#-------------------------------------------------------------------
+class Counter(_Metric):
+    """
+    Contador monotônico
+    """
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        """
+        Incrementa o contador da combinação de labels informada
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """
+        Retorna o valor atual do contador
+        """
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def snapshot(self):
+        """
+        Retorna uma cópia dos valores: {(labels...): valor}
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def _add(self, values):
+        with self._lock:
+            for key, amount in values.items():
+                self._values[key] = self._values.get(key, 0) + amount
+
+#-------------------------------------------------------------------
+class Histogram(_Metric):
+    """
+    Histograma cumulativo de observações (ex.: latências em segundos)
+    """
+    kind = "histogram"
+
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def spec(self):
+        return {**super().spec(), "buckets": self.buckets}
+
+    def observe(self, value, **labels):
+        """
+        Registra uma observação na combinação de labels informada
+        """
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"count": 0, "sum": 0.0, "buckets": [0] * len(self.buckets)}
+            state["count"] += 1
+            state["sum"] += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Mede o tempo do bloco 'with' e o registra como observação
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        """
+        Retorna uma cópia dos valores: {(labels...): {"count", "sum", "buckets"}}
+        """
+        with self._lock:
+            return {
+                key: {"count": state["count"], "sum": state["sum"], "buckets": list(state["buckets"])}
+                for key, state in self._values.items()
+            }
+
+    def _add(self, values):
+        with self._lock:
+            for key, added in values.items():
+                state = self._values.get(key)
+                if state is None:
+                    state = self._values[key] = {"count": 0, "sum": 0.0, "buckets": [0] * len(self.buckets)}
+                state["count"] += added["count"]
+                state["sum"] += added["sum"]
+                state["buckets"] = [a + b for a, b in zip(state["buckets"], added["buckets"])]
+
+#-------------------------------------------------------------------
+def drain():
+    """
+    Retorna os valores registrados no processo desde a última chamada e zera as métricas.
+    Usada nos workers da crew, cujas métricas são enviadas ao processo da API com o resultado.
+
+    Returns:
+        list: Definição ('spec') e valores de cada métrica com observações.
+    """
+    deltas = []
+    for metric in list(REGISTRY):
+        values = metric._drain()
+        if values:
+            deltas.append({**metric.spec(), "values": values})
+    return deltas
+
+def merge(deltas):
+    """
+    Soma às métricas do processo os valores coletados em outro processo por 'drain'.
+    Métricas que ainda não existem no processo (módulo não importado) são criadas.
+    """
+    by_name = {metric.name: metric for metric in REGISTRY}
+    for delta in deltas:
+        metric = by_name.get(delta["name"])
+        if metric is None:
+            if delta["kind"] == "histogram":
+                metric = Histogram(delta["name"], delta["description"], delta["labelnames"], delta["buckets"])
+            else:
+                metric = Counter(delta["name"], delta["description"], delta["labelnames"])
+            by_name[metric.name] = metric
+        if metric.kind == delta["kind"]:
+            metric._add(delta["values"])
+
+#-------------------------------------------------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_prometheus(registry=None):
+    """
+    Formata as métricas no formato de texto do Prometheus (versão 0.0.4)
+
+    Args:
+        registry (list): Métricas a formatar. Padrão: todas as métricas do processo.
+
+    Returns:
+        str: Texto pronto para ser servido em /metrics.
+    """
+    lines = []
+    for metric in REGISTRY if registry is None else registry:
+        description = metric.description.replace("\\", "\\\\").replace("\n", "\\n")
+        lines.append(f"# HELP {metric.name} {description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+        for key, value in sorted(metric.snapshot().items()):
+            if metric.kind == "counter":
+                lines.append(f"{metric.name}{_labels(metric.labelnames, key)} {_number(value)}")
+                continue
+
+            for bound, count in zip(metric.buckets, value["buckets"]):
+                labels = _labels(metric.labelnames, key, [("le", _number(float(bound)))])
+                lines.append(f"{metric.name}_bucket{labels} {count}")
+            labels = _labels(metric.labelnames, key, [("le", "+Inf")])
+            lines.append(f"{metric.name}_bucket{labels} {value['count']}")
+            lines.append(f"{metric.name}_sum{_labels(metric.labelnames, key)} {_number(value['sum'])}")
+            lines.append(f"{metric.name}_count{_labels(metric.labelnames, key)} {value['count']}")
+    return "\n".join(lines) + "\n"
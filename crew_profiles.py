@@ -0,0 +1,112 @@
+# Perfis do pipeline de geração de artigos e escolha do perfil pelo orçamento de latência.
+#   lean      -> pesquisa com poucas iterações de ferramenta e escrita
+#   standard  -> pesquisa e escrita (pipeline padrão de 'crew_logic')
+#   full-edit -> pesquisa, escrita e revisão pelo editor (a crew completa de 'main.py')
+# Cada etapa depende da saída da anterior, então as etapas de um perfil rodam em sequência.
+
+import os
+import threading
+
+# Perfis do mais barato ao mais completo
+PROFILE_ORDER = ("lean", "standard", "full-edit")
+
+DEFAULT_PROFILE = "standard"
+
+PROFILES = {
+    "lean": ("research", "writing"),
+    "standard": ("research", "writing"),
+    "full-edit": ("research", "writing", "editing"),
+}
+
+# Duração estimada (segundos) de cada etapa antes de haver execuções medidas
+DEFAULT_STAGE_SECONDS = {
+    ("lean", "research"): 10.0,
+    ("lean", "writing"): 30.0,
+    ("standard", "research"): 20.0,
+    ("standard", "writing"): 30.0,
+    ("full-edit", "research"): 20.0,
+    ("full-edit", "writing"): 30.0,
+    ("full-edit", "editing"): 25.0,
+}
+
+#-------------------------------------------------------------------
+def research_max_iter(profile):
+    """
+    Máximo de iterações do pesquisador no perfil (LEAN_RESEARCH_MAX_ITER no perfil "lean"),
+    ou None para o padrão do crewai
+    """
+    if profile == "lean":
+        return int(os.getenv("LEAN_RESEARCH_MAX_ITER", "3"))
+    return None
+
+#-------------------------------------------------------------------
+class StageEstimates:
+    """
+    Duração estimada de cada etapa de cada perfil, atualizada por média móvel
+    exponencial a partir das durações medidas nas execuções
+    """
+
+    def __init__(self, alpha=0.2, defaults=None):
+        """
+        Args:
+            alpha (float): Peso de cada nova medição na média.
+            defaults (dict): Estimativas iniciais por (perfil, etapa).
+        """
+        self.alpha = alpha
+        self._seconds = dict(defaults or DEFAULT_STAGE_SECONDS)
+        self._lock = threading.Lock()
+
+    def estimate(self, profile):
+        """
+        Duração estimada do perfil completo, em segundos
+        """
+        with self._lock:
+            return sum(self._seconds[(profile, stage)] for stage in PROFILES[profile])
+
+    def record(self, profile, timings):
+        """
+        Atualiza as estimativas com as durações medidas ({etapa: segundos}) de uma execução do perfil
+        """
+        with self._lock:
+            for stage, seconds in (timings or {}).items():
+                key = (profile, stage)
+                if key in self._seconds:
+                    self._seconds[key] += self.alpha * (seconds - self._seconds[key])
+
+    def snapshot(self):
+        """
+        Estimativas atuais por perfil
+        """
+        return {profile: round(self.estimate(profile), 3) for profile in PROFILE_ORDER}
+
+stage_estimates = StageEstimates()
+
+#-------------------------------------------------------------------
+def choose_profile(requested=None, latency_budget=None, estimates=None):
+    """
+    Escolhe o perfil que será executado.
+
+    Sem orçamento, executa o perfil pedido (ou o padrão). Com orçamento, executa o
+    perfil mais completo, até o pedido, cuja duração estimada caiba no orçamento;
+    se nenhum couber, executa o "lean".
+
+    Args:
+        requested (str): Perfil pedido, ou None.
+        latency_budget (float): Tempo máximo desejado, em segundos, ou None.
+        estimates (StageEstimates): Estimativas usadas (padrão: as do processo).
+
+    Returns:
+        str: Nome do perfil.
+    """
+    if requested is not None and requested not in PROFILES:
+        raise ValueError(f"Perfil desconhecido: {requested}")
+    if latency_budget is None:
+        return requested or DEFAULT_PROFILE
+
+    estimates = estimates or stage_estimates
+    # Sem perfil pedido, o orçamento pode escolher até o mais completo
+    ceiling = PROFILE_ORDER.index(requested or PROFILE_ORDER[-1])
+    for profile in reversed(PROFILE_ORDER[:ceiling + 1]):
+        if estimates.estimate(profile) <= latency_budget:
+            return profile
+    return PROFILE_ORDER[0]
@@ -0,0 +1,297 @@
+# Cache semântico de tópicos: reaproveita pesquisas e artigos de tópicos parecidos
+# (ex.: "Energia Solar" e "energia solar fotovoltaica") em vez de executar a crew do zero.
+# Os tópicos são convertidos em vetores de n-gramas com hashing, sem modelo nem rede, e
+# buscados por vizinho mais próximo no índice HNSW do chromadb.
+# Os n-gramas não distinguem tópicos que diferem só por um número ("Diabetes tipo 1" e "Diabetes
+# tipo 2"), então números, algarismos romanos e números por extenso ("tipo um", "Segunda Guerra",
+# convertidos em algarismos) precisam coincidir exatamente para haver reuso.
+
+import atexit
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import unicodedata
+import uuid
+import zlib
+
+import numpy as np
+
+from crew_metrics import Counter
+
+SEMANTIC_CACHE_REQUESTS = Counter(
+    "semantic_cache_requests_total",
+    "Consultas ao cache semântico de tópicos por tipo (research ou article) e resultado (hit ou miss)",
+    labelnames=("kind", "result"),
+)
+
+# Dimensão dos vetores dos tópicos
+EMBEDDING_DIM = 512
+
+# Tamanhos dos n-gramas de caracteres usados nos vetores
+NGRAM_SIZES = (3, 4, 5)
+
+# Palavras que identificam um tópico exatamente: as que têm algarismos ("2014", "covid-19")
+# e os algarismos romanos usuais ("ii", "xiv")
+KEY_TOKEN_RE = re.compile(r"^(?:.*\d.*|i{1,3}|iv|vi{0,3}|ix|xi{0,3}|xiv|xvi{0,3}|xix|xx)$")
+
+# Ordinais escritos com algarismos ("2a", "1º", "3rd"), reduzidos ao número
+ORDINAL_SUFFIX_RE = re.compile(r"^(\d+)(?:o|a|os|as|st|nd|rd|th)$")
+
+# Números e ordinais por extenso (sem acentos), convertidos em algarismos para que "Diabetes tipo um"
+# e "Diabetes tipo 1" tenham as mesmas palavras-chave e "tipo um" e "tipo dois" não
+NUMBER_WORDS = {
+    **dict.fromkeys(("um", "uma", "primeiro", "primeira", "one", "first"), "1"),
+    **dict.fromkeys(("dois", "duas", "segundo", "segunda", "two", "second"), "2"),
+    **dict.fromkeys(("tres", "terceiro", "terceira", "three", "third"), "3"),
+    **dict.fromkeys(("quatro", "quarto", "quarta", "four", "fourth"), "4"),
+    **dict.fromkeys(("cinco", "quinto", "quinta", "five", "fifth"), "5"),
+    **dict.fromkeys(("seis", "sexto", "sexta", "six", "sixth"), "6"),
+    **dict.fromkeys(("sete", "setimo", "setima", "seven", "seventh"), "7"),
+    **dict.fromkeys(("oito", "oitavo", "oitava", "eight", "eighth"), "8"),
+    **dict.fromkeys(("nove", "nono", "nona", "nine", "ninth"), "9"),
+    **dict.fromkeys(("dez", "decimo", "decima", "ten", "tenth"), "10"),
+    **dict.fromkeys(("onze", "eleven"), "11"),
+    **dict.fromkeys(("doze", "twelve"), "12"),
+    **dict.fromkeys(("vinte", "twenty"), "20"),
+    **dict.fromkeys(("cem", "cento", "hundred"), "100"),
+    **dict.fromkeys(("mil", "thousand"), "1000"),
+}
+
+#-------------------------------------------------------------------
+def _topic_words(topic):
+    """
+    Palavras do tópico em minúsculas, sem acentos e sem pontuação
+    """
+    text = unicodedata.normalize("NFKD", topic.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return "".join(c if c.isalnum() else " " for c in text).split()
+
+def _key_token(word):
+    """
+    Valor exato da palavra ("1" para "um", "primeira" ou "1a"; "ii" para "ii"), ou None
+    se ela não identificar um número
+    """
+    if word in NUMBER_WORDS:
+        return NUMBER_WORDS[word]
+    ordinal = ORDINAL_SUFFIX_RE.match(word)
+    if ordinal:
+        return str(int(ordinal.group(1)))
+    return word if KEY_TOKEN_RE.match(word) else None
+
+def key_tokens(topic):
+    """
+    Números (inclusive por extenso) e algarismos romanos do tópico, ordenados e separados
+    por espaço. Dois tópicos só são considerados o mesmo quando esses valores coincidem.
+    """
+    return " ".join(sorted({token for token in map(_key_token, _topic_words(topic)) if token}))
+
+def embed_topic(topic, dim=EMBEDDING_DIM):
+    """
+    Vetor normalizado do tópico, formado por n-gramas de caracteres e palavras com hashing.
+
+    Tópicos que compartilham radicais (ex.: "solar" e "Solar energy") ficam próximos
+    mesmo com ordem de palavras ou acentuação diferentes.
+
+    Returns:
+        np.ndarray: Vetor de 'dim' posições com norma 1 (ou zero para tópicos vazios).
+    """
+    words = _topic_words(topic)
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in words:
+        vector[zlib.crc32(f"w:{word}".encode()) % dim] += 1.0
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            for i in range(len(padded) - size + 1):
+                vector[zlib.crc32(padded[i:i + size].encode()) % dim] += 1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+#-------------------------------------------------------------------
+class SemanticTopicCache:
+    """
+    Pesquisas e artigos anteriores indexados pelo vetor do tópico.
+
+    Cada tipo de entrada ("research" ou "article") fica em uma coleção do chromadb.
+    Uma consulta encontra o tópico mais parecido entre os que têm os mesmos números
+    ('key_tokens') e o devolve se a similaridade de cosseno for de pelo menos
+    'threshold' e a entrada não tiver expirado. Acima de 'max_entries', as entradas
+    usadas há mais tempo são removidas.
+    """
+
+    def __init__(self, path=None, max_entries=1000, ttl=86400, thresholds=None):
+        """
+        Args:
+            path (str): Diretório de persistência. None usa um diretório temporário,
+                apagado ao fim do processo.
+            max_entries (int): Máximo de entradas de cada tipo.
+            ttl (float): Validade, em segundos, de cada entrada.
+            thresholds (dict): Similaridade mínima por tipo, ex.: {"research": 0.7, "article": 0.9}.
+        """
+        # Importado aqui porque o chromadb é pesado e só é necessário quando o cache é usado
+        import chromadb
+        from chromadb.config import Settings
+
+        # O cliente em memória do chromadb perde as tabelas quando as threads que o usaram terminam,
+        # então mesmo sem persistência o índice fica em disco, em um diretório temporário
+        if path is None:
+            path = tempfile.mkdtemp(prefix="semantic-cache-")
+            atexit.register(shutil.rmtree, path, ignore_errors=True)
+
+        self._client = chromadb.PersistentClient(path, settings=Settings(anonymized_telemetry=False))
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.thresholds = {"research": 0.7, "article": 0.9, **(thresholds or {})}
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Cria o cache a partir de SEMANTIC_CACHE_DIR, SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_TTL,
+        SEMANTIC_CACHE_RESEARCH_THRESHOLD e SEMANTIC_CACHE_ARTICLE_THRESHOLD
+        """
+        return cls(
+            path=os.getenv("SEMANTIC_CACHE_DIR") or None,
+            max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "1000")),
+            ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "86400")),
+            thresholds={
+                "research": float(os.getenv("SEMANTIC_CACHE_RESEARCH_THRESHOLD", "0.7")),
+                "article": float(os.getenv("SEMANTIC_CACHE_ARTICLE_THRESHOLD", "0.9")),
+            },
+        )
+
+    def _collection(self, kind):
+        collection = self._collections.get(kind)
+        if collection is None:
+            collection = self._collections[kind] = self._client.get_or_create_collection(
+                f"topics_{kind}", metadata={"hnsw:space": "cosine"}, embedding_function=None
+            )
+        return collection
+
+    #-------------------------------------------------------------
+    def get(self, kind, topic, where=None):
+        """
+        Procura a entrada do tópico mais parecido.
+
+        Args:
+            kind (str): "research" ou "article".
+            topic (str): Tópico pedido.
+            where (dict): Filtros extras nos metadados (ex.: {"signature": "..."}).
+
+        Returns:
+            tuple: (documento, tópico encontrado, similaridade) ou None se não houver
+                tópico parecido o bastante.
+        """
+        embedding = embed_topic(topic)
+        if not embedding.any():
+            return None
+        # As entradas expiradas ficam fora da busca, para não esconderem uma entrada válida mais distante
+        conditions = [{"key_tokens": key_tokens(topic)}, {"created_at": {"$gt": time.time() - self.ttl}}]
+        where = {"$and": conditions + ([where] if where else [])}
+
+        with self._lock:
+            collection = self._collection(kind)
+            found = None
+            if collection.count():
+                result = collection.query(
+                    query_embeddings=[embedding.tolist()], n_results=1, where=where,
+                    include=["documents", "metadatas", "distances"],
+                )
+                if result["ids"][0]:
+                    entry_id, metadata = result["ids"][0][0], result["metadatas"][0][0]
+                    similarity = 1.0 - result["distances"][0][0]
+                    if similarity >= self.thresholds[kind]:
+                        collection.update(ids=[entry_id], metadatas=[{**metadata, "last_used": time.time()}])
+                        found = (result["documents"][0][0], metadata["topic"], similarity)
+
+        SEMANTIC_CACHE_REQUESTS.inc(kind=kind, result="hit" if found else "miss")
+        return found
+
+    def add(self, kind, topic, document, **metadata):
+        """
+        Guarda o documento (pesquisa ou artigo serializado) do tópico.
+
+        Args:
+            **metadata: Metadados extras usados nos filtros de 'get' (str, int, float ou bool).
+        """
+        embedding = embed_topic(topic)
+        if not embedding.any() or self.max_entries <= 0:
+            return
+
+        now = time.time()
+        with self._lock:
+            collection = self._collection(kind)
+            collection.add(
+                ids=[uuid.uuid4().hex],
+                embeddings=[embedding.tolist()],
+                documents=[document],
+                metadatas=[{"topic": topic, "key_tokens": key_tokens(topic), "created_at": now, "last_used": now,
+                            **metadata}],
+            )
+            self._evict(collection, now)
+
+    def _evict(self, collection, now):
+        # Remove as entradas expiradas
+        collection.delete(where={"created_at": {"$lte": now - self.ttl}})
+        # Remove as entradas usadas há mais tempo, com folga de 10% para não remover a cada inserção
+        excess = collection.count() - self.max_entries
+        if excess <= 0:
+            return
+        entries = collection.get(include=["metadatas"])
+        ordered = sorted(zip(entries["ids"], entries["metadatas"]), key=lambda entry: entry[1]["last_used"])
+        remove = excess + self.max_entries // 10
+        collection.delete(ids=[entry_id for entry_id, _ in ordered[:remove]])
+
+    #-------------------------------------------------------------
+    def clear(self):
+        """
+        Remove todas as entradas
+        """
+        with self._lock:
+            for kind in list(self._collections):
+                self._client.delete_collection(f"topics_{kind}")
+            self._collections.clear()
+
+    def stats(self):
+        """
+        Quantidade de entradas de cada tipo
+        """
+        with self._lock:
+            return {kind: collection.count() for kind, collection in self._collections.items()}
+
+#-------------------------------------------------------------------
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+# O índice do chromadb não pode ser aberto por vários processos ao mesmo tempo, e o diretório
+# temporário só é removido no fim normal do processo. Por isso o cache pertence a um único processo
+# (o da API); os workers em processos separados ('Api.jobs') chamam 'disable_in_process'.
+_process_disabled = False
+
+def disable_in_process():
+    """
+    Desativa o cache semântico no processo atual (ex.: um worker da crew em outro processo)
+    """
+    global _process_disabled
+
+    _process_disabled = True
+
+def get_semantic_cache():
+    """
+    Retorna o cache semântico compartilhado pelo processo, ou None se SEMANTIC_CACHE=0
+    ou se o processo não for o dono do cache
+    """
+    global _default_cache
+
+    if _process_disabled or os.getenv("SEMANTIC_CACHE", "1") == "0":
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SemanticTopicCache.from_env()
+        return _default_cache
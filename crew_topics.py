@@ -0,0 +1,10 @@
+# Normalização dos tópicos e títulos usados como chave (caches, checkpoints, índice da Wikipedia).
+# Não importa o crewai, para poder ser usada pela API sem carregar a crew.
+
+#-------------------------------------------------------------------
+def normalize_title(title: str) -> str:
+    """
+    Normaliza um título para uso como chave: '_' vira espaço, espaços repetidos
+    são removidos e a caixa é ignorada ("energia_solar " == "Energia Solar").
+    """
+    return " ".join(title.replace("_", " ").split()).casefold()
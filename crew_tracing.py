@@ -0,0 +1,155 @@
+# Rastreamento (tracing) das execuções da crew no formato de spans do OpenTelemetry:
+# cada etapa (artigo, pesquisa, escrita, tarefa, chamada ao LLM ou à Wikipedia) vira um span
+# com início, fim, atributos e o span pai. Os spans podem ser gravados em um arquivo JSONL local.
+
+import contextvars
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+# Span ativo no contexto atual (thread ou tarefa assíncrona)
+_current = contextvars.ContextVar("crew_span", default=None)
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+#-------------------------------------------------------------------
+class Span:
+    """
+    Um trecho medido da execução
+    """
+
+    def __init__(self, name, parent=None, sampled=True, **attributes):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.sampled = parent.sampled if parent else sampled
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self.duration = None
+
+    def set(self, **attributes):
+        """
+        Adiciona atributos ao span
+        """
+        self.attributes.update(attributes)
+
+    def fail(self, error):
+        """
+        Marca o span como falho
+        """
+        self.status = "error"
+        self.attributes["error"] = str(error)
+
+    def finish(self):
+        """
+        Encerra o span e o envia ao exportador, se houver um
+        """
+        self.duration = time.perf_counter() - self._start
+        exporter = get_exporter()
+        if exporter is not None and self.sampled:
+            exporter.export(self)
+        return self.duration
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.start_ns + int((self.duration or 0) * 1e9),
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+#-------------------------------------------------------------------
+class FileSpanExporter:
+    """
+    Grava cada span encerrado como uma linha JSON no arquivo informado
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+
+def get_exporter():
+    """
+    Retorna o exportador configurado em CREW_TRACE_FILE, ou None se o rastreamento estiver desligado
+    """
+    global _exporter
+
+    path = os.getenv("CREW_TRACE_FILE")
+    if not path:
+        return None
+    with _exporter_lock:
+        if _exporter is None or _exporter.path != path:
+            _exporter = FileSpanExporter(path)
+        return _exporter
+
+#-------------------------------------------------------------------
+def current_span():
+    """
+    Retorna o span ativo, ou None
+    """
+    return _current.get()
+
+def start_span(name, **attributes):
+    """
+    Abre um span filho do span ativo e o torna o span ativo.
+
+    Um trace novo é amostrado com a probabilidade CREW_TRACE_SAMPLE_RATE (padrão 1.0);
+    os spans filhos seguem a decisão do trace.
+
+    Returns:
+        tuple: (span, token), a serem passados a 'end_span'.
+    """
+    parent = _current.get()
+    sampled = parent is not None or random.random() < float(os.getenv("CREW_TRACE_SAMPLE_RATE", "1.0"))
+    span = Span(name, parent=parent, sampled=sampled, **attributes)
+    return span, _current.set(span)
+
+def end_span(span, token, error=None):
+    """
+    Encerra um span aberto com 'start_span' e restaura o span ativo anterior.
+
+    Returns:
+        float: Duração do span em segundos.
+    """
+    if error is not None:
+        span.fail(error)
+    try:
+        _current.reset(token)
+    except ValueError:
+        # O token foi criado em outro contexto (ex.: eventos entregues fora de ordem)
+        _current.set(None)
+    return span.finish()
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Bloco 'with' medido como um span
+    """
+    current, token = start_span(name, **attributes)
+    error = None
+    try:
+        yield current
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        end_span(current, token, error)
@@ -1,66 +1,125 @@
 from crewai import Agent, Task, Crew
+from crewai.tasks.task_output import TaskOutput
 from Tools.WikipediaTool import WikipediaTool
+from crew_logging import get_logger, verbose
+import crew_checkpoints
 
-# 1. Criar ferramentas (tool)
-wikipedia_tool = WikipediaTool()
-
-# 2. Criar agentes
-researcher = Agent(
-    role="Pesquisador de Conteúdo",
-    goal="Pesquisar informações confiáveis e atualizadas sobre o tópico fornecido.",
-    backstory="Você é um especialista em busca de informações, capaz de extrair dados relevantes da Wikipedia e outras fontes abertas para ajudar na criação de conteúdo educacional.",
-    tools=[wikipedia_tool],
-    allow_delegation=False,
-    verbose=True
-)
-
-writer = Agent(
-    role="Redator de Conteúdo",
-    goal="Escrever um artigo informativo e envolvente sobre o tema proposto.",
-    backstory="Você é um redator habilidoso que transforma pesquisas em textos bem estruturados, com clareza, fluidez e coerência.",
-    allow_delegation=False,
-    verbose=True
-)
-
-editor = Agent(
-    role="Editor de Conteúdo",
-    goal="Revisar e refinar o artigo para garantir clareza, consistência e correção gramatical.",
-    backstory="Você é um editor que revisa cuidadosamente os textos para deixá-los prontos para publicação, mantendo o estilo da marca.",
-    allow_delegation=False,
-    verbose=True
-)
-
-# 3. Criar tarefas
-topic = "Energia Solar"
-
-research_task = Task(
-    description=f"Pesquisar e resumir informações sobre {topic} usando a Wikipedia e outras fontes abertas.",
-    expected_output=f"Resumo completo sobre {topic}, com dados e explicações técnicas acessíveis.",
-    agent=researcher
-)
-
-writing_task = Task(
-    description="Escrever um artigo com base nas informações pesquisadas, incluindo introdução, desenvolvimento e conclusão.",
-    expected_output="Artigo bem escrito em formato markdown, com título, subtítulos e ao menos 300 palavras.",
-    agent=writer,
-    context=[research_task]
-)
-
-editing_task = Task(
-    description="Revisar o artigo escrito, corrigir erros e aprimorar a clareza e estilo.",
-    expected_output="Artigo final revisado, pronto para publicação.",
-    agent=editor,
-    context=[writing_task]
-)
-
-# 4. Criar a Crew
-crew = Crew(
-    agents=[researcher, writer, editor],
-    tasks=[research_task, writing_task, editing_task],
-    verbose=2
-)
+# Tópico usado quando o script é executado diretamente
+DEFAULT_TOPIC = "Energia Solar"
+
+logger = get_logger("main")
+
+def build_crew(topic=DEFAULT_TOPIC):
+    """
+    Monta a crew de pesquisa, escrita e edição para o tópico.
+    Nada é construído na importação do módulo, apenas quando esta função é chamada.
+    """
+    # 1. Criar ferramentas (tool)
+    wikipedia_tool = WikipediaTool()
+
+    # 2. Criar agentes
+    researcher = Agent(
+        role="Pesquisador de Conteúdo",
+        goal="Pesquisar informações confiáveis e atualizadas sobre o tópico fornecido.",
+        backstory="Você é um especialista em busca de informações, capaz de extrair dados relevantes da Wikipedia e outras fontes abertas para ajudar na criação de conteúdo educacional.",
+        tools=[wikipedia_tool],
+        allow_delegation=False,
+        verbose=verbose()
+    )
+
+    writer = Agent(
+        role="Redator de Conteúdo",
+        goal="Escrever um artigo informativo e envolvente sobre o tema proposto.",
+        backstory="Você é um redator habilidoso que transforma pesquisas em textos bem estruturados, com clareza, fluidez e coerência.",
+        allow_delegation=False,
+        verbose=verbose()
+    )
+
+    editor = Agent(
+        role="Editor de Conteúdo",
+        goal="Revisar e refinar o artigo para garantir clareza, consistência e correção gramatical.",
+        backstory="Você é um editor que revisa cuidadosamente os textos para deixá-los prontos para publicação, mantendo o estilo da marca.",
+        allow_delegation=False,
+        verbose=verbose()
+    )
+
+    # 3. Criar tarefas
+    research_task = Task(
+        name="research",
+        description=f"Pesquisar e resumir informações sobre {topic} usando a Wikipedia e outras fontes abertas.",
+        expected_output=f"Resumo completo sobre {topic}, com dados e explicações técnicas acessíveis.",
+        agent=researcher
+    )
+
+    writing_task = Task(
+        name="writing",
+        description="Escrever um artigo com base nas informações pesquisadas, incluindo introdução, desenvolvimento e conclusão.",
+        expected_output="Artigo bem escrito em formato markdown, com título, subtítulos e ao menos 300 palavras.",
+        agent=writer,
+        context=[research_task]
+    )
+
+    editing_task = Task(
+        name="editing",
+        description="Revisar o artigo escrito, corrigir erros e aprimorar a clareza e estilo.",
+        expected_output="Artigo final revisado, pronto para publicação.",
+        agent=editor,
+        context=[writing_task]
+    )
+
+    # 4. Criar a Crew
+    return Crew(
+        agents=[researcher, writer, editor],
+        tasks=[research_task, writing_task, editing_task],
+        verbose=verbose()
+    )
+
+def run_crew(topic=DEFAULT_TOPIC):
+    """
+    Executa a crew retomando a partir da última tarefa concluída.
+
+    A saída de cada tarefa é gravada como checkpoint (CHECKPOINT_DIR), identificada pelo
+    tópico e pela definição da tarefa e das anteriores. Se uma execução falhar na edição,
+    a próxima reaproveita a pesquisa e a escrita e executa só a edição. A última tarefa
+    é sempre executada, e ao fim da execução só o checkpoint da pesquisa é mantido
+    (ver 'crew_checkpoints.run_scope').
+
+    Returns:
+        str: Texto final produzido pela última tarefa.
+    """
+    crew = build_crew(topic)
+    store = crew_checkpoints.get_checkpoint_store()
+    if store is None:
+        return crew.kickoff(inputs={"topic": topic}).raw
+
+    # A definição de cada tarefa inclui a das anteriores, cujas saídas ela recebe como contexto
+    definitions, previous = [], ""
+    for task in crew.tasks:
+        previous = crew_checkpoints.definition_digest(
+            task.description, task.expected_output, task.agent.role, task.agent.llm.model, previous
+        )
+        definitions.append(previous)
+
+    with crew_checkpoints.run_scope():
+        # As tarefas já concluídas recebem a saída gravada, que é passada como contexto às seguintes.
+        # A saída gravada da última tarefa nunca é devolvida como resultado: o texto final é gerado de novo
+        remaining = []
+        for index, (task, definition) in enumerate(zip(crew.tasks, definitions)):
+            last = index == len(crew.tasks) - 1
+            output = None if remaining or last else store.get(topic, task.name, definition)
+            if output is not None:
+                logger.info("tarefa retomada do checkpoint topic=%r task=%s", topic, task.name)
+                task.output = TaskOutput(description=task.description, name=task.name, raw=output, agent=task.agent.role)
+                continue
+            task.callback = lambda output, task=task, definition=definition: store.put(topic, task.name, definition, output.raw)
+            remaining.append(task)
+
+        crew = Crew(agents=crew.agents, tasks=remaining, verbose=crew.verbose)
+        return crew.kickoff(inputs={"topic": topic}).raw
 
 # 5. Executar a Crew
 if __name__ == "__main__":
-    result = crew.kickoff(inputs={"topic": topic})
-    print(result)
+    # Registra as métricas, spans e logs das tarefas e chamadas ao LLM
+    import crew_events
+    crew_events.instrument()
+    print(run_crew(DEFAULT_TOPIC))